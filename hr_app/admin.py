@@ -1,9 +1,26 @@
-from django.contrib import admin
-from .models import EmployeeProfile, Attendance, LeaveRequest,Department,Announcement
+from django.contrib import admin, messages
+from django.db.models import DurationField, ExpressionWrapper, F
+from django.utils import timezone
+from .models import (
+    EmployeeProfile, Attendance, LeaveRequest, Department, Announcement,
+    AttendanceArchive, AttendanceMonthlySummary, AttendancePeriodStats, PunchEvent, PunchDevice, OffboardingJob, Payslip, AuditEvent, AuditEventArchive,
+    AttendanceAnomaly, ScanCheckpoint, OutboxEvent,
+)
+from .paginators import EstimatedCountPaginator
+from .search import matching_profile_ids
+from .offboarding import offboard
+from .anomalies import AnomalyFixError, apply_fix
+from .webhooks import requeue
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
     list_display = ('name',)
+    actions = ['offboard_department']
+
+    @admin.action(description="Offboard every employee in the selected departments (purge history)")
+    def offboard_department(self, request, queryset):
+        jobs = offboard(EmployeeProfile.objects.filter(department__in=queryset), 'purge', request.user)
+        self.message_user(request, f"{len(jobs)} employees deactivated; history purge queued.")
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
@@ -13,10 +30,33 @@ class AnnouncementAdmin(admin.ModelAdmin):
 @admin.register(EmployeeProfile)
 class EmployeeProfileAdmin(admin.ModelAdmin):
     list_display = ('employee_id', 'user', 'department', 'job_title', 'status', 'salary_per_hour')
+    # EmployeeProfile.__str__ and the department column would otherwise
+    # cost two extra queries per row.
+    list_select_related = ('user', 'department')
     
     list_filter = ('department', 'job_title', 'status')
     
     search_fields = ('employee_id', 'user__username', 'user__first_name', 'user__last_name')
+
+    actions = ['offboard_purge', 'offboard_anonymise']
+
+    @admin.action(description="Offboard selected employees (purge history)")
+    def offboard_purge(self, request, queryset):
+        jobs = offboard(queryset, 'purge', request.user)
+        self.message_user(request, f"{len(jobs)} employees deactivated; history purge queued.")
+
+    @admin.action(description="Offboard selected employees (anonymise history)")
+    def offboard_anonymise(self, request, queryset):
+        jobs = offboard(queryset, 'anonymise', request.user)
+        self.message_user(request, f"{len(jobs)} employees deactivated; anonymisation queued.")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Served by the search index (hr_app.search) instead of icontains
+        # over four joined columns; also backs the autocomplete widgets.
+        matching_ids = matching_profile_ids(search_term)
+        if matching_ids is None:
+            return queryset, False
+        return queryset.filter(pk__in=matching_ids), False
     
     fieldsets = (
         ('User Information', {
@@ -31,17 +71,37 @@ class EmployeeProfileAdmin(admin.ModelAdmin):
     )
 
 
+# Shared settings for the tables that grow every day.
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered COUNT(*) shown next to filtered results.
+    show_full_result_count = False
+
+
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
-    list_display = ('employee', 'check_in', 'check_out', 'total_work_time')
+class AttendanceAdmin(LargeTableAdmin):
+    list_display = ('employee', 'check_in', 'check_out', 'work_time')
+    list_select_related = ('employee__user',)
     list_filter = ('employee__department', 'employee__job_title')
     search_fields = ('employee__user__username', 'employee__employee_id')
+    autocomplete_fields = ('employee',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            work_duration=ExpressionWrapper(F('check_out') - F('check_in'), output_field=DurationField())
+        )
+
+    @admin.display(description='Total work time', ordering='work_duration')
+    def work_time(self, obj):
+        return obj.work_duration
 
 @admin.register(LeaveRequest)
-class LeaveRequestAdmin(admin.ModelAdmin):
+class LeaveRequestAdmin(LargeTableAdmin):
     list_display = ('employee', 'start_date', 'end_date', 'status', 'approved_by')
+    list_select_related = ('employee__user', 'approved_by')
     list_filter = ('status', 'employee__department')
     search_fields = ('employee__user__username', 'reason')
+    autocomplete_fields = ('employee', 'approved_by')
     
     fieldsets = (
         (None, {
@@ -50,4 +110,146 @@ class LeaveRequestAdmin(admin.ModelAdmin):
         ('HR Review', {
             'fields': ('status', 'approved_by'),
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(AttendanceArchive)
+class AttendanceArchiveAdmin(LargeTableAdmin):
+    list_display = ('employee', 'check_in', 'check_out', 'archived_at')
+    list_select_related = ('employee__user',)
+    search_fields = ('employee__user__username', 'employee__employee_id')
+    autocomplete_fields = ('employee',)
+
+
+@admin.register(AttendanceMonthlySummary)
+class AttendanceMonthlySummaryAdmin(LargeTableAdmin):
+    list_display = ('employee', 'year', 'month', 'shift_count', 'total_work_time')
+    list_select_related = ('employee__user',)
+    list_filter = ('year', 'month')
+    search_fields = ('employee__user__username', 'employee__employee_id')
+    autocomplete_fields = ('employee',)
+
+
+@admin.register(AttendancePeriodStats)
+class AttendancePeriodStatsAdmin(LargeTableAdmin):
+    list_display = ('employee', 'year', 'month', 'shifts', 'late_shifts', 'late_minutes',
+                    'early_leave_minutes', 'overtime_minutes')
+    list_select_related = ('employee__user',)
+    list_filter = ('year', 'month')
+    search_fields = ('employee__user__username', 'employee__employee_id')
+    autocomplete_fields = ('employee',)
+
+
+@admin.register(PunchEvent)
+class PunchEventAdmin(LargeTableAdmin):
+    list_display = ('timestamp', 'employee', 'device_id', 'outcome', 'detail', 'received_at')
+    list_select_related = ('employee__user',)
+    list_filter = ('outcome', 'detail')
+    search_fields = ('key', 'device_id', 'employee__user__username', 'employee__employee_id')
+    autocomplete_fields = ('employee',)
+
+
+@admin.register(PunchDevice)
+class PunchDeviceAdmin(admin.ModelAdmin):
+    list_display = ('device_id', 'employee', 'department', 'site_wide', 'is_active', 'created_at')
+    list_select_related = ('employee__user', 'department')
+    list_filter = ('is_active', 'site_wide', 'department')
+    search_fields = ('device_id', 'employee__employee_id')
+    autocomplete_fields = ('employee',)
+
+
+@admin.register(OffboardingJob)
+class OffboardingJobAdmin(admin.ModelAdmin):
+    list_display = ('employee_label', 'mode', 'status', 'step', 'rows_processed', 'requested_by',
+                    'created_at', 'finished_at')
+    list_filter = ('status', 'mode')
+    search_fields = ('employee_label',)
+    # Progress is written by the worker; only status can be changed (e.g. re-queue a failed job).
+    readonly_fields = ('profile', 'employee_label', 'mode', 'step', 'rows_processed', 'error',
+                       'requested_by', 'created_at', 'updated_at', 'finished_at')
+
+
+@admin.register(Payslip)
+class PayslipAdmin(LargeTableAdmin):
+    list_display = ('employee', 'year', 'month', 'gross_salary', 'generated_at')
+    list_select_related = ('employee__user',)
+    list_filter = ('year', 'month')
+    search_fields = ('employee__user__username', 'employee__employee_id')
+    # Written by `manage.py generate_payslips` only.
+    readonly_fields = ('employee', 'year', 'month', 'gross_salary', 'input_hash', 'content_hash', 'file',
+                       'generated_at')
+
+
+class AuditEventAdmin(LargeTableAdmin):
+    list_display = ('created_at', 'actor_label', 'action', 'entity_type', 'entity_id')
+    list_filter = ('action', 'entity_type')
+    search_fields = ('entity_id', 'actor_label')
+
+    # Append-only: nothing can be added, edited or removed here.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(AuditEvent, AuditEventAdmin)
+admin.site.register(AuditEventArchive, AuditEventAdmin)
+
+
+@admin.register(AttendanceAnomaly)
+class AttendanceAnomalyAdmin(LargeTableAdmin):
+    list_display = ('detected_at', 'kind', 'employee', 'detail', 'status', 'resolved_by')
+    list_select_related = ('employee__user', 'resolved_by')
+    list_filter = ('status', 'kind')
+    search_fields = ('employee__user__username', 'employee__employee_id', 'key')
+    # Filed by `manage.py scan_attendance_anomalies`; resolved through the actions below.
+    readonly_fields = ('key', 'kind', 'employee', 'attendance', 'punch', 'late_request', 'detail', 'data',
+                       'detected_at', 'resolved_at', 'resolved_by')
+    actions = ['apply_autofix', 'dismiss']
+
+    @admin.action(description="Apply the auto-fix to selected anomalies")
+    def apply_autofix(self, request, queryset):
+        fixed, problems = 0, []
+        for anomaly in queryset.filter(status='open'):
+            try:
+                apply_fix(anomaly, request.user)
+                fixed += 1
+            except AnomalyFixError as exc:
+                problems.append(f"#{anomaly.pk}: {exc}")
+        self.message_user(request, f"{fixed} anomalies fixed.")
+        if problems:
+            self.message_user(request, "Not fixed: " + "; ".join(problems[:20]), level=messages.WARNING)
+
+    @admin.action(description="Dismiss selected anomalies (not a problem)")
+    def dismiss(self, request, queryset):
+        count = queryset.filter(status='open').update(
+            status='dismissed', resolved_at=timezone.now(), resolved_by=request.user,
+        )
+        self.message_user(request, f"{count} anomalies dismissed.")
+
+
+@admin.register(ScanCheckpoint)
+class ScanCheckpointAdmin(admin.ModelAdmin):
+    # Delete a row to make the next scan start over.
+    list_display = ('name', 'position', 'updated_at')
+    readonly_fields = ('name', 'position', 'updated_at')
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin):
+    list_display = ('id', 'destination', 'topic', 'entity_id', 'status', 'attempts', 'next_attempt_at',
+                    'last_error', 'created_at')
+    list_filter = ('status', 'destination', 'topic')
+    search_fields = ('entity_id',)
+    # Written by signals and `manage.py deliver_webhooks`; only re-queueing is done by hand.
+    readonly_fields = ('destination', 'topic', 'entity_id', 'payload', 'created_at', 'status', 'attempts',
+                       'next_attempt_at', 'delivered_at', 'last_error')
+    actions = ['requeue_events']
+
+    @admin.action(description="Re-queue selected events (send again)")
+    def requeue_events(self, request, queryset):
+        self.message_user(request, f"{requeue(queryset)} events re-queued.")
@@ -0,0 +1,387 @@
+# hr_app/anomalies.py
+"""
+Attendance anomaly scan (nightly, `manage.py scan_attendance_anomalies`).
+
+Rules over each employee's shifts in check-in order:
+* duplicate_open: an open shift with a later shift after it. The clock-out
+  toggle always closes the oldest open shift, so it would turn into a
+  multi-day shift.
+* zero_length: check-out at or before check-in.
+* over_24h: a shift longer than a day.
+* overlap / late_approval_overlap: a shift starting before an earlier one
+  ended (the second kind when it was created by a late-arrival approval).
+And over accepted punches in time order:
+* gps_jump: two consecutive punches further apart than anyone can travel
+  in the time between them.
+
+Like hr_app.analytics, rows are streamed as tuples and reduced to epoch
+seconds, so every rule is a few integer comparisons in one pass.
+
+The scan is incremental. A ScanCheckpoint keeps a high-water mark on
+Attendance (updated_at, id), which every insert and edit (a shift being
+closed included) moves a row past, and one on PunchEvent.id. A run reads
+only the rows beyond the marks, in index order and in chunks. For each
+chunk it loads the surrounding shifts/punches of the employees involved,
+so the windowed rules still see their neighbours. The very first run
+sweeps each table once in (employee, time) order instead.
+
+Findings go to AttendanceAnomaly under a unique key, so a rescan never
+files the same thing twice. `apply_fix()` runs the auto-fix of a kind
+that has one and records it in the audit trail.
+"""
+import math
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import audit
+from .models import Attendance, AttendanceAnomaly, LateArrivalRequest, PunchEvent, ScanCheckpoint
+from .punches import CLOCK_OUT_FROM, EARTH_RADIUS_M
+
+DAY = 24 * 60 * 60
+# Neighbouring shifts loaded around a chunk of changed ones; longer shifts are flagged on their own.
+WINDOW = timedelta(days=2)
+# Rows changed in the last few minutes wait for the next run (their transactions may still be open).
+SETTLE = timedelta(minutes=5)
+# Employees per neighbour query.
+EMPLOYEE_BATCH = 200
+STANDARD_SHIFT = timedelta(hours=9)
+
+ATTENDANCE_CHECKPOINT = 'anomalies:attendance'
+PUNCH_CHECKPOINT = 'anomalies:punches'
+
+
+class AnomalyFixError(ValueError):
+    """The anomaly has no auto-fix, or the record no longer looks like it did."""
+
+
+def _epoch(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+def _finding(kind, employee_id, detail, key, **refs):
+    return AttendanceAnomaly(key=key, kind=kind, employee_id=employee_id, detail=detail[:255], **refs)
+
+
+# =========================================================
+# 🔎 RULES
+# =========================================================
+
+def shift_findings(rows, late_approvals, only=None):
+    """
+    Findings for (id, employee_id, check_in, check_out) rows sorted by
+    (employee_id, check_in, id). `late_approvals` maps (employee_id,
+    check-in epoch) to an approved LateArrivalRequest id. With `only`, a
+    finding is kept when it involves one of those shift ids.
+    """
+    def wanted(*ids):
+        return only is None or any(i in only for i in ids)
+
+    current = None
+    for shift_id, employee_id, check_in, check_out in rows:
+        if check_in is None:
+            continue
+        if employee_id != current:
+            current, last_open, latest_end, latest_id = employee_id, None, None, None
+        start, end = _epoch(check_in), _epoch(check_out)
+
+        if last_open is not None and wanted(last_open, shift_id):
+            yield _finding('duplicate_open', employee_id, f"Shift #{last_open} is still open; #{shift_id} started after it.",
+                           f'duplicate_open:{last_open}', attendance_id=last_open, data={'next_id': shift_id})
+        last_open = shift_id if end is None else None
+
+        if end is not None and wanted(shift_id):
+            if end <= start:
+                yield _finding('zero_length', employee_id, f"Shift #{shift_id} ends {start - end}s before it starts.",
+                               f'zero_length:{shift_id}', attendance_id=shift_id)
+            elif end - start > DAY:
+                yield _finding('over_24h', employee_id, f"Shift #{shift_id} lasts {(end - start) / 3600:.1f} hours.",
+                               f'over_24h:{shift_id}', attendance_id=shift_id)
+
+        if latest_end is not None and start < latest_end and wanted(shift_id, latest_id):
+            late_id = late_approvals.get((employee_id, start))
+            kind = 'late_approval_overlap' if late_id else 'overlap'
+            yield _finding(kind, employee_id, f"Shift #{shift_id} starts {(latest_end - start) / 60:.0f} min before #{latest_id} ends.",
+                           f'{kind}:{shift_id}:{latest_id}', attendance_id=shift_id, late_request_id=late_id,
+                           data={'previous_id': latest_id})
+        if end is not None and (latest_end is None or end > latest_end):
+            latest_end, latest_id = end, shift_id
+
+
+def _distance_m(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def punch_findings(rows, only=None):
+    """Findings for (id, employee_id, timestamp, lat, lon) rows sorted by (employee_id, timestamp, id)."""
+    max_speed = settings.ANOMALY_MAX_SPEED_KMH / 3.6  # m/s
+    min_distance = settings.ANOMALY_GPS_MIN_METERS
+    previous = None
+    for punch_id, employee_id, timestamp, lat, lon in rows:
+        ts = _epoch(timestamp)
+        if previous is not None and previous[1] == employee_id and (only is None or punch_id in only):
+            distance = _distance_m(previous[3], previous[4], lat, lon)
+            seconds = max(ts - previous[2], 1)
+            if distance > min_distance and distance / seconds > max_speed:
+                yield _finding('gps_jump', employee_id,
+                               f"Punch #{punch_id} is {distance / 1000:.1f} km from #{previous[0]} "
+                               f"{seconds / 60:.0f} min earlier ({distance / seconds * 3.6:.0f} km/h).",
+                               f'gps_jump:{punch_id}', punch_id=punch_id, data={'previous_id': previous[0]})
+        previous = (punch_id, employee_id, ts, lat, lon)
+
+
+# =========================================================
+# 📥 LOADING (full sweep / windows around changed rows)
+# =========================================================
+
+SHIFT_FIELDS = ('id', 'employee_id', 'check_in', 'check_out')
+PUNCH_FIELDS = ('id', 'employee_id', 'timestamp', 'latitude', 'longitude')
+
+
+def _late_approvals(employee_ranges=None):
+    requests = LateArrivalRequest.objects.filter(status='Approved')
+    if employee_ranges is not None:
+        requests = requests.filter(employee_ranges)
+    return {
+        (employee_id, _epoch(requested_at)): request_id
+        for request_id, employee_id, requested_at in requests.values_list('id', 'employee_id', 'requested_at').iterator()
+    }
+
+
+def _ranges(changed, time_index, field):
+    """OR of per-employee time windows around the changed rows, in batches of EMPLOYEE_BATCH employees."""
+    bounds = {}
+    for row in changed:
+        moment = row[time_index]
+        if moment is None:
+            continue
+        low, high = bounds.get(row[1], (moment, moment))
+        bounds[row[1]] = (min(low, moment), max(high, moment))
+    items = list(bounds.items())
+    for i in range(0, len(items), EMPLOYEE_BATCH):
+        q = Q()
+        for employee_id, (low, high) in items[i:i + EMPLOYEE_BATCH]:
+            q |= Q(employee_id=employee_id, **{f'{field}__gte': low - WINDOW, f'{field}__lte': high + WINDOW})
+        yield q
+
+
+def _shift_window(changed):
+    rows = {row[0]: row for row in changed}
+    employees = {row[1] for row in changed}
+    for q in _ranges(changed, 2, 'check_in'):
+        rows.update((row[0], row) for row in Attendance.objects.filter(q).values_list(*SHIFT_FIELDS))
+    # Stale open shifts can be older than the window.
+    rows.update(
+        (row[0], row) for row in
+        Attendance.objects.filter(employee_id__in=employees, check_out__isnull=True).values_list(*SHIFT_FIELDS)
+    )
+    late = {}
+    for q in _ranges(changed, 2, 'requested_at'):
+        late.update(_late_approvals(q))
+    ordered = sorted((row for row in rows.values() if row[2] is not None), key=lambda r: (r[1], r[2], r[0]))
+    return ordered, late
+
+
+def _punch_window(changed):
+    rows = {row[0]: row for row in changed}
+    for q in _ranges(changed, 2, 'timestamp'):
+        rows.update((row[0], row) for row in _accepted_punches().filter(q).values_list(*PUNCH_FIELDS))
+    return sorted(rows.values(), key=lambda r: (r[1], r[2], r[0]))
+
+
+def _accepted_punches():
+    return PunchEvent.objects.filter(employee__isnull=False).exclude(outcome='rejected')
+
+
+# =========================================================
+# 🌙 SCAN
+# =========================================================
+
+def _save(findings):
+    findings = list(findings)
+    AttendanceAnomaly.objects.bulk_create(findings, batch_size=1000, ignore_conflicts=True)
+    return len(findings)
+
+
+def _checkpoint(name):
+    checkpoint, _ = ScanCheckpoint.objects.get_or_create(name=name)
+    return checkpoint
+
+
+def scan_attendance(chunk_size=5000, now=None):
+    """Scans shifts changed since the last run. Returns (rows scanned, findings)."""
+    horizon = (now or timezone.now()) - SETTLE
+    checkpoint = _checkpoint(ATTENDANCE_CHECKPOINT)
+    position = checkpoint.position
+
+    if not position:  # first run: one sweep in (employee, check_in) order
+        mark = Attendance.objects.filter(updated_at__lt=horizon).order_by('-updated_at', '-id').values_list(
+            'updated_at', 'id').first()
+        rows = Attendance.objects.filter(updated_at__lt=horizon).order_by('employee_id', 'check_in', 'id')
+        scanned = rows.count()
+        with transaction.atomic():
+            found = _save(shift_findings(rows.values_list(*SHIFT_FIELDS).iterator(chunk_size=chunk_size),
+                                         _late_approvals()))
+            if mark:
+                checkpoint.position = {'updated_at': mark[0].isoformat(), 'id': mark[1]}
+                checkpoint.save()
+        return scanned, found
+
+    scanned = found = 0
+    while True:
+        after = datetime.fromisoformat(position['updated_at'])
+        changed = list(
+            Attendance.objects.filter(Q(updated_at__gt=after) | Q(updated_at=after, id__gt=position['id']),
+                                      updated_at__lt=horizon)
+            .order_by('updated_at', 'id').values_list(*SHIFT_FIELDS, 'updated_at')[:chunk_size]
+        )
+        if not changed:
+            return scanned, found
+        shifts = [row[:4] for row in changed]
+        ordered, late = _shift_window(shifts)
+        with transaction.atomic():
+            found += _save(shift_findings(ordered, late, only={row[0] for row in shifts}))
+            position = {'updated_at': changed[-1][4].isoformat(), 'id': changed[-1][0]}
+            checkpoint.position = position
+            checkpoint.save()
+        scanned += len(changed)
+
+
+def scan_punches(chunk_size=5000, now=None):
+    """Scans punches received since the last run. Returns (rows scanned, findings)."""
+    horizon = (now or timezone.now()) - SETTLE
+    checkpoint = _checkpoint(PUNCH_CHECKPOINT)
+    punches = _accepted_punches().filter(received_at__lt=horizon)
+
+    if not checkpoint.position:
+        mark = PunchEvent.objects.filter(received_at__lt=horizon).order_by('-id').values_list('id', flat=True).first()
+        rows = punches.order_by('employee_id', 'timestamp', 'id')
+        scanned = rows.count()
+        with transaction.atomic():
+            found = _save(punch_findings(rows.values_list(*PUNCH_FIELDS).iterator(chunk_size=chunk_size)))
+            checkpoint.position = {'id': mark or 0}
+            checkpoint.save()
+        return scanned, found
+
+    scanned = found = 0
+    last_id = checkpoint.position['id']
+    while True:
+        # Rejected punches are skipped but still move the mark.
+        batch = list(PunchEvent.objects.filter(id__gt=last_id, received_at__lt=horizon).order_by('id')
+                     .values_list('id', flat=True)[:chunk_size])
+        if not batch:
+            return scanned, found
+        changed = list(punches.filter(id__in=batch).values_list(*PUNCH_FIELDS))
+        with transaction.atomic():
+            if changed:
+                found += _save(punch_findings(_punch_window(changed), only={row[0] for row in changed}))
+            last_id = batch[-1]
+            checkpoint.position = {'id': last_id}
+            checkpoint.save()
+        scanned += len(batch)
+
+
+def reset_checkpoints():
+    """The next scan sweeps everything again (existing findings are kept, not duplicated)."""
+    ScanCheckpoint.objects.filter(name__in=[ATTENDANCE_CHECKPOINT, PUNCH_CHECKPOINT]).delete()
+
+
+# =========================================================
+# 🔧 AUTO-FIXES
+# =========================================================
+
+def _locked_shift(shift_id):
+    shift = Attendance.objects.select_for_update().filter(pk=shift_id).first()
+    if shift is None:
+        raise AnomalyFixError("The shift no longer exists.")
+    return shift
+
+
+def _deletable(shift):
+    if shift.earlyclockoutrequest_set.exists():
+        raise AnomalyFixError("An early clock-out request points at this shift; resolve it by hand.")
+
+
+def _fix_delete_stale_open(anomaly, user):
+    shift = _locked_shift(anomaly.attendance_id)
+    if shift.check_out is not None:
+        raise AnomalyFixError("The shift has been closed since.")
+    _deletable(shift)
+    audit.record_delete(user, shift)
+    shift.delete()
+    return "Deleted the stale open shift."
+
+
+def _fix_delete_zero_length(anomaly, user):
+    shift = _locked_shift(anomaly.attendance_id)
+    if shift.check_out is None or shift.check_out > shift.check_in:
+        raise AnomalyFixError("The shift has a positive length now.")
+    _deletable(shift)
+    audit.record_delete(user, shift)
+    shift.delete()
+    return "Deleted the empty shift."
+
+
+def _fix_close_at_day_end(anomaly, user):
+    shift = _locked_shift(anomaly.attendance_id)
+    if shift.check_out is None or shift.check_out - shift.check_in <= timedelta(days=1):
+        raise AnomalyFixError("The shift is no longer over 24 hours.")
+    local_in = timezone.localtime(shift.check_in)
+    day_end = local_in.replace(hour=CLOCK_OUT_FROM.hour, minute=CLOCK_OUT_FROM.minute, second=0, microsecond=0)
+    before = audit.snapshot(shift)
+    shift.check_out = day_end if day_end > local_in else shift.check_in + STANDARD_SHIFT
+    shift.save()
+    audit.record_change(user, shift, before)
+    return f"Clock-out moved to {timezone.localtime(shift.check_out):%b %d %H:%M}."
+
+
+def _fix_merge_into_previous(anomaly, user):
+    shift = _locked_shift(anomaly.attendance_id)
+    previous = _locked_shift(anomaly.data.get('previous_id'))
+    if previous.check_out is None or shift.check_in >= previous.check_out:
+        raise AnomalyFixError("The shifts no longer overlap.")
+    _deletable(shift)
+    if shift.check_out is None or shift.check_out > previous.check_out:
+        before = audit.snapshot(previous)
+        previous.check_out = shift.check_out or previous.check_out
+        previous.save()
+        audit.record_change(user, previous, before)
+    audit.record_delete(user, shift)
+    shift.delete()
+    return f"Merged into shift #{previous.pk}."
+
+
+FIXES = {
+    'duplicate_open': _fix_delete_stale_open,
+    'zero_length': _fix_delete_zero_length,
+    'over_24h': _fix_close_at_day_end,
+    'overlap': _fix_merge_into_previous,
+    'late_approval_overlap': _fix_merge_into_previous,
+}
+
+
+def _gone(anomaly):
+    """True when a shift the finding is about has been deleted since (e.g. by another fix)."""
+    ids = [anomaly.data['previous_id']] if 'previous_id' in anomaly.data else []
+    return anomaly.attendance_id is None or Attendance.objects.filter(pk__in=ids).count() < len(ids)
+
+
+def apply_fix(anomaly, user=None):
+    """Runs the kind's auto-fix and marks the anomaly fixed. Raises AnomalyFixError when it cannot."""
+    fix = FIXES.get(anomaly.kind)
+    if fix is None:
+        raise AnomalyFixError("This kind of anomaly has no automatic fix.")
+    if anomaly.status != 'open':
+        raise AnomalyFixError("Already resolved.")
+    with transaction.atomic():
+        message = "Nothing left to fix: the shift no longer exists." if _gone(anomaly) else fix(anomaly, user)
+        anomaly.status = 'fixed'
+        anomaly.resolved_at = timezone.now()
+        anomaly.resolved_by = user if getattr(user, 'is_authenticated', False) else None
+        anomaly.save(update_fields=['status', 'resolved_at', 'resolved_by'])
+    return message
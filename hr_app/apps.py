@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HrAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hr_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects receivers)
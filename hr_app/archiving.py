@@ -0,0 +1,114 @@
+# hr_app/archiving.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .bucketing import bucket_seconds, shifts_touching_month
+from .models import Attendance, AttendanceAnomaly, AttendanceArchive, AttendanceMonthlySummary
+
+
+# =========================================================
+# 📊 READ SIDE (live + archived, transparent to callers)
+# =========================================================
+
+def monthly_work_time(employee, year, month):
+    """
+    Total completed work time falling inside a local calendar month, wherever
+    the shifts are stored now. Live shifts are clipped at the month edges.
+    """
+    live_rows = Attendance.objects.filter(
+        shifts_touching_month(year, month),
+        employee=employee,
+        check_out__isnull=False,
+    ).values_list('check_in', 'check_out')
+    live = bucket_seconds(live_rows).get((year, month), 0.0)
+
+    archived = AttendanceMonthlySummary.objects.filter(
+        employee=employee, year=year, month=month
+    ).values_list('total_work_time', flat=True).first() or timedelta(0)
+
+    return timedelta(seconds=live) + archived
+
+
+# =========================================================
+# 🗄️ WRITE SIDE (archival job)
+# =========================================================
+
+def archive_cutoff(keep_months=1, now=None):
+    """Start of the oldest month that stays live (local time)."""
+    local = timezone.localtime(now or timezone.now())
+    year, month = local.year, local.month - keep_months
+    while month < 1:
+        month += 12
+        year -= 1
+    return timezone.make_aware(datetime(year, month, 1))
+
+
+def archive_batch(cutoff, batch_size=2000):
+    """
+    Moves one batch of completed shifts older than `cutoff` into the archive
+    and folds them into the monthly summaries. Each batch is its own short
+    transaction, so the hot table is never locked for long.
+    Returns the number of rows moved (0 when nothing is left).
+    """
+    with transaction.atomic():
+        rows = list(
+            Attendance.objects.filter(
+                check_in__lt=cutoff,
+                check_out__isnull=False,
+                # Shifts referenced by an early-out request stay live so the
+                # request is not cascaded away; reports still count them.
+                earlyclockoutrequest__isnull=True,
+            ).order_by('id').values('id', 'employee_id', 'check_in', 'check_out')[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        AttendanceArchive.objects.bulk_create([AttendanceArchive(**row) for row in rows])
+
+        # Shift counts go to the check-in month; work time is split at month
+        # edges, so a month can receive time from a shift archived with the
+        # previous one.
+        totals = defaultdict(lambda: [0, timedelta(0)])
+        for row in rows:
+            local_in = timezone.localtime(row['check_in'])
+            totals[(row['employee_id'], local_in.year, local_in.month)][0] += 1
+            for (year, month), seconds in bucket_seconds([(row['check_in'], row['check_out'])]).items():
+                totals[(row['employee_id'], year, month)][1] += timedelta(seconds=seconds)
+
+        existing = {
+            (s.employee_id, s.year, s.month): s
+            for s in AttendanceMonthlySummary.objects.select_for_update().filter(
+                employee_id__in={key[0] for key in totals},
+                year__in={key[1] for key in totals},
+                month__in={key[2] for key in totals},
+            )
+        }
+        to_create, to_update = [], []
+        for (employee_id, year, month), (count, work_time) in totals.items():
+            summary = existing.get((employee_id, year, month))
+            if summary:
+                summary.shift_count += count
+                summary.total_work_time += work_time
+                summary.updated_at = timezone.now()  # bulk_update skips auto_now
+                to_update.append(summary)
+            else:
+                to_create.append(AttendanceMonthlySummary(
+                    employee_id=employee_id, year=year, month=month,
+                    shift_count=count, total_work_time=work_time
+                ))
+        AttendanceMonthlySummary.objects.bulk_create(to_create)
+        AttendanceMonthlySummary.objects.bulk_update(to_update, ['shift_count', 'total_work_time', 'updated_at'])
+
+        # Archiving is a move, not a deletion: a plain DELETE by id sends no
+        # post_delete signals (the webhook outbox would report every row as
+        # deleted) and has no collector loading the rows again. Anomalies are
+        # SET_NULL only in the ORM.
+        ids = [row['id'] for row in rows]
+        AttendanceAnomaly.objects.filter(attendance_id__in=ids).update(attendance=None)
+        table = connection.ops.quote_name(Attendance._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+        return len(rows)
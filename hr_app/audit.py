@@ -0,0 +1,210 @@
+# hr_app/audit.py
+"""
+Append-only audit trail.
+
+Views take a `snapshot()` of a record before changing it and call
+`record_change()` after saving; the field-level diff becomes an AuditEvent
+(actor, model, pk, {field: [old, new]}).
+
+Events are queued once the surrounding transaction commits (rolled-back
+changes are never logged) and written by a background thread in batched
+bulk_creates, so a request only pays for a queue.put(). A batch is written
+when AUDIT_BATCH_SIZE events are waiting or AUDIT_FLUSH_SECONDS after the
+first one, whichever comes first. `flush()` writes everything queued so
+far; it runs at exit and, with AUDIT_FLUSH_EACH_REQUEST (serverless, where
+the process can be frozen after a response), at the end of each request.
+
+The AuditEvent table only holds recent months; `manage.py rotate_audit_log`
+moves older ones to AuditEventArchive in small batches. `history()` reads
+both.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from .models import AuditEvent, AuditEventArchive
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.SimpleQueue()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+# =========================================================
+# 📝 CAPTURE
+# =========================================================
+
+def _json_value(value):
+    if isinstance(value, FieldFile):
+        return value.name or None
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+def snapshot(instance):
+    """{attname: value} of a record's concrete fields, minus automatic timestamps."""
+    return {
+        field.attname: _json_value(field.value_from_object(instance))
+        for field in instance._meta.concrete_fields
+        if not (getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False))
+    }
+
+
+def diff(before, after):
+    return {name: [before.get(name), value] for name, value in after.items() if before.get(name) != value}
+
+
+def record_change(actor, instance, before=None, action=None):
+    """
+    Logs the difference between `before` (a snapshot, None for a new record)
+    and the saved instance. Plain updates that changed nothing are skipped.
+    """
+    action = action or ('create' if before is None else 'update')
+    changes = diff(before or {}, snapshot(instance))
+    if not changes and action == 'update':
+        return
+    _record(actor, action, instance, instance.pk, changes)
+
+
+def record_delete(actor, instance):
+    """Logs a record about to be deleted, with every field going to None. Call before delete()."""
+    _record(actor, 'delete', instance, instance.pk, {name: [value, None] for name, value in snapshot(instance).items()})
+
+
+def _record(actor, action, instance, pk, changes):
+    user = actor if getattr(actor, 'is_authenticated', False) else None
+    event = AuditEvent(
+        created_at=timezone.now(),
+        actor=user,
+        actor_label=user.get_username() if user else '',
+        action=action,
+        entity_type=instance._meta.label_lower,
+        entity_id=str(pk),
+        changes=changes,
+    )
+    transaction.on_commit(lambda: _enqueue(event))
+
+
+def _enqueue(event):
+    if not settings.AUDIT_ASYNC:
+        _write([event])
+        return
+    _queue.put(event)
+    _ensure_writer()
+
+
+# =========================================================
+# 💾 BATCHED WRITER (background thread)
+# =========================================================
+
+class _FlushMarker:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+def _write(batch):
+    try:
+        AuditEvent.objects.bulk_create(batch, batch_size=settings.AUDIT_BATCH_SIZE)
+    except DatabaseError:
+        # The change itself is committed; losing its log entry must not break anything else.
+        logger.exception("Dropped %d audit events", len(batch))
+
+
+def _collect(first):
+    """One batch: `first` plus whatever arrives until the batch is full or the flush interval ends."""
+    batch, markers = [], []
+    item = first
+    deadline = time.monotonic() + settings.AUDIT_FLUSH_SECONDS
+    while True:
+        if isinstance(item, _FlushMarker):
+            markers.append(item)
+            break  # someone is waiting: write now
+        batch.append(item)
+        remaining = deadline - time.monotonic()
+        if len(batch) >= settings.AUDIT_BATCH_SIZE or remaining <= 0:
+            break
+        try:
+            item = _queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+    return batch, markers
+
+
+def _run_writer():
+    while True:
+        batch, markers = _collect(_queue.get())
+        if batch:
+            _write(batch)
+            close_old_connections()  # this thread's connection follows CONN_MAX_AGE too
+        for marker in markers:
+            marker.done.set()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name='audit-writer', daemon=True)
+            _writer.start()
+
+
+def flush(timeout=5.0):
+    """Writes every event queued so far. Returns False if the writer did not finish within `timeout`."""
+    if _writer is None or not _writer.is_alive():
+        batch = []
+        while True:
+            try:
+                item = _queue.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(item, _FlushMarker):
+                batch.append(item)
+        if batch:
+            _write(batch)
+        return True
+    marker = _FlushMarker()
+    _queue.put(marker)
+    return marker.done.wait(timeout)
+
+
+atexit.register(flush)
+
+
+# =========================================================
+# 🔎 HISTORY & ROTATION
+# =========================================================
+
+def history(model, pk, limit=50):
+    """Latest events for one record, newest first, from the live and archived tables."""
+    events = []
+    for table in (AuditEvent, AuditEventArchive):
+        events += table.objects.filter(
+            entity_type=model._meta.label_lower, entity_id=str(pk)
+        ).select_related('actor').order_by('-created_at')[:limit]
+    return sorted(events, key=lambda event: event.created_at, reverse=True)[:limit]
+
+
+def rotate_batch(cutoff, batch_size=5000):
+    """
+    Moves one batch of events older than `cutoff` to the archive in a short
+    transaction. Returns the number of rows moved (0 when nothing is left).
+    """
+    fields = ['id', 'created_at', 'actor_id', 'actor_label', 'action', 'entity_type', 'entity_id', 'changes']
+    with transaction.atomic():
+        rows = list(AuditEvent.objects.filter(created_at__lt=cutoff).order_by('created_at').values(*fields)[:batch_size])
+        if not rows:
+            return 0
+        AuditEventArchive.objects.bulk_create([AuditEventArchive(**row) for row in rows])
+        AuditEvent.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    return len(rows)
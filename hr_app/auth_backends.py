@@ -0,0 +1,62 @@
+# hr_app/auth_backends.py
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'hr:auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedUserBackend(ModelBackend):
+    """
+    ModelBackend whose per-request get_user() loads the user together with
+    its EmployeeProfile and Department in one query, and keeps that object in
+    the shared cache for AUTH_USER_CACHE_TIMEOUT seconds. Saves to any of the
+    three models drop the entry (see hr_app.signals).
+
+    The password hash never goes into the cache: the cached user has
+    `password` deferred (reading it costs a query, save() leaves it alone)
+    and is stored with its session auth hash, which is all the per-request
+    session check needs.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user = (
+                User._default_manager
+                .select_related('employeeprofile__department')
+                .filter(pk=user_id)
+                .first()
+            )
+            if user is None:
+                return None
+            # Resolve the reverse one-to-one now, so a missing profile is
+            # cached as "no profile" rather than re-queried on every access.
+            try:
+                user.employeeprofile
+            except User.employeeprofile.RelatedObjectDoesNotExist:
+                pass
+            session_hash = user.get_session_auth_hash()
+            del user.__dict__['password']  # now a deferred field
+            entry = (user, session_hash)
+            cache.set(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+        user, session_hash = entry
+        _answer_session_hash(user, session_hash)
+        return user if self.user_can_authenticate(user) else None
+
+
+def _answer_session_hash(user, session_hash):
+    """get_session_auth_hash() from the cache entry until the password is loaded or changed."""
+    def get_session_auth_hash():
+        if 'password' in user.__dict__:
+            return User.get_session_auth_hash(user)
+        return session_hash
+    user.get_session_auth_hash = get_session_auth_hash
@@ -0,0 +1,164 @@
+# hr_app/benchmarks.py
+"""
+Offline benchmark cases for the hot views and model methods.
+
+Every run happens inside a transaction that is rolled back, so benchmarking
+against a seeded database (see `seed_workforce`) leaves it untouched.
+"""
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import EmployeeProfile
+from .views import OFFICE_LAT, OFFICE_LON
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _QueryCounter:
+    """execute_wrapper hook. (CaptureQueriesContext is reset by the test
+    client's request_started signal, so it undercounts view queries.)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Savepoint SQL is part of the harness, not of the code under test.
+        if 'SAVEPOINT' not in sql:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+class BenchContext:
+    """Shared fixtures: one employee client, one staff client, a report month."""
+
+    def __init__(self):
+        self.profile = (
+            EmployeeProfile.objects.select_related('user')
+            .filter(user__is_staff=False, user__is_superuser=False)
+            .order_by('id').first()
+        )
+        if self.profile is None:
+            raise RuntimeError("No employees found. Seed the database first (manage.py seed_workforce).")
+        self.employee = Client()
+        self.employee.force_login(self.profile.user)
+
+        staff = User.objects.create(username='bench_staff_user', is_staff=True)
+        self.staff = Client()
+        self.staff.force_login(staff)
+
+        last_month = timezone.localdate().replace(day=1) - timedelta(days=1)
+        self.year, self.month = last_month.year, last_month.month
+        today = timezone.localdate()
+        self.nine_oh_five = timezone.make_aware(datetime(today.year, today.month, today.day, 9, 5))
+
+
+def _get(client, name, **params):
+    response = client.get(reverse(name), params, HTTP_HOST='localhost')
+    assert response.status_code in (200, 302), (name, response.status_code)
+
+
+def _toggle(ctx):
+    # Fixed 9:05 so every call is a real clock-in; rolled back per iteration.
+    with mock.patch('hr_app.views.timezone.now', return_value=ctx.nine_oh_five):
+        response = ctx.employee.post(reverse('attendance_toggle'), {
+            'latitude': OFFICE_LAT, 'longitude': OFFICE_LON,
+        }, HTTP_HOST='localhost')
+    assert response.status_code == 302, response.status_code
+
+
+CASES = {
+    'AttendanceToggleView': _toggle,
+    'EmployeeDashboardView': lambda ctx: _get(ctx.employee, 'employee_dashboard'),
+    'AdminDashboardView': lambda ctx: _get(ctx.staff, 'admin_dashboard'),
+    'AllEmployeesView': lambda ctx: _get(ctx.staff, 'all_employees'),
+    'ManageLeavesView': lambda ctx: _get(ctx.staff, 'manage_leaves'),
+    'MonthlySalaryReportView': lambda ctx: _get(ctx.employee, 'salary_report', year=ctx.year, month=ctx.month),
+    'calculate_monthly_salary': lambda ctx: ctx.profile.calculate_monthly_salary(ctx.year, ctx.month),
+    'check_user_existence': lambda ctx: _get(ctx.employee, 'check_user_existence',
+                                             username=ctx.profile.user.username, email='nobody@example.com'),
+}
+
+
+def _run_once(fn, ctx):
+    """Runs one iteration in a savepoint that is always rolled back."""
+    try:
+        with transaction.atomic():
+            fn(ctx)
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def run_case(name, ctx, iterations=20, warmup=2):
+    fn = CASES[name]
+    for _ in range(warmup):
+        _run_once(fn, ctx)
+
+    timings = []
+    queries = _QueryCounter()
+    with connection.execute_wrapper(queries):
+        for _ in range(iterations):
+            start = time.perf_counter()
+            _run_once(fn, ctx)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    # Separate pass: tracemalloc slows Python code down noticeably.
+    tracemalloc.start()
+    _run_once(fn, ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'case': name,
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'queries': round(queries.count / iterations),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_suite(cases=None, iterations=20):
+    """Runs the selected cases against the current database, leaving no trace."""
+    results = []
+    try:
+        with transaction.atomic():
+            ctx = BenchContext()
+            for name in cases or CASES:
+                results.append(run_case(name, ctx, iterations))
+            raise _Rollback
+    except _Rollback:
+        pass
+    return results
+
+
+def compare(baseline, current, threshold=0.20):
+    """
+    Lists regressions between two result files: median time worse by more
+    than `threshold` (fraction), or more queries than before.
+    """
+    def index(doc):
+        return {(r['scale'], r['case']): r for r in doc['results']}
+
+    old, new = index(baseline), index(current)
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        if after['median_ms'] > before['median_ms'] * (1 + threshold):
+            regressions.append((key, 'median_ms', before['median_ms'], after['median_ms']))
+        if after['queries'] > before['queries']:
+            regressions.append((key, 'queries', before['queries'], after['queries']))
+    return regressions
@@ -0,0 +1,106 @@
+# hr_app/bucketing.py
+"""
+Time bucketing for payroll.
+
+Shifts are split at local midnight (TIME_ZONE) so a 22:00-06:00 shift on the
+31st pays 2h into one month and 6h into the next. Leave ranges are split
+the same way by calendar month. Everything works on plain (start, end)
+pairs in a single pass, so bulk payroll over many employees stays linear in
+the number of rows.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+# Longest shift we expect. Queries look back this far before a month starts
+# to find shifts that spill into it.
+MAX_SHIFT = timedelta(hours=24)
+
+
+def month_bounds(year, month, tz=None):
+    """[start, end) of a local calendar month as aware datetimes."""
+    tz = tz or timezone.get_current_timezone()
+    start = datetime(year, month, 1, tzinfo=tz)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=tz)
+    return start, end
+
+
+def month_dates(year, month):
+    """(first day, last day) of a calendar month."""
+    first = date(year, month, 1)
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return first, last
+
+
+def shifts_touching_month(year, month, prefix=''):
+    """Q for shifts that may overlap the month; callers clip with bucket_*()."""
+    start, end = month_bounds(year, month)
+    return Q(**{f'{prefix}check_in__gte': start - MAX_SHIFT, f'{prefix}check_in__lt': end})
+
+
+def leaves_touching_month(year, month, prefix=''):
+    """Q for leave ranges that overlap the month."""
+    first, last = month_dates(year, month)
+    return Q(**{f'{prefix}start_date__lte': last, f'{prefix}end_date__gte': first})
+
+
+# =========================================================
+# ✂️ SPLITTING
+# =========================================================
+
+def split_by_day(start, end, tz=None):
+    """Yields (local_date, seconds) for each local day the interval covers."""
+    tz = tz or timezone.get_current_timezone()
+    cursor = start.astimezone(tz)
+    end = end.astimezone(tz)
+    while cursor < end:
+        next_midnight = datetime.combine(cursor.date() + timedelta(days=1), time(0), tzinfo=tz)
+        piece_end = min(end, next_midnight)
+        yield cursor.date(), (piece_end - cursor).total_seconds()
+        cursor = piece_end
+
+
+def bucket_seconds(intervals, by='month', tz=None):
+    """
+    {(year, month): seconds} (or {date: seconds} with by='day') for an
+    iterable of (start, end) pairs. Open intervals (end is None) are ignored.
+    """
+    tz = tz or timezone.get_current_timezone()
+    totals = defaultdict(float)
+    for start, end in intervals:
+        if start is None or end is None:
+            continue
+        for day, seconds in split_by_day(start, end, tz):
+            totals[(day.year, day.month) if by == 'month' else day] += seconds
+    return totals
+
+
+def bucket_seconds_by_employee(rows, by='month', tz=None):
+    """
+    {employee_id: {bucket: seconds}} for (employee_id, start, end) rows, e.g.
+    straight from values_list() over every employee of a payroll run.
+    """
+    tz = tz or timezone.get_current_timezone()
+    result = defaultdict(lambda: defaultdict(float))
+    for employee_id, start, end in rows:
+        if start is None or end is None:
+            continue
+        buckets = result[employee_id]
+        for day, seconds in split_by_day(start, end, tz):
+            buckets[(day.year, day.month) if by == 'month' else day] += seconds
+    return result
+
+
+def leave_days_by_month(ranges):
+    """{(year, month): days} for inclusive (start_date, end_date) ranges."""
+    totals = defaultdict(int)
+    for start, end in ranges:
+        cursor = start
+        while cursor <= end:
+            _, month_last = month_dates(cursor.year, cursor.month)
+            piece_end = min(end, month_last)
+            totals[(cursor.year, cursor.month)] += (piece_end - cursor).days + 1
+            cursor = piece_end + timedelta(days=1)
+    return totals
@@ -0,0 +1,117 @@
+# hr_app/caching.py
+import hashlib
+import time
+
+from django.core.cache import cache
+
+# Versioned ("generation") keys: instead of deleting every cached variant when
+# the data changes, we bump a counter that is part of each key. Old entries
+# simply stop being read and expire on their own.
+
+ANNOUNCEMENT_GENERATION_KEY = 'hr:announcements:generation'
+ANNOUNCEMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _fresh_generation():
+    return time.time_ns()
+
+
+def generation(key):
+    """Current value of a generation counter (never expires; created on first use)."""
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _fresh_generation(), timeout=None)
+        value = cache.get(key, 0)
+    return value
+
+
+def generations(keys):
+    """{key: value} of several generation counters in one get_many (missing ones are created)."""
+    values = cache.get_many(keys)
+    for key in set(keys) - set(values):
+        values[key] = generation(key)
+    return values
+
+
+def bump_generation(key):
+    """Invalidates every entry keyed on this generation in one write."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key missing (cold cache / evicted): start from a value no older
+        # entry can have been stored under.
+        cache.set(key, _fresh_generation(), timeout=None)
+
+
+def announcement_generation():
+    return generation(ANNOUNCEMENT_GENERATION_KEY)
+
+
+def bump_announcement_generation():
+    bump_generation(ANNOUNCEMENT_GENERATION_KEY)
+
+
+# =========================================================
+# 💰 SALARY REPORT (conditional GET + closed-month fragment cache)
+# =========================================================
+
+# Bump when salary_report_body.html or the pay rules change, so old ETags and
+# cached fragments stop matching.
+SALARY_REPORT_VERSION = 3
+SALARY_REPORT_CACHE_TIMEOUT = 60 * 60 * 24 * 31
+
+
+def salary_report_key(profile_id, year, month):
+    return f'hr:salary_report:{profile_id}:{year}:{month}'
+
+
+def salary_report_validators(profile, year, month):
+    """
+    (etag, last_modified) of the report itself for one employee-month, from
+    cheap aggregates over the rows it reads. Row counts are included so
+    deletions change the ETag too.
+    """
+    from django.db.models import Count, Max
+
+    from .bucketing import leaves_touching_month, shifts_touching_month
+    from .models import Attendance, AttendanceMonthlySummary, LeaveRequest, Payslip
+
+    attendance = Attendance.objects.filter(
+        shifts_touching_month(year, month), employee=profile
+    ).aggregate(changed=Max('updated_at'), rows=Count('id'))
+    leaves = LeaveRequest.objects.filter(
+        leaves_touching_month(year, month), employee=profile
+    ).aggregate(changed=Max('updated_at'), rows=Count('id'))
+    summary = AttendanceMonthlySummary.objects.filter(
+        employee=profile, year=year, month=month
+    ).values_list('updated_at', flat=True).first()
+    payslip = Payslip.objects.filter(
+        employee=profile, year=year, month=month
+    ).values_list('generated_at', flat=True).first()
+
+    stamps = [t for t in (attendance['changed'], leaves['changed'], summary, payslip) if t]
+    last_modified = max(stamps) if stamps else None
+
+    raw = '|'.join(str(part) for part in (
+        SALARY_REPORT_VERSION, profile.pk, year, month, profile.salary_per_hour,
+        attendance['changed'], attendance['rows'], leaves['changed'], leaves['rows'], summary, payslip,
+    ))
+    etag = '"%s"' % hashlib.sha256(raw.encode()).hexdigest()[:32]
+    return etag, last_modified
+
+
+def salary_report_page_etag(report_etag, request):
+    """
+    ETag of the whole page: the report plus what base.html renders around it
+    (user name, staff nav and its pending badges, the CSRF token in the logout
+    form), so a 304 never keeps a stale nav.
+    """
+    from .counters import pending_counts
+
+    user = request.user
+    staff = user.is_staff or user.is_superuser
+    raw = '|'.join(str(part) for part in (
+        report_etag, user.is_staff, user.is_superuser, user.first_name or user.username,
+        sorted(pending_counts().items()) if staff else '', request.META.get('CSRF_COOKIE', ''),
+    ))
+    return '"%s"' % hashlib.sha256(raw.encode()).hexdigest()[:32]
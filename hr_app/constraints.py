@@ -0,0 +1,72 @@
+# hr_app/constraints.py
+"""
+Database constraints that only some backends can enforce.
+
+PostgresExclusionConstraint keeps an exclusion constraint in migration state
+on every backend, but only emits SQL on PostgreSQL. Elsewhere the rule it
+backs stays in application code (see hr_app/leaves.py).
+
+django.contrib.postgres is imported only when Postgres DDL or validation
+actually needs it: importing it pulls in psycopg, about 0.1s of every cold
+start on SQLite.
+"""
+from django.db import connections
+from django.db.models import BaseConstraint, Func
+
+
+class DateRange(Func):
+    """DATERANGE(lower, upper, bounds), e.g. bounds Value('[]') for an inclusive end date."""
+    function = 'DATERANGE'
+
+    def _resolve_output_field(self):
+        from django.contrib.postgres.fields import DateRangeField
+        return DateRangeField()
+
+
+class PostgresExclusionConstraint(BaseConstraint):
+    """
+    Takes ExclusionConstraint's arguments (operators as strings, e.g. '=' and
+    '&&') and delegates to a real ExclusionConstraint on PostgreSQL.
+    """
+
+    def __init__(self, *, name, expressions, violation_error_code=None, violation_error_message=None, **options):
+        self.expressions = expressions
+        self.options = options  # condition, index_type, deferrable, include
+        super().__init__(
+            name=name, violation_error_code=violation_error_code, violation_error_message=violation_error_message,
+        )
+
+    def _exclusion(self):
+        from django.contrib.postgres.constraints import ExclusionConstraint
+        return ExclusionConstraint(
+            name=self.name, expressions=self.expressions, violation_error_code=self.violation_error_code,
+            violation_error_message=self.violation_error_message, **self.options,
+        )
+
+    def constraint_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            return self._exclusion().constraint_sql(model, schema_editor)
+
+    def create_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            return self._exclusion().create_sql(model, schema_editor)
+
+    def remove_sql(self, model, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            return self._exclusion().remove_sql(model, schema_editor)
+
+    def validate(self, model, instance, exclude=None, using='default'):
+        if connections[using].vendor == 'postgresql':
+            self._exclusion().validate(model, instance, exclude=exclude, using=using)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        return path, args, {**kwargs, 'expressions': self.expressions, **self.options}
+
+    def __eq__(self, other):
+        if isinstance(other, PostgresExclusionConstraint):
+            return self.deconstruct() == other.deconstruct()
+        return super().__eq__(other)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__}: name={self.name!r} expressions={self.expressions!r}>"
@@ -0,0 +1,10 @@
+# hr_app/context_processors.py
+from .counters import pending_counts as _pending_counts
+
+
+def pending_counts(request):
+    """Pending request counts for the staff nav badges (one cache read, staff only)."""
+    user = getattr(request, 'user', None)
+    if user is None or not (user.is_staff or user.is_superuser):
+        return {}
+    return {'pending_counts': _pending_counts()}
@@ -0,0 +1,78 @@
+# hr_app/counters.py
+"""
+Pending-request counters for the staff nav badges.
+
+Counting `status='Pending'` on three tables for every page a staff member
+opens would cost three queries per request. Instead PendingCounter keeps
+one row per queue, moved by +1/-1 with an atomic UPDATE ... SET count =
+count + delta in the same transaction as the request being created,
+approved, rejected or deleted (signals in hr_app.signals). The three
+counts are cached together under one key that is dropped when a counter
+commits a change, so a page costs one cache read.
+
+Bulk writes (bulk_create, raw deletes in offboarding) skip the signals and
+call `reconcile()` afterwards; `manage.py reconcile_pending_counters`
+repairs any other drift.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EarlyClockOutRequest, LateArrivalRequest, LeaveRequest, PendingCounter
+
+QUEUES = {
+    'leave': LeaveRequest,
+    'early_out': EarlyClockOutRequest,
+    'late_arrival': LateArrivalRequest,
+}
+QUEUE_OF = {model: name for name, model in QUEUES.items()}
+COUNTS_CACHE_KEY = 'hr:pending_counts'
+# Bounds how long a count can stay stale if a fill races an update.
+COUNTS_CACHE_TIMEOUT = 60
+
+
+def _invalidate():
+    transaction.on_commit(lambda: cache.delete(COUNTS_CACHE_KEY))
+
+
+def adjust(model, delta):
+    """Moves the queue's counter by `delta` inside the caller's transaction."""
+    name = QUEUE_OF[model]
+    if not PendingCounter.objects.filter(name=name).update(count=F('count') + delta, updated_at=timezone.now()):
+        reconcile([name])  # row missing: count it from scratch
+    _invalidate()
+
+
+def status_delta(old_status, new_status):
+    """+1 entering Pending, -1 leaving it, 0 otherwise."""
+    return (new_status == 'Pending') - (old_status == 'Pending')
+
+
+def pending_counts():
+    """{'leave': n, 'early_out': n, 'late_arrival': n}; one cache read when warm."""
+    counts = cache.get(COUNTS_CACHE_KEY)
+    if counts is None:
+        counts = dict.fromkeys(QUEUES, 0)
+        counts.update(PendingCounter.objects.filter(name__in=QUEUES).values_list('name', 'count'))
+        cache.set(COUNTS_CACHE_KEY, counts, COUNTS_CACHE_TIMEOUT)
+    return counts
+
+
+def reconcile(names=None):
+    """
+    Recounts the queues from their tables and fixes the counters. Returns
+    [(name, stored, actual)] for the counters that had drifted.
+    """
+    drifted = []
+    for name in names or QUEUES:
+        with transaction.atomic():
+            # Lock first: adjustments committed before the lock are in the count, later ones queue behind it.
+            counter, _ = PendingCounter.objects.select_for_update().get_or_create(name=name)
+            actual = QUEUES[name].objects.filter(status='Pending').count()
+            if counter.count != actual:
+                drifted.append((name, counter.count, actual))
+                counter.count = actual
+                counter.save()
+    _invalidate()
+    return drifted
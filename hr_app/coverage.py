@@ -0,0 +1,136 @@
+# hr_app/coverage.py
+"""
+Department leave coverage: how many people of a department are out per day.
+
+For each department we keep two day-indexed arrays over the next
+HORIZON_DAYS (approved and pending leave), built with a difference array and
+one prefix sum from a single query. Arrays live in the cache, keyed on a
+per-department generation. When a leave is created, changes status or is
+deleted, that generation is bumped with an atomic incr once the transaction
+commits: concurrent changes cannot lose each other's update, a rolled-back
+change never touches the cache, and the next read rebuilds just that
+department.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .caching import bump_generation, generation, generations
+from .models import EmployeeProfile, LeaveRequest
+
+HORIZON_DAYS = 90
+COVERAGE_CACHE_TIMEOUT = 60 * 60
+COVERAGE_GENERATION_KEY = 'hr:coverage:generation'
+TRACKED_STATUSES = ('Approved', 'Pending')
+
+
+def _department_generation_key(department_id):
+    return f'hr:coverage:generation:{department_id}'
+
+
+def _keys(department_ids):
+    """{department_id: cache key}, from the global and per-department generations (one get_many)."""
+    generation_keys = {department_id: _department_generation_key(department_id) for department_id in department_ids}
+    current = generations(list(generation_keys.values()))
+    base = generation(COVERAGE_GENERATION_KEY)
+    return {
+        department_id: f'hr:coverage:{base}:{department_id}:{current[key]}'
+        for department_id, key in generation_keys.items()
+    }
+
+
+def invalidate_all():
+    """Headcounts or department membership changed: rebuild on next read."""
+    bump_generation(COVERAGE_GENERATION_KEY)
+
+
+def build_coverage(start, department_ids=None):
+    """
+    {department_id: entry} computed from the database (2 queries).
+    entry = {'start': date, 'headcount': int, 'Approved': [..], 'Pending': [..]}
+    """
+    last = start + timedelta(days=HORIZON_DAYS - 1)
+
+    profiles = EmployeeProfile.objects.exclude(status='Deactivated').filter(department__isnull=False)
+    leaves = LeaveRequest.objects.filter(
+        status__in=TRACKED_STATUSES,
+        start_date__lte=last,
+        end_date__gte=start,
+        employee__department__isnull=False,
+    ).exclude(employee__status='Deactivated')
+    if department_ids is not None:
+        profiles = profiles.filter(department_id__in=department_ids)
+        leaves = leaves.filter(employee__department_id__in=department_ids)
+
+    entries = {}
+
+    def entry_for(department_id):
+        if department_id not in entries:
+            # Difference arrays (one extra slot for the closing -1).
+            entries[department_id] = {'start': start, 'headcount': 0,
+                                      **{status: [0] * (HORIZON_DAYS + 1) for status in TRACKED_STATUSES}}
+        return entries[department_id]
+
+    for row in profiles.values('department_id').annotate(n=Count('id')):
+        entry_for(row['department_id'])['headcount'] = row['n']
+    for department_id in department_ids or ():
+        entry_for(department_id)
+
+    for department_id, leave_start, leave_end, status in leaves.values_list(
+        'employee__department_id', 'start_date', 'end_date', 'status'
+    ):
+        diff = entry_for(department_id)[status]
+        diff[max(0, (leave_start - start).days)] += 1
+        diff[min(HORIZON_DAYS - 1, (leave_end - start).days) + 1] -= 1
+
+    for entry in entries.values():
+        for status in TRACKED_STATUSES:
+            running, counts = 0, []
+            for delta in entry[status][:HORIZON_DAYS]:
+                running += delta
+                counts.append(running)
+            entry[status] = counts
+    return entries
+
+
+def get_coverage(department_ids):
+    """Cached entries for the given departments, rebuilding only what is missing or stale."""
+    today = timezone.localdate()
+    keys = _keys(department_ids)
+    cached = cache.get_many(keys.values())
+
+    result, missing = {}, []
+    for department_id, key in keys.items():
+        entry = cached.get(key)
+        if entry and entry['start'] == today:
+            result[department_id] = entry
+        else:
+            missing.append(department_id)
+
+    if missing:
+        fresh = build_coverage(today, missing)
+        cache.set_many({keys[d]: fresh[d] for d in missing}, COVERAGE_CACHE_TIMEOUT)
+        result.update({d: fresh[d] for d in missing})
+    return result
+
+
+def leave_changed(department_id, status):
+    """A leave with `status` was added to or removed from a department: rebuild it after commit."""
+    if department_id is None or status not in TRACKED_STATUSES:
+        return
+    transaction.on_commit(lambda: bump_generation(_department_generation_key(department_id)))
+
+
+def peak_out(entry, start_date, end_date, include_pending=False):
+    """(most people out on any day of the range, that day) within the horizon."""
+    first = max(0, (start_date - entry['start']).days)
+    last = min(HORIZON_DAYS - 1, (end_date - entry['start']).days)
+    best, best_day = 0, None
+    for i in range(first, last + 1):
+        out = entry['Approved'][i] + (entry['Pending'][i] if include_pending else 0)
+        if out > best or best_day is None:
+            best, best_day = out, entry['start'] + timedelta(days=i)
+    return best, best_day
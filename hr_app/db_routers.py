@@ -0,0 +1,48 @@
+# hr_app/db_routers.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+# Set while a report/dashboard view is running. Everything else (and every
+# write) keeps going to 'default', so a user never reads their own stale data.
+_use_replica = ContextVar('hr_use_replica', default=False)
+
+
+@contextmanager
+def use_replica():
+    """Routes reads inside the block to the replica, if one is configured."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_reads(view_func):
+    """Decorator for read-only report views: run the whole view on the replica."""
+    @wraps(view_func)
+    def _wrapped(*args, **kwargs):
+        with use_replica():
+            return view_func(*args, **kwargs)
+    return _wrapped
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so cross-alias relations are fine.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,67 @@
+# hr_app/leaves.py
+"""
+Leave overlap rules.
+
+An employee may not hold two active (pending or approved) leaves covering the
+same day. Single requests are checked with one probe on the partial
+(employee, start_date, end_date) index; imported batches are checked with a
+sort-and-sweep over the batch plus the employees' existing leaves.
+"""
+from collections import namedtuple
+
+from .models import LeaveRequest
+
+ACTIVE_STATUSES = ('Pending', 'Approved')
+
+Overlap = namedtuple('Overlap', ['leave', 'conflicts_with'])
+
+
+def overlapping_leaves(employee_id, start_date, end_date, exclude_pk=None):
+    """The first active leave of the employee overlapping [start_date, end_date], or None."""
+    qs = LeaveRequest.objects.filter(
+        employee_id=employee_id,
+        status__in=ACTIVE_STATUSES,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+    )
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    return qs.only('status', 'start_date', 'end_date').order_by('start_date').first()
+
+
+def find_overlaps(leaves, check_existing=True):
+    """
+    Overlaps among a batch of unsaved LeaveRequests and, optionally, the
+    employees' active leaves already in the database (one query).
+    Returns a list of Overlap(leave, conflicts_with); the batch is valid when
+    it is empty. O(n log n) in the batch size.
+    """
+    batch = [leave for leave in leaves if leave.status in ACTIVE_STATUSES]
+    for leave in batch:
+        if leave.end_date < leave.start_date:
+            raise ValueError(f"{leave}: end date {leave.end_date} is before start date {leave.start_date}.")
+
+    items = list(batch)
+    if check_existing and batch:
+        items += LeaveRequest.objects.filter(
+            employee_id__in={leave.employee_id for leave in batch},
+            status__in=ACTIVE_STATUSES,
+            start_date__lte=max(leave.end_date for leave in batch),
+            end_date__gte=min(leave.start_date for leave in batch),
+        ).only('employee_id', 'status', 'start_date', 'end_date')
+
+    # Sweep each employee's leaves in start order, remembering the one that
+    # reaches furthest; anything starting on or before its end overlaps it.
+    items.sort(key=lambda leave: (leave.employee_id, leave.start_date))
+    overlaps = []
+    reach = None
+    for leave in items:
+        if reach is not None and reach.employee_id == leave.employee_id and leave.start_date <= reach.end_date:
+            # Report against the batch entry; saved-vs-saved clashes are not ours to flag.
+            if leave.pk is None:
+                overlaps.append(Overlap(leave, reach))
+            elif reach.pk is None:
+                overlaps.append(Overlap(reach, leave))
+        if reach is None or reach.employee_id != leave.employee_id or leave.end_date > reach.end_date:
+            reach = leave
+    return overlaps
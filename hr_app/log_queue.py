@@ -0,0 +1,33 @@
+# hr_app/log_queue.py
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_listeners = {}
+
+
+def queued_logger(name):
+    """
+    Returns `name`'s logger with its configured handlers moved behind a
+    QueueListener thread. Callers only pay for a queue.put(); formatting and
+    I/O happen off the request path.
+    """
+    logger = logging.getLogger(name)
+    if name in _listeners:
+        return logger
+
+    handlers = list(logger.handlers)
+    if not handlers:
+        return logger  # nothing configured for it; let records propagate as usual
+
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    _listeners[name] = listener
+    return logger
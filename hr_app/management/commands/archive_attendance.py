@@ -0,0 +1,33 @@
+# hr_app/management/commands/archive_attendance.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from hr_app.archiving import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "Moves completed shifts from closed months into AttendanceArchive + monthly summaries, in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-months', type=int, default=1,
+                            help="Closed months to keep live besides the current one (default: 1).")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between batches to leave room for live traffic.")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['keep_months'])
+        self.stdout.write(f"Archiving completed shifts that started before {cutoff:%Y-%m-%d %H:%M %Z}")
+
+        moved = 0
+        while True:
+            count = archive_batch(cutoff, options['batch_size'])
+            if not count:
+                break
+            moved += count
+            self.stdout.write(f"  ... {moved} rows archived")
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. {moved} rows archived."))
@@ -0,0 +1,55 @@
+# hr_app/management/commands/bench_cold_start.py
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from hr_app.startup import DEFERRED_MODULES, import_chain, measure_cold_start, package_totals
+
+PROFILES = {
+    'full': {'SERVERLESS': '0'},
+    'serverless': {'SERVERLESS': '1'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures cold-start time-to-first-response (fresh interpreter -> WSGI import -> one request) "
+        "for the full and the serverless settings profile. --importtime adds an import-time report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/login/', help="Request served by each cold process.")
+        parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help="Profile to measure (repeatable, default: both).")
+        parser.add_argument('--importtime', action='store_true',
+                            help="Also run once under -X importtime and show the slowest imports.")
+        parser.add_argument('--top', type=int, default=15)
+
+    def handle(self, *args, **options):
+        for name in options['profile'] or ['full', 'serverless']:
+            env = PROFILES[name]
+            runs = [measure_cold_start(options['path'], env) for _ in range(options['runs'])]
+            self.stdout.write(f"\n== {name} ({runs[0]['status']}, {len(runs[0]['modules'])} modules) ==")
+            for key in ('import_ms', 'first_request_ms', 'total_ms'):
+                values = [run[key] for run in runs]
+                self.stdout.write(f"  {key:<17} median {statistics.median(values):>7.1f}  min {min(values):>7.1f}")
+
+            loaded = [module for module in DEFERRED_MODULES if module in runs[0]['modules']]
+            self.stdout.write(f"  deferred modules loaded: {', '.join(loaded) or 'none'}")
+            if options['importtime']:
+                self._importtime_report(options['path'], env, options['top'], loaded)
+
+        self.stdout.write(self.style.SUCCESS("\nDone. total_ms includes interpreter startup."))
+
+    def _importtime_report(self, path, env, top, loaded):
+        records = measure_cold_start(path, env, importtime=True)['imports']
+        self.stdout.write(f"  slowest imports (cumulative, top {top}):")
+        for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+            self.stdout.write(f"    {record.cumulative_us / 1000:>7.1f} ms  {record.module}")
+        self.stdout.write(f"  self time by package (top {top}):")
+        for package, self_us in package_totals(records)[:top]:
+            self.stdout.write(f"    {self_us / 1000:>7.1f} ms  {package}")
+        for module in loaded:
+            parents = import_chain(records, module)[1:]
+            self.stdout.write(f"  {module} imported via: {' <- '.join(parents) or '(top level)'}")
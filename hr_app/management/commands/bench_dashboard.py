@@ -0,0 +1,54 @@
+# hr_app/management/commands/bench_dashboard.py
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hr_app.models import Announcement, EmployeeProfile
+
+BENCH_USERNAME = 'bench_dashboard_user'
+
+
+class Command(BaseCommand):
+    help = "Benchmarks EmployeeDashboardView render time and query count, cold vs warm announcement cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+
+    def handle(self, *args, **options):
+        n = options['iterations']
+        User.objects.filter(username=BENCH_USERNAME).delete()
+        user = User.objects.create(username=BENCH_USERNAME, first_name='Bench')
+        EmployeeProfile.objects.create(user=user, employee_id='BENCH0001', job_title='Bench')
+
+        client = Client()
+        client.force_login(user)
+        url = reverse('employee_dashboard')
+
+        try:
+            cache.clear()
+            cold_ms, cold_queries, cold_announcement = self._measure(client, url, 1)
+            warm_ms, warm_queries, warm_announcement = self._measure(client, url, n)
+        finally:
+            user.delete()
+
+        self.stdout.write(f"Announcements in DB: {Announcement.objects.count()}")
+        self.stdout.write(f"Cold cache : {cold_ms:.2f} ms, {cold_queries} queries ({cold_announcement} announcement)")
+        self.stdout.write(f"Warm cache : {warm_ms:.2f} ms, {warm_queries} queries ({warm_announcement} announcement) [mean of {n}]")
+
+    def _measure(self, client, url, n):
+        total = 0.0
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(n):
+                start = time.perf_counter()
+                response = client.get(url, HTTP_HOST='localhost')
+                total += time.perf_counter() - start
+                assert response.status_code == 200, response.status_code
+        queries = ctx.captured_queries
+        announcement_queries = sum('hr_app_announcement' in q['sql'] for q in queries)
+        return total / n * 1000, len(queries) // n, announcement_queries // n
@@ -0,0 +1,43 @@
+# hr_app/management/commands/bench_db_connections.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Measures per-request connection overhead: fresh connect vs a reused (persistent/pooled) connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--database', default='default')
+
+    def _one_query(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        n = options['iterations']
+        conn = connections[alias]
+
+        # 1. New connection per "request" (CONN_MAX_AGE = 0 behaviour)
+        start = time.perf_counter()
+        for _ in range(n):
+            conn.close()
+            self._one_query(conn)
+        fresh = (time.perf_counter() - start) / n
+
+        # 2. Same connection reused across "requests" (CONN_MAX_AGE > 0 / pool)
+        self._one_query(conn)
+        start = time.perf_counter()
+        for _ in range(n):
+            self._one_query(conn)
+        reused = (time.perf_counter() - start) / n
+        conn.close()
+
+        self.stdout.write(f"Database: {alias} ({conn.vendor})")
+        self.stdout.write(f"Fresh connection per request : {fresh * 1000:.3f} ms")
+        self.stdout.write(f"Reused connection            : {reused * 1000:.3f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Connection setup overhead    : {(fresh - reused) * 1000:.3f} ms/request"))
@@ -0,0 +1,34 @@
+# hr_app/management/commands/compute_attendance_stats.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hr_app.analytics import compute_period_stats
+
+
+class Command(BaseCommand):
+    help = "Computes per-employee lateness, early-leave and overtime totals per month (AttendancePeriodStats)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int)
+        parser.add_argument('--month', type=int)
+        parser.add_argument('--months', type=int, default=1,
+                            help="Number of months to compute, ending at --year/--month (default: last month).")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        year = options['year'] or (today.year if today.month > 1 else today.year - 1)
+        month = options['month'] or (today.month - 1 or 12)
+
+        periods = []
+        for _ in range(options['months']):
+            periods.append((year, month))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+        started = time.perf_counter()
+        for year, month in reversed(periods):
+            t0 = time.perf_counter()
+            written = compute_period_stats(year, month)
+            self.stdout.write(f"  {year}-{month:02d}: {written} employees in {time.perf_counter() - t0:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.2f}s."))
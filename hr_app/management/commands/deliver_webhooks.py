@@ -0,0 +1,40 @@
+# hr_app/management/commands/deliver_webhooks.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hr_app.webhooks import DELIVERED_KEEP_DAYS, deliver_pending, purge_delivered
+
+
+class Command(BaseCommand):
+    help = (
+        "Pushes pending outbox events to the webhook destinations in batches (run one worker at a time: "
+        "from cron, or with --loop)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('destinations', nargs='*', metavar='DESTINATION',
+                            help="Destinations to drain (default: every one with a URL).")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when drained.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop.")
+        parser.add_argument('--keep-days', type=int, default=DELIVERED_KEEP_DAYS,
+                            help="Delivered events older than this are deleted after each run.")
+
+    def handle(self, *args, **options):
+        unknown = set(options['destinations']) - set(settings.WEBHOOK_DESTINATIONS)
+        if unknown:
+            raise CommandError(f"Unknown destination(s): {', '.join(sorted(unknown))}")
+
+        while True:
+            for name, (delivered, error) in deliver_pending(options['destinations'] or None).items():
+                if delivered or error:
+                    self.stdout.write(f"  {name}: {delivered} delivered" + (f", retrying later ({error})" if error else ""))
+            purged = purge_delivered(options['keep_days'])
+            if purged:
+                self.stdout.write(f"  {purged} old delivered events purged")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS("Done."))
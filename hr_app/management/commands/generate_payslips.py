@@ -0,0 +1,33 @@
+# hr_app/management/commands/generate_payslips.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from hr_app.payslips import generate_payslips
+
+
+class Command(BaseCommand):
+    help = "Generates the month's payslips for every employee; only payslips whose inputs changed are re-rendered."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help="Defaults to the previous month's year.")
+        parser.add_argument('--month', type=int, help="Defaults to the previous month.")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Render processes (default: one per CPU; 1 renders in-process).")
+        parser.add_argument('--force', action='store_true', help="Re-render every payslip.")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        default = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+        year = options['year'] or default[0]
+        month = options['month'] or default[1]
+        if not 1 <= month <= 12:
+            raise CommandError("--month must be between 1 and 12.")
+
+        started = time.monotonic()
+        result = generate_payslips(year, month, workers=options['workers'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{year}/{month:02d}: {result['generated']} generated, {result['unchanged']} unchanged "
+            f"of {result['total']} in {time.monotonic() - started:.1f}s."
+        ))
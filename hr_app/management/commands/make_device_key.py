@@ -0,0 +1,45 @@
+# hr_app/management/commands/make_device_key.py
+from django.core.management.base import BaseCommand, CommandError
+
+from hr_app.models import Department, EmployeeProfile, PunchDevice
+from hr_app.punches import device_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Registers a kiosk or phone for offline punches (POST /api/punches/) and prints the HMAC key it signs with. "
+        "A device only punches for the employee, department or (--site-wide) everyone it is registered for."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('device_id')
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument('--employee', help="Employee ID (e.g. EMP0042): a personal phone.")
+        scope.add_argument('--department', help="Department name: a department kiosk.")
+        scope.add_argument('--site-wide', action='store_true', help="A front-desk kiosk for every employee.")
+
+    def handle(self, *args, **options):
+        device_id = options['device_id']
+        if len(device_id) > 64:
+            raise CommandError("Device IDs are at most 64 characters.")
+        scope = {'employee': None, 'department': None, 'site_wide': options['site_wide']}
+        if options['employee']:
+            scope['employee'] = EmployeeProfile.objects.filter(employee_id=options['employee']).first()
+            if scope['employee'] is None:
+                raise CommandError(f"No employee with ID {options['employee']}.")
+        elif options['department']:
+            scope['department'] = Department.objects.filter(name=options['department']).first()
+            if scope['department'] is None:
+                raise CommandError(f"No department named {options['department']}.")
+
+        existing = PunchDevice.objects.filter(device_id=device_id).first()
+        if existing is not None and not existing.is_active:
+            raise CommandError(f"Device {device_id} was revoked; register the replacement under a new ID.")
+        PunchDevice.objects.update_or_create(device_id=device_id, defaults=scope)
+
+        self.stdout.write(device_key(device_id))
+        self.stderr.write(
+            "Sign HMAC-SHA256 over 'key|employee|ts|lat|lon|device' (lat/lon to 6 decimals). "
+            "Keys derive from SECRET_KEY: rotating it revokes every device; "
+            "deactivate the device in the admin to revoke just this one."
+        )
@@ -0,0 +1,20 @@
+# hr_app/management/commands/make_profile_token.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hr_app.profiling import PROFILE_MODES, make_profile_token
+
+
+class Command(BaseCommand):
+    help = "Prints a signed token that lets a staff user profile requests (X-HR-Profile header or ?__profile=)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=PROFILE_MODES, default='cprofile',
+                            help="cprofile writes a .prof file; sample writes flamegraph-ready collapsed stacks.")
+
+    def handle(self, *args, **options):
+        token = make_profile_token(options['mode'])
+        self.stdout.write(token)
+        self.stderr.write(
+            f"Valid for {settings.PROFILE_TOKEN_MAX_AGE}s. Files go to {settings.PROFILE_SPOOL_DIR}."
+        )
@@ -0,0 +1,21 @@
+# hr_app/management/commands/reconcile_pending_counters.py
+from django.core.management.base import BaseCommand, CommandError
+
+from hr_app.counters import QUEUES, reconcile
+
+
+class Command(BaseCommand):
+    help = "Recounts pending leave / early-out / late-arrival requests and repairs the nav badge counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('queues', nargs='*', metavar='QUEUE',
+                            help=f"Queues to recount (default: all of {', '.join(QUEUES)}).")
+
+    def handle(self, *args, **options):
+        unknown = set(options['queues']) - set(QUEUES)
+        if unknown:
+            raise CommandError(f"Unknown queue(s): {', '.join(sorted(unknown))}")
+        drifted = reconcile(options['queues'] or None)
+        for name, stored, actual in drifted:
+            self.stdout.write(f"  {name}: counter said {stored}, {actual} pending")
+        self.stdout.write(self.style.SUCCESS(f"Done. {len(drifted)} counter(s) repaired."))
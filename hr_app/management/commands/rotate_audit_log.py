@@ -0,0 +1,36 @@
+# hr_app/management/commands/rotate_audit_log.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hr_app.archiving import archive_cutoff
+from hr_app.audit import rotate_batch
+
+
+class Command(BaseCommand):
+    help = "Moves audit events from older months into AuditEventArchive, in small batches (run monthly from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-months', type=int, default=None,
+                            help="Closed months to keep live besides the current one (default: AUDIT_KEEP_MONTHS).")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        keep = options['keep_months'] if options['keep_months'] is not None else settings.AUDIT_KEEP_MONTHS
+        cutoff = archive_cutoff(keep)
+        self.stdout.write(f"Rotating audit events recorded before {cutoff:%Y-%m-%d %H:%M %Z}")
+
+        moved = 0
+        while True:
+            count = rotate_batch(cutoff, options['batch_size'])
+            if not count:
+                break
+            moved += count
+            self.stdout.write(f"  ... {moved} events moved")
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. {moved} events moved to the archive."))
@@ -0,0 +1,86 @@
+# hr_app/management/commands/run_benchmarks.py
+import json
+import platform
+import sys
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from hr_app.benchmarks import CASES, compare, run_suite
+from hr_app.models import EmployeeProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the hot views/model methods (wall time, queries, peak memory) and writes JSON. "
+        "Use --compare OLD NEW to flag regressions between two runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='bench_results.json')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--case', action='append', choices=sorted(CASES), help="Run only this case (repeatable).")
+        parser.add_argument('--scales', default='',
+                            help="Comma-separated employee counts, e.g. 50,200,1000. Tops up the CURRENT database "
+                                 "with seed_workforce before each step, so point DATABASE_URL at a scratch DB.")
+        parser.add_argument('--years', type=float, default=1.0, help="History generated per seeded employee.")
+        parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'))
+        parser.add_argument('--threshold', type=float, default=0.20,
+                            help="Allowed median slowdown before flagging (fraction, default 0.20).")
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            return self._compare(*options['compare'], options['threshold'])
+
+        scales = [int(s) for s in options['scales'].split(',') if s.strip()]
+        results = []
+        for step, target in enumerate(scales or [None]):
+            if target is not None:
+                missing = target - EmployeeProfile.objects.count()
+                if missing > 0:
+                    self.stdout.write(f"Seeding {missing} employees to reach scale {target} ...")
+                    call_command('seed_workforce', employees=missing, years=options['years'],
+                                 seed=step, departments=8, stdout=self.stdout)
+            scale = EmployeeProfile.objects.count()
+            self.stdout.write(f"\n== scale: {scale} employees ==")
+            for row in run_suite(options['case'], options['iterations']):
+                row['scale'] = scale
+                results.append(row)
+                self.stdout.write(
+                    f"  {row['case']:<26} median {row['median_ms']:>9.2f} ms  p95 {row['p95_ms']:>9.2f} ms  "
+                    f"{row['queries']:>5} queries  peak {row['peak_kb']:>9.1f} KB"
+                )
+
+        doc = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'python': sys.version.split()[0],
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'database': connection.vendor,
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(doc, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"\nWrote {len(results)} results to {options['output']}"))
+
+    def _compare(self, baseline_path, current_path, threshold):
+        try:
+            with open(baseline_path) as fh:
+                baseline = json.load(fh)
+            with open(current_path) as fh:
+                current = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read benchmark results: {exc}")
+
+        regressions = compare(baseline, current, threshold)
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions."))
+            return
+        for (scale, case), metric, before, after in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION scale={scale} {case}: {metric} {before} -> {after}"))
+        raise CommandError(f"{len(regressions)} regression(s) found.")
@@ -0,0 +1,39 @@
+# hr_app/management/commands/run_offboarding.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from hr_app.offboarding import pending_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Purges / anonymises the history of offboarded employees in small batches (run from cron, one at a time)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between batches to leave room for live traffic.")
+        parser.add_argument('--max-seconds', type=float, default=None,
+                            help="Stop (resumably) after this long; unfinished jobs continue on the next run.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        deadline = started + options['max_seconds'] if options['max_seconds'] else None
+
+        finished = failed = 0
+        for job in pending_jobs():
+            self.stdout.write(f"  {job.employee_label}: {job.mode} (from step '{job.step or 'start'}')")
+            try:
+                done = run_job(job, options['batch_size'], options['pause'], deadline)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"    failed: {exc!r}"))
+                continue
+            self.stdout.write(f"    {job.rows_processed:,} rows, {'done' if done else 'paused at ' + job.step}")
+            if not done:
+                break
+            finished += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{finished} job(s) finished, {failed} failed in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,61 @@
+# hr_app/management/commands/scan_attendance_anomalies.py
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from hr_app.anomalies import AnomalyFixError, FIXES, apply_fix, reset_checkpoints, scan_attendance, scan_punches
+from hr_app.models import AttendanceAnomaly
+
+
+class Command(BaseCommand):
+    help = (
+        "Flags suspicious shifts and punches changed since the last run (run nightly from cron). "
+        "The first run, or one with --reset, scans everything."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--reset', action='store_true',
+                            help="Forget the high-water marks and rescan every row.")
+        parser.add_argument('--autofix', nargs='*', choices=sorted(FIXES), metavar='KIND',
+                            help=f"Apply the auto-fix to open anomalies of these kinds (all fixable kinds "
+                                 f"when none are named): {', '.join(sorted(FIXES))}.")
+        parser.add_argument('--as-user', default=None,
+                            help="Username recorded in the audit trail for auto-fixes.")
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_checkpoints()
+            self.stdout.write("High-water marks cleared; scanning everything.")
+
+        started = time.perf_counter()
+        shifts, shift_findings = scan_attendance(options['chunk_size'])
+        punches, punch_findings = scan_punches(options['chunk_size'])
+        self.stdout.write(
+            f"Scanned {shifts} shifts and {punches} punches in {time.perf_counter() - started:.1f}s; "
+            f"{shift_findings + punch_findings} findings (already-known ones are not filed again)."
+        )
+
+        if options['autofix'] is not None:
+            self._autofix(options['autofix'] or sorted(FIXES), options['as_user'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {AttendanceAnomaly.objects.filter(status='open').count()} anomalies open for review."
+        ))
+
+    def _autofix(self, kinds, username):
+        user = None
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"No user named {username!r}.")
+        fixed = skipped = 0
+        for anomaly in list(AttendanceAnomaly.objects.filter(status='open', kind__in=kinds).order_by('id')):
+            try:
+                apply_fix(anomaly, user)
+                fixed += 1
+            except AnomalyFixError as exc:
+                skipped += 1
+                self.stdout.write(f"  skipped #{anomaly.pk} ({anomaly.kind}): {exc}")
+        self.stdout.write(f"Auto-fixed {fixed} anomalies, {skipped} left for review.")
@@ -0,0 +1,265 @@
+# hr_app/management/commands/seed_workforce.py
+import csv
+import io
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from hr_app.models import (
+    Attendance,
+    Department,
+    EarlyClockOutRequest,
+    EmployeeProfile,
+    LateArrivalRequest,
+    LeaveRequest,
+)
+from hr_app import counters, coverage
+from hr_app.search import rebuild_search_index
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Akhil', 'Anjali', 'Arjun', 'Deepa', 'Fathima', 'Gokul', 'Hari', 'Irfan',
+    'Kavya', 'Lakshmi', 'Manu', 'Meera', 'Nikhil', 'Priya', 'Rahul', 'Riya', 'Sanjay', 'Sneha',
+    'Tara', 'Varun', 'Vishnu', 'Zara',
+]
+LAST_NAMES = [
+    'Ahmed', 'Bhat', 'Das', 'Fernandes', 'Iyer', 'Joseph', 'Kumar', 'Menon', 'Nair', 'Pillai',
+    'Rao', 'Reddy', 'Shah', 'Thomas', 'Varghese', 'Verma',
+]
+DEPARTMENT_NAMES = [
+    'Engineering', 'Sales', 'Marketing', 'Finance', 'Human Resources', 'Operations',
+    'Support', 'Legal', 'Design', 'Logistics',
+]
+JOB_TITLES = ['Associate', 'Analyst', 'Engineer', 'Senior Engineer', 'Team Lead', 'Manager', 'Executive']
+HOURLY_RATES = [Decimal(r) for r in ('150.00', '200.00', '250.00', '300.00', '400.00', '550.00')]
+LEAVE_REASONS = ['Family function', 'Medical appointment', 'Personal work', 'Travel', 'Fever']
+LATE_REASONS = ['Traffic jam', 'Bus broke down', 'Heavy rain', 'Doctor visit in the morning']
+EARLY_REASONS = ['Feeling unwell', 'Child pickup', 'Bank work', 'Family emergency']
+
+
+class _TableWriter:
+    """
+    Buffers raw row tuples and writes them in chunks: COPY on Postgres,
+    executemany INSERT elsewhere. Going below the ORM keeps auto_now_add
+    from overwriting historical timestamps and skips model save() logic.
+    """
+
+    def __init__(self, model, field_names, batch_size):
+        self.model = model
+        self.fields = [model._meta.get_field(name) for name in field_names]
+        self.converters = [_converter(f) for f in self.fields]
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+        self.use_copy = connection.vendor == 'postgresql'
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(f.column) for f in self.fields)
+        if self.use_copy:
+            self.sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        else:
+            placeholders = ', '.join(['%s'] * len(self.fields))
+            self.sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        with connection.cursor() as cursor:
+            if self.use_copy:
+                self._copy(cursor.cursor)
+            else:
+                cursor.executemany(self.sql, [
+                    [convert(v) for convert, v in zip(self.converters, row)]
+                    for row in self.rows
+                ])
+        self.written += len(self.rows)
+        self.rows = []
+
+    def _copy(self, raw_cursor):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in self.rows:
+            writer.writerow(['' if v is None else v for v in row])
+        data = buffer.getvalue()
+        if hasattr(raw_cursor, 'copy_expert'):  # psycopg2
+            raw_cursor.copy_expert(self.sql, io.StringIO(data))
+        else:  # psycopg 3
+            with raw_cursor.copy(self.sql) as copy:
+                copy.write(data)
+
+
+def _converter(field):
+    """Python value -> DB parameter. Inlined for SQLite, where the generic
+    get_db_prep_save() path dominated the seeding profile."""
+    if connection.vendor == 'sqlite':
+        if isinstance(field, models.DateTimeField):
+            return lambda v: None if v is None else str(v.astimezone(dt_timezone.utc).replace(tzinfo=None))
+        if isinstance(field, models.DateField):
+            return lambda v: None if v is None else v.isoformat()
+        if isinstance(field, models.DecimalField):
+            return lambda v: None if v is None else str(v)
+        return lambda v: v
+    return lambda v: field.get_db_prep_save(v, connection)
+
+
+def _next_id(model):
+    return (model.objects.aggregate(m=Max('id'))['m'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = "Generates a deterministic synthetic workforce (employees + years of attendance/leave history) for load tests."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=8)
+        parser.add_argument('--employees', type=int, default=200)
+        parser.add_argument('--years', type=float, default=1.0, help="Years of history ending yesterday.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--password', default='changeme123', help="Password set for every generated user.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch = options['batch_size']
+        tz = timezone.get_current_timezone()
+        end_day = timezone.localdate() - timedelta(days=1)
+        start_day = end_day - timedelta(days=int(options['years'] * 365))
+        workdays = [
+            start_day + timedelta(days=i)
+            for i in range((end_day - start_day).days + 1)
+            if (start_day + timedelta(days=i)).weekday() < 5
+        ]
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            departments = self._departments(options['departments'])
+
+            ids = {model: _next_id(model) for model in (
+                User, EmployeeProfile, Attendance, LeaveRequest, EarlyClockOutRequest, LateArrivalRequest
+            )}
+            users = _TableWriter(User, ['id', 'password', 'is_superuser', 'username', 'first_name', 'last_name',
+                                        'email', 'is_staff', 'is_active', 'date_joined'], batch)
+            profiles = _TableWriter(EmployeeProfile, ['id', 'user_id', 'employee_id', 'profile_pic', 'department_id',
+                                                      'job_title', 'salary_per_hour', 'status'], batch)
+            attendance = _TableWriter(Attendance, ['id', 'employee_id', 'check_in', 'check_out'], batch)
+            leaves = _TableWriter(LeaveRequest, ['id', 'employee_id', 'reason', 'start_date', 'end_date',
+                                                 'status', 'created_at'], batch)
+            early_outs = _TableWriter(EarlyClockOutRequest, ['id', 'employee_id', 'attendance_id', 'reason',
+                                                             'requested_at', 'status'], batch)
+            late_arrivals = _TableWriter(LateArrivalRequest, ['id', 'employee_id', 'reason', 'requested_at',
+                                                              'status'], batch)
+
+            # Hashing is deliberately slow; do it once and share the hash.
+            password = make_password(options['password'])
+            joined = timezone.make_aware(datetime.combine(start_day, datetime.min.time()), tz)
+
+            for _ in range(options['employees']):
+                user_id, profile_id = ids[User], ids[EmployeeProfile]
+                ids[User] += 1
+                ids[EmployeeProfile] += 1
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                username = f'emp{profile_id:07d}'
+                users.add((user_id, password, False, username, first, last,
+                           f'{username}@example.com', False, True, joined))
+                profiles.add((profile_id, user_id, f'EMP{profile_id:07d}', '', rng.choice(departments),
+                              rng.choice(JOB_TITLES), rng.choice(HOURLY_RATES), 'Active'))
+
+                on_leave = set()
+                last_leave_end = None
+                for day in self._leave_days(rng, workdays):
+                    # Days come sorted: skip any an earlier leave already covers, so no
+                    # two leaves of an employee overlap (leave_no_active_overlap).
+                    if last_leave_end is not None and day <= last_leave_end:
+                        continue
+                    length = rng.choices([1, 2, 3, 5], weights=[60, 20, 15, 5])[0]
+                    leave_end = last_leave_end = day + timedelta(days=length - 1)
+                    recent = (end_day - day).days < 14
+                    status = 'Pending' if recent and rng.random() < 0.5 else rng.choices(
+                        ['Approved', 'Rejected'], weights=[85, 15])[0]
+                    created = timezone.make_aware(datetime.combine(day - timedelta(days=rng.randint(1, 10)),
+                                                                   datetime.min.time()), tz) + timedelta(hours=10)
+                    leaves.add((ids[LeaveRequest], profile_id, rng.choice(LEAVE_REASONS), day, leave_end,
+                                status, created))
+                    ids[LeaveRequest] += 1
+                    if status == 'Approved':
+                        on_leave.update(day + timedelta(days=i) for i in range(length))
+
+                for day in workdays:
+                    if day in on_leave or rng.random() < 0.03:  # leave or unexplained absence
+                        continue
+                    nine_am = timezone.make_aware(datetime(day.year, day.month, day.day, 9, 0), tz)
+                    six_pm = nine_am + timedelta(hours=9)
+                    attendance_id = ids[Attendance]
+                    ids[Attendance] += 1
+
+                    if rng.random() < 0.07:  # late arrival, clocked in by HR approval
+                        check_in = nine_am + timedelta(seconds=rng.randint(11 * 60, 90 * 60))
+                        late_arrivals.add((ids[LateArrivalRequest], profile_id, rng.choice(LATE_REASONS),
+                                           check_in, 'Approved'))
+                        ids[LateArrivalRequest] += 1
+                    else:
+                        check_in = nine_am + timedelta(seconds=rng.randint(0, 600))
+
+                    if rng.random() < 0.03:  # approved early out
+                        check_out = six_pm - timedelta(seconds=rng.randint(15 * 60, 4 * 3600))
+                        early_outs.add((ids[EarlyClockOutRequest], profile_id, attendance_id,
+                                        rng.choice(EARLY_REASONS), check_out, 'Approved'))
+                        ids[EarlyClockOutRequest] += 1
+                    else:
+                        check_out = six_pm + timedelta(seconds=min(int(rng.expovariate(1 / 900)), 3 * 3600))
+
+                    attendance.add((attendance_id, profile_id, check_in, check_out))
+
+            # Django creates FKs as DEFERRABLE INITIALLY DEFERRED, so the order
+            # in which chunks were flushed inside this transaction is irrelevant.
+            writers = [users, profiles, attendance, leaves, early_outs, late_arrivals]
+            for writer in writers:
+                writer.flush()
+            self._reset_sequences()
+            # Raw inserts bypass the signals that maintain the directory search,
+            # the pending counters and the leave coverage cache.
+            search_documents = rebuild_search_index()
+            counters.reconcile()
+            coverage.invalidate_all()
+
+        elapsed = time.perf_counter() - started
+        for writer in writers:
+            self.stdout.write(f"  {writer.model.__name__:<22} {writer.written:>10,} rows")
+        self.stdout.write(f"  {'EmployeeSearchDocument':<22} {search_documents:>10,} rows")
+        total = sum(w.written for w in writers)
+        self.stdout.write(self.style.SUCCESS(f"Seeded {total:,} rows in {elapsed:.1f}s (seed={options['seed']})."))
+
+    def _departments(self, count):
+        ids = []
+        for i in range(count):
+            base = DEPARTMENT_NAMES[i % len(DEPARTMENT_NAMES)]
+            name = base if i < len(DEPARTMENT_NAMES) else f'{base} {i // len(DEPARTMENT_NAMES) + 1}'
+            ids.append(Department.objects.get_or_create(name=name)[0].id)
+        return ids
+
+    def _leave_days(self, rng, workdays):
+        """Roughly one leave request every two months, on a random workday."""
+        if not workdays:
+            return []
+        count = int(len(workdays) / 42) + rng.randint(0, 2)
+        return sorted(rng.sample(workdays, min(count, len(workdays))))
+
+    def _reset_sequences(self):
+        # Rows were inserted with explicit ids; move Postgres sequences past them.
+        statements = connection.ops.sequence_reset_sql(no_style(), [
+            User, EmployeeProfile, Attendance, LeaveRequest, EarlyClockOutRequest, LateArrivalRequest
+        ])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
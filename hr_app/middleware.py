@@ -0,0 +1,226 @@
+# hr_app/middleware.py
+import json
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template as DjangoBackendTemplate
+
+from .log_queue import queued_logger
+
+# One-element list holding the current request's template render seconds
+# (None = request not sampled). Mutated in place so the total survives
+# sync_to_async context copies.
+_template_time = ContextVar('hr_template_time', default=None)
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def _fingerprint(sql):
+    # Parameters are already separate from the SQL text; only collapse IN lists
+    # so "IN (%s, %s)" and "IN (%s, %s, %s)" count as the same statement.
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def _install_template_timer():
+    """Wraps the Django template backend once so render time can be attributed."""
+    if getattr(DjangoBackendTemplate.render, '_hr_timed', False):
+        return
+    original = DjangoBackendTemplate.render
+
+    def render(self, context=None, request=None):
+        bucket = _template_time.get()
+        if bucket is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            bucket[0] += time.perf_counter() - start
+
+    render._hr_timed = True
+    DjangoBackendTemplate.render = render
+
+
+class _SQLRecorder:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[_fingerprint(sql)] += 1
+
+
+def _recording(recorder):
+    """Applies recorder to every connection of the calling thread until the returned stack closes."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+    return stack
+
+
+# =========================================================
+# ⏱️ REQUEST TIMING (Server-Timing + structured logs)
+# =========================================================
+
+class RequestTimingMiddleware:
+    """
+    For a sampled share of requests, records query count, SQL time, repeated
+    statements (N+1 suspects), template render time and remaining Python time.
+    Emits them as a Server-Timing header and one JSON log line on the
+    'hr_app.timing' logger, which writes through a background queue. Like
+    ProfilingMiddleware it runs natively in both sync and async stacks.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_TIMING_SAMPLE_RATE', 1.0)
+        self.duplicate_threshold = getattr(settings, 'REQUEST_TIMING_DUPLICATE_THRESHOLD', 3)
+        self.logger = queued_logger('hr_app.timing')
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        _install_template_timer()
+
+    def _sampled(self):
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        recorder = _SQLRecorder()
+        bucket = [0.0]
+        token = _template_time.set(bucket)
+        start = time.perf_counter()
+        try:
+            with _recording(recorder):
+                response = self.get_response(request)
+        finally:
+            total = time.perf_counter() - start
+            _template_time.reset(token)
+        return self._report(request, response, recorder, total, bucket[0])
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        recorder = _SQLRecorder()
+        bucket = [0.0]
+        token = _template_time.set(bucket)
+        start = time.perf_counter()
+        # Connections are per thread: the ORM calls of an async request run in
+        # its thread-sensitive sync_to_async thread, so wrap those connections.
+        stack = await sync_to_async(_recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            total = time.perf_counter() - start
+            _template_time.reset(token)
+        return self._report(request, response, recorder, total, bucket[0])
+
+    def _report(self, request, response, recorder, total, template):
+        python = max(0.0, total - recorder.seconds - template)
+        duplicates = [
+            {'sql': sql[:300], 'count': count}
+            for sql, count in recorder.fingerprints.most_common()
+            if count >= self.duplicate_threshold
+        ]
+
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries"',
+            f'tpl;dur={template * 1000:.1f}',
+            f'py;dur={python * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        self.logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'sql_ms': round(recorder.seconds * 1000, 2),
+            'queries': recorder.count,
+            'template_ms': round(template * 1000, 2),
+            'python_ms': round(python * 1000, 2),
+            'duplicate_queries': duplicates,
+        }))
+        return response
+
+
+# =========================================================
+# 🔬 ON-DEMAND PROFILING (staff only, signed token)
+# =========================================================
+
+class ProfilingMiddleware:
+    """
+    Profiles a single request when a staff user sends a valid token from
+    `manage.py make_profile_token` as the X-HR-Profile header or the
+    __profile query parameter. The .prof / .collapsed file goes to
+    PROFILE_SPOOL_DIR. Requests without the flag only pay for the header and
+    query lookups, and under ASGI they stay on the event loop.
+    """
+    header = 'HTTP_X_HR_PROFILE'
+    query_param = '__profile'
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _mode(self, request):
+        token = request.META.get(self.header) or request.GET.get(self.query_param)
+        if not token:
+            return None
+        from .profiling import read_profile_token
+        return read_profile_token(token)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        mode = self._mode(request)
+        user = getattr(request, 'user', None) if mode else None
+        if not (user and user.is_authenticated and user.is_staff):
+            return self.get_response(request)
+
+        from .profiling import run_profiled
+
+        response, name = run_profiled(mode, request.path.strip('/') or 'root', self.get_response, request)
+        response['X-HR-Profile-File'] = name
+        return response
+
+    async def __acall__(self, request):
+        mode = self._mode(request)
+        user = await request.auser() if mode and hasattr(request, 'auser') else None
+        if not (user and user.is_authenticated and user.is_staff):
+            return await self.get_response(request)
+
+        from .profiling import arun_profiled
+
+        response, name = await arun_profiled(mode, request.path.strip('/') or 'root', self.get_response, request)
+        response['X-HR-Profile-File'] = name
+        return response
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:24
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0005_latearrivalrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('check_in', models.DateTimeField()),
+                ('check_out', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('shift_count', models.PositiveIntegerField(default=0)),
+                ('total_work_time', models.DurationField(default=datetime.timedelta(0))),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['employee', 'check_in'], name='attendance_emp_checkin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['check_in'], name='attendance_checkin_idx'),
+        ),
+        migrations.AddField(
+            model_name='attendancearchive',
+            name='employee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hr_app.employeeprofile'),
+        ),
+        migrations.AddField(
+            model_name='attendancemonthlysummary',
+            name='employee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hr_app.employeeprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancearchive',
+            index=models.Index(fields=['employee', 'check_in'], name='att_archive_emp_checkin_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancemonthlysummary',
+            constraint=models.UniqueConstraint(fields=('employee', 'year', 'month'), name='unique_attendance_month_summary'),
+        ),
+    ]
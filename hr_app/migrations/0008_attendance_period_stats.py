@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0007_change_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendancePeriodStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('shifts', models.PositiveIntegerField(default=0)),
+                ('late_shifts', models.PositiveIntegerField(default=0)),
+                ('late_minutes', models.PositiveIntegerField(default=0)),
+                ('early_leave_minutes', models.PositiveIntegerField(default=0)),
+                ('overtime_minutes', models.PositiveIntegerField(default=0)),
+                ('worked_minutes', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hr_app.employeeprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('employee', 'year', 'month'), name='unique_attendance_period_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:37
+
+from django.conf import settings
+import hr_app.constraints
+import hr_app.operations
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0008_attendance_period_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(condition=models.Q(('status__in', ['Pending', 'Approved'])), fields=['employee', 'start_date', 'end_date'], name='leave_emp_active_range_idx'),
+        ),
+        # Both are no-ops off Postgres (see hr_app.constraints). On Postgres a
+        # table that already holds overlapping active leaves fails here:
+        # resolve those rows and migrate again.
+        hr_app.operations.VendorRunSQL('postgresql', ['CREATE EXTENSION IF NOT EXISTS btree_gist'], migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='leaverequest',
+            constraint=hr_app.constraints.PostgresExclusionConstraint(condition=models.Q(('status__in', ['Pending', 'Approved'])), expressions=[('employee', '='), (hr_app.constraints.DateRange('start_date', 'end_date', models.Value('[]')), '&&')], name='leave_no_active_overlap'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0009_leave_overlap_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PunchEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('device_id', models.CharField(max_length=64)),
+                ('timestamp', models.DateTimeField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('outcome', models.CharField(choices=[('in', 'Clocked in'), ('out', 'Clocked out'), ('rejected', 'Rejected')], max_length=10)),
+                ('detail', models.CharField(blank=True, max_length=100)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='hr_app.employeeprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['employee', 'timestamp'], name='punch_emp_ts_idx')],
+            },
+        ),
+    ]
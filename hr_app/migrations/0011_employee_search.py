@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0010_punch_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSearchDocument',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='hr_app.employeeprofile')),
+                ('document', models.TextField()),
+                ('name', models.CharField(max_length=301)),
+                ('employee_code', models.CharField(max_length=10)),
+                ('department', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(max_length=20)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0012_offboarding_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payslip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('gross_salary', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('input_hash', models.CharField(max_length=64)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('file', models.CharField(max_length=200)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hr_app.employeeprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('employee', 'year', 'month'), name='unique_payslip_month')],
+            },
+        ),
+    ]
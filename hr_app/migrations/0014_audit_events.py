@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0013_payslip'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('actor_label', models.CharField(blank=True, max_length=150)),
+                ('action', models.CharField(choices=[('create', 'Created'), ('update', 'Updated'), ('approve', 'Approved'), ('reject', 'Rejected')], max_length=10)),
+                ('entity_type', models.CharField(max_length=100)),
+                ('entity_id', models.CharField(max_length=64)),
+                ('changes', models.JSONField(default=dict)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='audit_entity_history_idx'), models.Index(fields=['created_at'], name='audit_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuditEventArchive',
+            fields=[
+                ('created_at', models.DateTimeField()),
+                ('actor_label', models.CharField(blank=True, max_length=150)),
+                ('action', models.CharField(choices=[('create', 'Created'), ('update', 'Updated'), ('approve', 'Approved'), ('reject', 'Rejected')], max_length=10)),
+                ('entity_type', models.CharField(max_length=100)),
+                ('entity_id', models.CharField(max_length=64)),
+                ('changes', models.JSONField(default=dict)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='audit_arch_entity_history_idx')],
+            },
+        ),
+    ]
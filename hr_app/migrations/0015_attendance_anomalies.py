@@ -0,0 +1,81 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0014_audit_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('kind', models.CharField(choices=[('duplicate_open', 'Open shift followed by another shift'), ('zero_length', 'Zero or negative length shift'), ('over_24h', 'Shift longer than 24 hours'), ('overlap', 'Overlaps an earlier shift'), ('late_approval_overlap', 'Approved late arrival overlaps an existing shift'), ('gps_jump', 'Impossible distance between punches')], max_length=30)),
+                ('detail', models.CharField(max_length=255)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('fixed', 'Fixed'), ('dismissed', 'Dismissed')], default='open', max_length=10)),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScanCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='auditevent',
+            name='action',
+            field=models.CharField(choices=[('create', 'Created'), ('update', 'Updated'), ('approve', 'Approved'), ('reject', 'Rejected'), ('delete', 'Deleted')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='auditeventarchive',
+            name='action',
+            field=models.CharField(choices=[('create', 'Created'), ('update', 'Updated'), ('approve', 'Approved'), ('reject', 'Rejected'), ('delete', 'Deleted')], max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['updated_at', 'id'], name='attendance_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='attendanceanomaly',
+            name='attendance',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hr_app.attendance'),
+        ),
+        migrations.AddField(
+            model_name='attendanceanomaly',
+            name='employee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hr_app.employeeprofile'),
+        ),
+        migrations.AddField(
+            model_name='attendanceanomaly',
+            name='late_request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hr_app.latearrivalrequest'),
+        ),
+        migrations.AddField(
+            model_name='attendanceanomaly',
+            name='punch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hr_app.punchevent'),
+        ),
+        migrations.AddField(
+            model_name='attendanceanomaly',
+            name='resolved_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='attendanceanomaly',
+            index=models.Index(fields=['status', 'kind'], name='anomaly_status_kind_idx'),
+        ),
+    ]
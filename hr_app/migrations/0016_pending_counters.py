@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:02
+
+from django.db import migrations, models
+
+QUEUES = {'leave': 'LeaveRequest', 'early_out': 'EarlyClockOutRequest', 'late_arrival': 'LateArrivalRequest'}
+
+
+def seed_counters(apps, schema_editor):
+    PendingCounter = apps.get_model('hr_app', 'PendingCounter')
+    for name, model_name in QUEUES.items():
+        count = apps.get_model('hr_app', model_name).objects.filter(status='Pending').count()
+        PendingCounter.objects.create(name=name, count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0015_attendance_anomalies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30, unique=True)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
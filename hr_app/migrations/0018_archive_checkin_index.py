@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0017_webhook_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancearchive',
+            index=models.Index(fields=['check_in'], name='att_archive_checkin_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0019_punch_device'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendance',
+            name='attendance_checkin_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='attendancearchive',
+            name='att_archive_checkin_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['check_in', 'employee', 'check_out'], name='attendance_checkin_cov_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancearchive',
+            index=models.Index(fields=['check_in', 'employee', 'check_out'], name='att_archive_checkin_cov_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:45
+
+from django.db import migrations
+
+import hr_app.operations
+
+# Triggers keep the external-content FTS5 table in step with
+# hr_app_employeesearchdocument. SQLite drops triggers when a migration
+# rebuilds a table: a later migration that alters EmployeeSearchDocument
+# must re-run SQLITE_FTS (hr_app.search falls back to LIKE scans meanwhile).
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS hr_app_employee_fts USING fts5(
+        document, content='hr_app_employeesearchdocument', content_rowid='profile_id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS hr_app_employee_fts_ai AFTER INSERT ON hr_app_employeesearchdocument BEGIN
+        INSERT INTO hr_app_employee_fts(rowid, document) VALUES (new.profile_id, new.document);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS hr_app_employee_fts_ad AFTER DELETE ON hr_app_employeesearchdocument BEGIN
+        INSERT INTO hr_app_employee_fts(hr_app_employee_fts, rowid, document)
+        VALUES ('delete', old.profile_id, old.document);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS hr_app_employee_fts_au AFTER UPDATE ON hr_app_employeesearchdocument BEGIN
+        INSERT INTO hr_app_employee_fts(hr_app_employee_fts, rowid, document)
+        VALUES ('delete', old.profile_id, old.document);
+        INSERT INTO hr_app_employee_fts(rowid, document) VALUES (new.profile_id, new.document);
+    END""",
+    # Index the documents written before the triggers existed.
+    "INSERT INTO hr_app_employee_fts(hr_app_employee_fts) VALUES ('rebuild')",
+]
+
+SQLITE_FTS_REVERSE = [
+    "DROP TRIGGER IF EXISTS hr_app_employee_fts_ai",
+    "DROP TRIGGER IF EXISTS hr_app_employee_fts_ad",
+    "DROP TRIGGER IF EXISTS hr_app_employee_fts_au",
+    "DROP TABLE IF EXISTS hr_app_employee_fts",
+]
+
+POSTGRES_TRGM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS hr_app_employee_search_trgm "
+    "ON hr_app_employeesearchdocument USING gin (document gin_trgm_ops)",
+]
+
+POSTGRES_TRGM_REVERSE = [
+    # The extension stays: other schemas may use it.
+    "DROP INDEX IF EXISTS hr_app_employee_search_trgm",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0020_covering_checkin_indexes'),
+    ]
+
+    operations = [
+        hr_app.operations.VendorRunSQL('sqlite', SQLITE_FTS, SQLITE_FTS_REVERSE, optional=True),
+        hr_app.operations.VendorRunSQL('postgresql', POSTGRES_TRGM, POSTGRES_TRGM_REVERSE, optional=True),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:49
+
+from django.db import migrations, models
+
+
+def release_rejected_keys(apps, schema_editor):
+    # Keys of punches rejected before this migration would still block a retry.
+    apps.get_model('hr_app', 'PunchEvent').objects.filter(outcome='rejected').update(key=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_app', '0021_employee_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='punchevent',
+            name='key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(release_rejected_keys, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Now
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 
+from .constraints import DateRange, PostgresExclusionConstraint
+
 STATUS_CHOICES = [
     ('Active', 'Active'),
     ('Inactive', 'Inactive'),
@@ -47,17 +51,10 @@ class EmployeeProfile(models.Model):
 
     def calculate_monthly_salary(self, year, month):
         """Calculates the total gross salary for a given month and year."""
-        
-        attendance_records = self.attendance_set.filter(
-            check_in__year=year,
-            check_in__month=month,
-            check_out__isnull=False 
-        )
-        
-        total_time_worked = timedelta(0)
-        
-        for record in attendance_records:
-            total_time_worked += record.total_work_time
+        from .archiving import monthly_work_time
+
+        # Live shifts plus any shifts already rolled into the archive.
+        total_time_worked = monthly_work_time(self, year, month)
             
         total_hours = total_time_worked.total_seconds() / 3600.0
         
@@ -86,6 +83,18 @@ class Attendance(models.Model):
     employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
     check_in = models.DateTimeField(null=True, blank=True)
     check_out = models.DateTimeField(null=True, blank=True)
+    # Drives ETag/Last-Modified of the salary report. db_default covers raw
+    # bulk inserts that bypass auto_now.
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'check_in'], name='attendance_emp_checkin_idx'),
+            # Covers the analytics month scans (hr_app.analytics) without touching the table.
+            models.Index(fields=['check_in', 'employee', 'check_out'], name='attendance_checkin_cov_idx'),
+            # High-water mark of the anomaly scanner (hr_app.anomalies).
+            models.Index(fields=['updated_at', 'id'], name='attendance_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.employee.user.username} - {self.check_in.date()}"
@@ -98,6 +107,88 @@ class Attendance(models.Model):
         return timezone.timedelta(0)
 
 
+class AttendanceArchive(models.Model):
+    """Completed shifts from closed months, moved out of the hot Attendance table."""
+    # Keeps the original Attendance primary key.
+    id = models.BigIntegerField(primary_key=True)
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
+    check_in = models.DateTimeField()
+    check_out = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'check_in'], name='att_archive_emp_checkin_idx'),
+            # Month scans of the analytics job (hr_app.analytics), answered from the index alone.
+            models.Index(fields=['check_in', 'employee', 'check_out'], name='att_archive_checkin_cov_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.user.username} - {self.check_in.date()} (archived)"
+
+    @property
+    def total_work_time(self):
+        return self.check_out - self.check_in
+
+
+class AttendanceMonthlySummary(models.Model):
+    """Per-employee totals for the shifts of one month that live in AttendanceArchive."""
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    shift_count = models.PositiveIntegerField(default=0)
+    total_work_time = models.DurationField(default=timedelta(0))
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'year', 'month'], name='unique_attendance_month_summary'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.user.username} - {self.year}/{self.month:02d}"
+
+
+class AttendancePeriodStats(models.Model):
+    """Per-employee lateness / early-leave / overtime totals for one month (see hr_app.analytics)."""
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    shifts = models.PositiveIntegerField(default=0)
+    late_shifts = models.PositiveIntegerField(default=0)
+    late_minutes = models.PositiveIntegerField(default=0)
+    early_leave_minutes = models.PositiveIntegerField(default=0)
+    overtime_minutes = models.PositiveIntegerField(default=0)
+    worked_minutes = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'year', 'month'], name='unique_attendance_period_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.user.username} - {self.year}/{self.month:02d} stats"
+
+
+class EmployeeSearchDocument(models.Model):
+    """
+    Denormalized directory entry per profile, kept current by signals (see
+    hr_app.search). `document` is the lowercased searchable text; the rest is
+    what autocomplete shows without joining back to users and departments.
+    """
+    profile = models.OneToOneField(EmployeeProfile, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='search_document')
+    document = models.TextField()
+    name = models.CharField(max_length=301)
+    employee_code = models.CharField(max_length=10)
+    department = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20)
+
+    def __str__(self):
+        return f"{self.name} ({self.employee_code})"
+
+
 class LeaveRequest(models.Model):
     employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
     reason = models.TextField()
@@ -108,10 +199,106 @@ class LeaveRequest(models.Model):
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_leaves')
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+
+    class Meta:
+        indexes = [
+            # Overlap probe (hr_app.leaves): employee equality, then a range on the dates.
+            models.Index(
+                fields=['employee', 'start_date', 'end_date'],
+                name='leave_emp_active_range_idx',
+                condition=models.Q(status__in=['Pending', 'Approved']),
+            ),
+        ]
+        constraints = [
+            # Same rule as hr_app.leaves, enforced by the database on Postgres only.
+            PostgresExclusionConstraint(
+                name='leave_no_active_overlap',
+                expressions=[
+                    ('employee', '='),
+                    # '[]': end_date is the last day of leave, not the day after.
+                    (DateRange('start_date', 'end_date', models.Value('[]')), '&&'),
+                ],
+                condition=models.Q(status__in=['Pending', 'Approved']),
+            ),
+        ]
     
     def __str__(self):
         return f"Leave for {self.employee.user.username} ({self.status})"
 
+    def clean(self):
+        from .leaves import overlapping_leaves  # avoid circular import
+
+        if self.start_date and self.end_date:
+            if self.end_date < self.start_date:
+                raise ValidationError({'end_date': "End date cannot be before the start date."})
+            if self.employee_id and self.status in ('Pending', 'Approved'):
+                clash = overlapping_leaves(self.employee_id, self.start_date, self.end_date, exclude_pk=self.pk)
+                if clash:
+                    raise ValidationError(
+                        f"Overlaps your {clash.status.lower()} leave from "
+                        f"{clash.start_date:%b %d} to {clash.end_date:%b %d}."
+                    )
+
+
+class PunchEvent(models.Model):
+    """One offline punch uploaded by a kiosk or phone (see hr_app.punches); the key makes uploads idempotent."""
+    OUTCOME_CHOICES = [
+        ('in', 'Clocked in'),
+        ('out', 'Clocked out'),
+        ('rejected', 'Rejected'),
+    ]
+    # NULL on rejected punches, so a corrected retry may reuse the key.
+    key = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    device_id = models.CharField(max_length=64)
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE, null=True, blank=True)
+    timestamp = models.DateTimeField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    outcome = models.CharField(max_length=10, choices=OUTCOME_CHOICES)
+    detail = models.CharField(max_length=100, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'timestamp'], name='punch_emp_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.device_id} {self.timestamp:%Y-%m-%d %H:%M} ({self.outcome})"
+
+
+class PunchDevice(models.Model):
+    """
+    A kiosk or phone registered to upload punches (`manage.py make_device_key`)
+    and the employees it may punch for: one employee (a personal phone), one
+    department (a department kiosk) or, explicitly, everyone (a front-desk kiosk).
+    """
+    device_id = models.CharField(max_length=64, unique=True)
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE, null=True, blank=True)
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True)
+    site_wide = models.BooleanField(default=False)
+    # Revoke by deactivating: the key derives from the id, so a deleted row
+    # re-registered later would make the old key valid again.
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def clean(self):
+        if sum([self.employee_id is not None, self.department_id is not None, self.site_wide]) != 1:
+            raise ValidationError("Choose exactly one of employee, department or site-wide.")
+
+    def allows(self, profile):
+        if not self.is_active:
+            return False
+        if self.site_wide:
+            return True
+        if self.employee_id is not None:
+            return profile.pk == self.employee_id
+        return self.department_id is not None and profile.department_id == self.department_id
+
+    def __str__(self):
+        return self.device_id
+
 
 class EarlyClockOutRequest(models.Model):
     employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
@@ -136,4 +323,195 @@ class LateArrivalRequest(models.Model):
     ])
 
     def __str__(self):
-        return f"Late: {self.employee.user.username} ({self.status})"
\ No newline at end of file
+        return f"Late: {self.employee.user.username} ({self.status})"
+
+class OffboardingJob(models.Model):
+    """Background purge / anonymisation of a deactivated employee's history (see hr_app.offboarding)."""
+    MODE_CHOICES = [
+        ('purge', 'Purge history and account'),
+        ('anonymise', 'Anonymise history, keep records'),
+    ]
+    JOB_STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    profile = models.ForeignKey(EmployeeProfile, on_delete=models.SET_NULL, null=True, blank=True)
+    # Kept for the record once a purge has removed the profile.
+    employee_label = models.CharField(max_length=120)
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='purge')
+    status = models.CharField(max_length=10, choices=JOB_STATUS_CHOICES, default='queued')
+    step = models.CharField(max_length=50, blank=True)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='requested_offboardings')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Offboarding {self.employee_label} ({self.mode}, {self.status})"
+
+
+class Payslip(models.Model):
+    """A generated payslip document (see hr_app.payslips). `file` is content-addressed by `content_hash`."""
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    gross_salary = models.DecimalField(max_digits=12, decimal_places=2)
+    # Digest of the figures + template the document was rendered from; a
+    # re-run skips payslips whose digest is unchanged.
+    input_hash = models.CharField(max_length=64)
+    content_hash = models.CharField(max_length=64)
+    file = models.CharField(max_length=200)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'year', 'month'], name='unique_payslip_month'),
+        ]
+
+    def __str__(self):
+        return f"Payslip {self.employee.employee_id} {self.year}/{self.month:02d}"
+
+
+AUDIT_ACTION_CHOICES = [
+    ('create', 'Created'),
+    ('update', 'Updated'),
+    ('approve', 'Approved'),
+    ('reject', 'Rejected'),
+    ('delete', 'Deleted'),
+]
+
+
+class AuditEventBase(models.Model):
+    """A change to one record (see hr_app.audit). Rows are only ever inserted."""
+    # Time of the change, not of the (batched) write.
+    created_at = models.DateTimeField()
+    # No constraint and no cascade: deleting a user must not touch the log.
+    actor = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+                              related_name='+')
+    actor_label = models.CharField(max_length=150, blank=True)
+    action = models.CharField(max_length=10, choices=AUDIT_ACTION_CHOICES)
+    entity_type = models.CharField(max_length=100)  # model label, e.g. 'hr_app.leaverequest'
+    entity_id = models.CharField(max_length=64)
+    changes = models.JSONField(default=dict)  # {field: [old, new]}
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.entity_type}#{self.entity_id} {self.action} by {self.actor_label or '-'}"
+
+
+class AuditEvent(AuditEventBase):
+    """Recent audit events. Older months are moved to AuditEventArchive by `manage.py rotate_audit_log`."""
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='audit_entity_history_idx'),
+            models.Index(fields=['created_at'], name='audit_created_idx'),
+        ]
+
+
+class AuditEventArchive(AuditEventBase):
+    # Keeps the original AuditEvent primary key.
+    id = models.BigIntegerField(primary_key=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='audit_arch_entity_history_idx'),
+        ]
+
+
+class ScanCheckpoint(models.Model):
+    """High-water mark of an incremental batch job, e.g. {'updated_at': ..., 'id': ...}."""
+    name = models.CharField(max_length=50, unique=True)
+    position = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.position}"
+
+
+class AttendanceAnomaly(models.Model):
+    """A suspicious attendance record waiting for review (see hr_app.anomalies)."""
+    KIND_CHOICES = [
+        ('duplicate_open', 'Open shift followed by another shift'),
+        ('zero_length', 'Zero or negative length shift'),
+        ('over_24h', 'Shift longer than 24 hours'),
+        ('overlap', 'Overlaps an earlier shift'),
+        ('late_approval_overlap', 'Approved late arrival overlaps an existing shift'),
+        ('gps_jump', 'Impossible distance between punches'),
+    ]
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('fixed', 'Fixed'),
+        ('dismissed', 'Dismissed'),
+    ]
+    # One row per finding, so rescans never flag the same thing twice.
+    key = models.CharField(max_length=100, unique=True)
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    employee = models.ForeignKey(EmployeeProfile, on_delete=models.CASCADE)
+    attendance = models.ForeignKey(Attendance, on_delete=models.SET_NULL, null=True, blank=True)
+    punch = models.ForeignKey(PunchEvent, on_delete=models.SET_NULL, null=True, blank=True)
+    late_request = models.ForeignKey(LateArrivalRequest, on_delete=models.SET_NULL, null=True, blank=True)
+    detail = models.CharField(max_length=255)
+    data = models.JSONField(default=dict, blank=True)  # rule context, e.g. the earlier shift's id
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    detected_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    resolved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'kind'], name='anomaly_status_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.employee.employee_id}"
+
+
+class PendingCounter(models.Model):
+    """Denormalized number of Pending requests per queue (see hr_app.counters)."""
+    name = models.CharField(max_length=30, unique=True)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.count}"
+
+
+class OutboxEvent(models.Model):
+    """A change waiting to be pushed to an external system (see hr_app.webhooks)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('delivered', 'Delivered'),
+        ('dead', 'Gave up'),
+    ]
+    destination = models.CharField(max_length=30)
+    topic = models.CharField(max_length=50)  # e.g. 'attendance.saved', 'leave.approved'
+    entity_id = models.CharField(max_length=64)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            # The delivery queue: pending events per destination in id order.
+            # Partial, so delivered history does not grow it.
+            models.Index(
+                fields=['destination', 'id'],
+                name='outbox_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.destination} #{self.pk} {self.topic} ({self.status})"
@@ -0,0 +1,231 @@
+# hr_app/offboarding.py
+"""
+Employee offboarding.
+
+`offboard()` is the fast, synchronous part: profiles are set to Deactivated
+and their logins disabled with two UPDATEs, and one OffboardingJob is queued
+per employee (a whole department at once if needed).
+
+`run_job()` is the slow part, driven by `manage.py run_offboarding`. It works
+through the employee's history one table at a time in bounded raw
+DELETE/UPDATE batches. Each batch commits together with the job's progress,
+so locks stay short and an interrupted run resumes where it stopped. Nothing
+goes through Django's deletion collector until the very end, when only the
+(now empty-handed) account is left.
+
+Modes:
+* purge: history rows are deleted, then the user (cascading to the profile).
+* anonymise: history stays for payroll/audit; free-text reasons and punch
+  locations are blanked and the account is scrubbed of personal data.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import counters, coverage, search, webhooks
+from .auth_backends import invalidate_cached_user
+from .models import (
+    Attendance, AttendanceAnomaly, AttendanceArchive, AttendanceMonthlySummary, AttendancePeriodStats,
+    EarlyClockOutRequest, EmployeeProfile, LateArrivalRequest, LeaveRequest, OffboardingJob, PunchEvent,
+)
+from .presence import hub as presence_hub
+
+ACTIVE_JOB_STATUSES = ('queued', 'running')
+
+# Children before parents: anomalies point at shifts, punches and late
+# requests; early-out requests point at attendance rows.
+PURGED_MODELS = [
+    AttendanceAnomaly, EarlyClockOutRequest, PunchEvent, Attendance, AttendanceArchive,
+    AttendanceMonthlySummary, AttendancePeriodStats, LeaveRequest, LateArrivalRequest,
+]
+REDACTED = '[removed]'
+
+
+# =========================================================
+# 🚪 DEACTIVATION (synchronous)
+# =========================================================
+
+def offboard(profiles, mode='purge', requested_by=None):
+    """
+    Deactivates every profile in the queryset and queues one job each.
+    Profiles that already have an unfinished job are left alone.
+    Returns the created jobs.
+    """
+    busy = OffboardingJob.objects.filter(status__in=ACTIVE_JOB_STATUSES).values('profile_id')
+    rows = list(
+        profiles.exclude(pk__in=busy)
+        .values_list('pk', 'user_id', 'employee_id', 'user__first_name', 'user__last_name', 'user__username')
+    )
+    if not rows:
+        return []
+    profile_ids = [row[0] for row in rows]
+    user_ids = [row[1] for row in rows]
+
+    with transaction.atomic():
+        # Plain UPDATEs: no per-row signals, the side effects follow on commit.
+        EmployeeProfile.objects.filter(pk__in=profile_ids).update(status='Deactivated')
+        # ... which skip the outbox signals: payroll still has to hear about it.
+        webhooks.record_many('employee.saved', EmployeeProfile.objects.filter(pk__in=profile_ids),
+                             webhooks.employee_payload)
+        User.objects.filter(pk__in=user_ids).update(is_active=False)
+        jobs = OffboardingJob.objects.bulk_create([
+            OffboardingJob(
+                profile_id=pk, mode=mode, requested_by=requested_by,
+                employee_label=f"{f'{first} {last}'.strip() or username} ({employee_id})",
+            )
+            for pk, _, employee_id, first, last, username in rows
+        ])
+        transaction.on_commit(lambda: _after_deactivation(profile_ids, user_ids))
+    return jobs
+
+
+def _after_deactivation(profile_ids, user_ids):
+    for user_id in user_ids:
+        invalidate_cached_user(user_id)  # is_active=False now logs them out
+    for profile_id in profile_ids:
+        presence_hub.clock_out(profile_id)
+    search.index_profiles({'pk__in': profile_ids})
+    coverage.invalidate_all()
+
+
+# =========================================================
+# 🧹 BATCHED PURGE / ANONYMISATION (background)
+# =========================================================
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _batch_ids(cursor, table, profile_id, batch_size, condition='1 = 1', params=()):
+    # Ids first, then DELETE/UPDATE by list: MySQL rejects LIMIT in an IN (SELECT ...)
+    # subquery, and a subquery on the table being changed.
+    cursor.execute(
+        f"SELECT id FROM {table} WHERE employee_id = %s AND ({condition}) LIMIT %s",
+        [profile_id, *params, batch_size],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _delete_batch(model, profile_id, batch_size):
+    table = _table(model)
+    with connection.cursor() as cursor:
+        ids = _batch_ids(cursor, table, profile_id, batch_size)
+        if ids:
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+        return len(ids)
+
+
+def _update_batch(model, profile_id, batch_size, assignments, pending_condition, set_params=(), condition_params=()):
+    """UPDATE ... SET assignments for up to batch_size rows still matching pending_condition."""
+    table = _table(model)
+    with connection.cursor() as cursor:
+        ids = _batch_ids(cursor, table, profile_id, batch_size, pending_condition, condition_params)
+        if ids:
+            cursor.execute(
+                f"UPDATE {table} SET {assignments} WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                [*set_params, *ids],
+            )
+        return len(ids)
+
+
+def _purge_step(model):
+    return model._meta.model_name, lambda profile_id, n: _delete_batch(model, profile_id, n)
+
+
+def _redact_step(model):
+    return model._meta.model_name, lambda profile_id, n: _update_batch(
+        model, profile_id, n, 'reason = %s', 'reason <> %s', [REDACTED], [REDACTED]
+    )
+
+
+def _steps(mode):
+    """[(name, fn(profile_id, batch_size) -> rows touched)]; each step repeats until a short batch."""
+    if mode == 'purge':
+        return [_purge_step(model) for model in PURGED_MODELS]
+    return [
+        _redact_step(LeaveRequest),
+        _redact_step(LateArrivalRequest),
+        _redact_step(EarlyClockOutRequest),
+        ('punchevent', lambda profile_id, n: _update_batch(
+            PunchEvent, profile_id, n, 'latitude = 0, longitude = 0', 'latitude <> 0 OR longitude <> 0')),
+    ]
+
+
+def _finish_purge(job):
+    profile = EmployeeProfile.objects.filter(pk=job.profile_id).only('user_id', 'profile_pic').first()
+    job.profile = None  # the row is about to go (SET_NULL in the database as well)
+    if profile is None:
+        return
+    if profile.profile_pic:
+        profile.profile_pic.delete(save=False)
+    # History is gone, so the collector only finds the profile and its search document.
+    User.objects.filter(pk=profile.user_id).delete()
+
+
+def _finish_anonymise(job):
+    profile = EmployeeProfile.objects.select_related('user').filter(pk=job.profile_id).first()
+    if profile is None:
+        return
+    user = profile.user
+    user.username = f'former-{user.pk}'
+    user.first_name = user.last_name = user.email = ''
+    user.is_active = False
+    user.set_unusable_password()
+    user.save()
+    if profile.profile_pic:
+        profile.profile_pic.delete(save=False)
+    profile.profile_pic = None
+    profile.status = 'Deactivated'
+    profile.save()
+
+
+def run_job(job, batch_size=1000, pause=0.0, deadline=None):
+    """
+    Advances a job batch by batch. Returns True when it finished, False if
+    `deadline` (a time.monotonic() value) was reached first.
+    """
+    steps = _steps(job.mode)
+    names = [name for name, _ in steps]
+    start = names.index(job.step) if job.step in names else 0
+    if job.status == 'queued':
+        job.status = 'running'
+        job.save(update_fields=['status', 'updated_at'])
+
+    try:
+        for name, step in steps[start:]:
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                with transaction.atomic():
+                    rows = step(job.profile_id, batch_size)
+                    job.step = name
+                    job.rows_processed += rows
+                    job.save(update_fields=['step', 'rows_processed', 'updated_at'])
+                if rows < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)
+
+        with transaction.atomic():
+            if job.mode == 'purge':
+                _finish_purge(job)
+            else:
+                _finish_anonymise(job)
+            job.step = 'account'
+            job.status = 'done'
+            job.finished_at = timezone.now()
+            job.save()
+    except Exception as exc:
+        OffboardingJob.objects.filter(pk=job.pk).update(status='failed', error=repr(exc))
+        raise
+    coverage.invalidate_all()  # raw deletes skipped the leave signals
+    if job.mode == 'purge':
+        counters.reconcile()  # ... and the pending-counter ones
+    return True
+
+
+def pending_jobs():
+    # Unfinished jobs, oldest first. Run one worker at a time (cron).
+    return OffboardingJob.objects.filter(status__in=ACTIVE_JOB_STATUSES).order_by('id')
@@ -0,0 +1,45 @@
+# hr_app/operations.py
+"""
+Migration operations for SQL that only one database vendor understands.
+
+VendorRunSQL is a RunSQL that is skipped on every other vendor, the way
+PostgresExclusionConstraint (hr_app/constraints.py) only emits SQL on
+PostgreSQL. With optional=True a DatabaseError (SQLite built without FTS5,
+no permission to install an extension) is logged and rolled back to a
+savepoint instead of failing the migration; the feature then falls back to
+whatever the application does without it.
+"""
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class VendorRunSQL(migrations.RunSQL):
+    def __init__(self, vendor, sql, reverse_sql=None, optional=False, **kwargs):
+        self.vendor = vendor
+        self.optional = optional
+        super().__init__(sql, reverse_sql, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        kwargs['vendor'] = self.vendor
+        if self.optional:
+            kwargs['optional'] = True
+        return name, args, kwargs
+
+    def describe(self):
+        return f"Raw SQL operation ({self.vendor} only)"
+
+    def _run_sql(self, schema_editor, sqls):
+        connection = schema_editor.connection
+        if connection.vendor != self.vendor:
+            return
+        if not self.optional or schema_editor.collect_sql:
+            return super()._run_sql(schema_editor, sqls)
+        try:
+            with transaction.atomic(using=connection.alias):
+                super()._run_sql(schema_editor, sqls)
+        except DatabaseError as exc:
+            logger.warning("Skipped optional %s migration SQL: %s", self.vendor, exc)
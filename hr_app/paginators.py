@@ -0,0 +1,36 @@
+# hr_app/paginators.py
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for very large tables. On Postgres an unfiltered changelist uses
+    the planner's row estimate (pg_class.reltuples) instead of a full COUNT(*).
+    Filtered querysets, and other backends, fall back to an exact count.
+    """
+    # Below this, the estimate is too coarse and COUNT(*) is cheap anyway.
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+
+        db = self.object_list.db
+        connection = connections[db]
+        if connection.vendor != 'postgresql':
+            return super().count
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        estimate = row[0] if row else -1
+        if estimate < self.exact_below:
+            return super().count
+        return estimate
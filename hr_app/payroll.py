@@ -0,0 +1,69 @@
+# hr_app/payroll.py
+"""
+Monthly pay figures, shared by the salary report page and the payslip run.
+
+`salary_breakdown` holds the pay rules. `month_figures` computes the inputs
+for every employee of a month from a few bulk queries (live shifts, archived
+monthly totals, approved leave), so a payroll run does not issue
+per-employee queries.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from .bucketing import bucket_seconds_by_employee, leave_days_by_month, leaves_touching_month, shifts_touching_month
+from .models import Attendance, AttendanceMonthlySummary, EmployeeProfile, LeaveRequest
+
+PAID_LEAVE_DAYS_PER_MONTH = 2
+PAID_LEAVE_HOURS_PER_DAY = 9
+
+
+def salary_breakdown(work_seconds, leave_days, hourly_rate):
+    """Pay for one month: worked hours plus up to two paid leave days of 9 hours each."""
+    work_hours = work_seconds / 3600
+    paid_leave_days = min(leave_days, PAID_LEAVE_DAYS_PER_MONTH)
+    paid_leave_hours = paid_leave_days * PAID_LEAVE_HOURS_PER_DAY
+
+    total_hours = Decimal(str(round(work_hours + paid_leave_hours, 2)))
+    hourly_rate = hourly_rate or Decimal('0.00')
+    return {
+        'work_hours': round(work_hours, 2),
+        'paid_leave_days': paid_leave_days,
+        'unpaid_leave_days': max(0, leave_days - PAID_LEAVE_DAYS_PER_MONTH),
+        'paid_leave_hours': paid_leave_hours,
+        'payable_hours': total_hours,
+        'hourly_rate': hourly_rate,
+        'gross_salary': round(total_hours * hourly_rate, 2),
+    }
+
+
+def month_figures(year, month, profiles=None):
+    """
+    {profile_id: (profile, breakdown)} for a month. `profiles` defaults to
+    everyone not deactivated; profiles should come with user and department.
+    """
+    if profiles is None:
+        profiles = EmployeeProfile.objects.exclude(status='Deactivated').select_related('user', 'department')
+    profiles = {profile.pk: profile for profile in profiles}
+
+    live = bucket_seconds_by_employee(
+        Attendance.objects.filter(shifts_touching_month(year, month), check_out__isnull=False)
+        .values_list('employee_id', 'check_in', 'check_out')
+        .iterator(chunk_size=5000)
+    )
+    archived = dict(
+        AttendanceMonthlySummary.objects.filter(year=year, month=month).values_list('employee_id', 'total_work_time')
+    )
+    leave_ranges = defaultdict(list)
+    for employee_id, start, end in LeaveRequest.objects.filter(
+        leaves_touching_month(year, month), status='Approved'
+    ).values_list('employee_id', 'start_date', 'end_date'):
+        leave_ranges[employee_id].append((start, end))
+
+    figures = {}
+    for pk, profile in profiles.items():
+        seconds = live.get(pk, {}).get((year, month), 0.0)
+        if pk in archived:
+            seconds += archived[pk].total_seconds()
+        leave_days = leave_days_by_month(leave_ranges.get(pk, ())).get((year, month), 0)
+        figures[pk] = (profile, salary_breakdown(seconds, leave_days, profile.salary_per_hour))
+    return figures
@@ -0,0 +1,158 @@
+# hr_app/payslips.py
+"""
+Monthly payslip documents.
+
+`generate_payslips()` takes every employee's figures for the month from
+`payroll.month_figures` (a few bulk queries), hashes them together with the
+payslip template, and only renders the payslips whose hash changed since the
+last run. Rendering happens in a process pool; each worker writes its
+document to content-addressed storage:
+
+    MEDIA_ROOT/payslips/<sha256[:2]>/<sha256>.html
+
+Documents contain no timestamps, so identical inputs give the identical file
+and a file that already exists is never rewritten.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+
+from .models import Payslip
+from .payroll import month_figures
+
+TEMPLATE_NAME = 'hr_app/payslip.html'
+STORAGE_DIR = 'payslips'
+# Payslips handed to a worker at a time.
+RENDER_CHUNK = 200
+
+
+def _template_digest():
+    with open(get_template(TEMPLATE_NAME).origin.name, 'rb') as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+def payslip_context(profile, year, month, pay):
+    """Everything printed on a payslip, as JSON-safe values (also what the input hash covers)."""
+    user = profile.user
+    return {
+        'year': year,
+        'month': month,
+        'employee_id': profile.employee_id,
+        'name': user.get_full_name() or user.username,
+        'department': profile.department.name if profile.department else '',
+        'job_title': profile.job_title,
+        'work_hours': f"{pay['work_hours']:.2f}",
+        'paid_leave_days': pay['paid_leave_days'],
+        'paid_leave_hours': pay['paid_leave_hours'],
+        'unpaid_leave_days': pay['unpaid_leave_days'],
+        'payable_hours': str(pay['payable_hours']),
+        'hourly_rate': str(pay['hourly_rate']),
+        'gross_salary': str(pay['gross_salary']),
+    }
+
+
+def input_hash(context, template_digest):
+    payload = json.dumps(context, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f'{template_digest}:{payload}'.encode()).hexdigest()
+
+
+def storage_path(content_hash):
+    """Path relative to MEDIA_ROOT."""
+    return f'{STORAGE_DIR}/{content_hash[:2]}/{content_hash}.html'
+
+
+# =========================================================
+# 🧾 RENDERING (runs in the worker processes)
+# =========================================================
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _write(content):
+    content_hash = hashlib.sha256(content).hexdigest()
+    relative = storage_path(content_hash)
+    path = os.path.join(settings.MEDIA_ROOT, relative)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as fh:
+            fh.write(content)
+        os.replace(tmp, path)  # atomic: readers never see half a file
+    return content_hash, relative
+
+
+def render_chunk(contexts):
+    """[(profile_id, context)] -> [(profile_id, content_hash, relative path)]."""
+    out = []
+    for profile_id, context in contexts:
+        content = render_to_string(TEMPLATE_NAME, context).encode()
+        out.append((profile_id, *_write(content)))
+    return out
+
+
+# =========================================================
+# 📦 BATCH RUN
+# =========================================================
+
+def generate_payslips(year, month, workers=None, force=False):
+    """
+    Brings the month's payslips up to date. Returns a dict with the number
+    of payslips generated, unchanged (skipped) and the total.
+    """
+    figures = month_figures(year, month)
+    template_digest = _template_digest()
+    existing = {
+        slip.employee_id: slip
+        for slip in Payslip.objects.filter(year=year, month=month, employee_id__in=list(figures))
+        .only('id', 'employee_id', 'input_hash', 'file')
+    }
+
+    pending, hashes, gross = [], {}, {}
+    for profile_id, (profile, pay) in figures.items():
+        context = payslip_context(profile, year, month, pay)
+        digest = input_hash(context, template_digest)
+        slip = existing.get(profile_id)
+        if (not force and slip is not None and slip.input_hash == digest
+                and os.path.exists(os.path.join(settings.MEDIA_ROOT, slip.file))):
+            continue
+        pending.append((profile_id, context))
+        hashes[profile_id] = digest
+        gross[profile_id] = pay['gross_salary']
+
+    chunks = [pending[i:i + RENDER_CHUNK] for i in range(0, len(pending), RENDER_CHUNK)]
+    rendered = []
+    if len(chunks) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for result in pool.map(render_chunk, chunks):
+                rendered.extend(result)
+    else:
+        for chunk in chunks:
+            rendered.extend(render_chunk(chunk))
+
+    created, updated = [], []
+    for profile_id, content_hash, relative in rendered:
+        slip = existing.get(profile_id) or Payslip(employee_id=profile_id, year=year, month=month)
+        slip.gross_salary = gross[profile_id]
+        slip.input_hash = hashes[profile_id]
+        slip.content_hash = content_hash
+        slip.file = relative
+        (updated if slip.pk else created).append(slip)
+
+    with transaction.atomic():
+        Payslip.objects.bulk_create(created, batch_size=1000)
+        if updated:
+            now = timezone.now()
+            for slip in updated:
+                slip.generated_at = now  # bulk_update skips auto_now
+            Payslip.objects.bulk_update(
+                updated, ['gross_salary', 'input_hash', 'content_hash', 'file', 'generated_at'], batch_size=1000,
+            )
+    return {'generated': len(rendered), 'unchanged': len(figures) - len(rendered), 'total': len(figures)}
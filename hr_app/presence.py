@@ -0,0 +1,169 @@
+# hr_app/presence.py
+"""
+Live "who is in" board.
+
+Each process keeps the set of open shifts in memory, loaded with one query
+and then updated from Attendance signals (after commit). Connected browsers
+subscribe through an asyncio queue and receive deltas over SSE, so viewers
+cost no database reads. Signals only reach the process that saved the row,
+so the map is re-read every PRESENCE_RESYNC_SECONDS and the differences are
+published like any other change; with several workers the board is at most
+that far behind.
+"""
+import asyncio
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attendance, EmployeeProfile
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+def sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _entry(profile, check_in):
+    return {
+        'id': profile.pk,
+        'employee_id': profile.employee_id,
+        'name': profile.user.get_full_name() or profile.user.username,
+        'department': profile.department.name if profile.department else '',
+        'since': timezone.localtime(check_in).isoformat(),
+    }
+
+
+class PresenceHub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._present = {}  # EmployeeProfile pk -> entry
+        self._loaded_at = None
+        self._subscribers = set()
+
+    # --- state ---------------------------------------------------------
+
+    def _read_open_shifts(self):
+        present = {}
+        open_shifts = (
+            Attendance.objects.filter(check_out__isnull=True, check_in__isnull=False)
+            .select_related('employee__user', 'employee__department')
+            .order_by('check_in')
+        )
+        for shift in open_shifts:
+            present[shift.employee_id] = _entry(shift.employee, shift.check_in)
+        return present
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def ensure_fresh(self):
+        """Loads the map on first use and re-syncs it once it is older than the resync interval."""
+        resync = getattr(settings, 'PRESENCE_RESYNC_SECONDS', 60)
+        if self.loaded and time.monotonic() - self._loaded_at < resync:
+            return
+        # One reader per process re-syncs; everyone else keeps the current map.
+        # Only the very first load makes callers wait.
+        if not self._reload_lock.acquire(blocking=not self.loaded):
+            return
+        try:
+            if self.loaded and time.monotonic() - self._loaded_at < resync:
+                return
+            present = self._read_open_shifts()
+            with self._lock:
+                old, self._present = self._present, present
+                first_load = not self.loaded
+                self._loaded_at = time.monotonic()
+        finally:
+            self._reload_lock.release()
+        if first_load:
+            return
+        for pk in old.keys() - present.keys():
+            self._publish('out', {'id': pk})
+        for pk, entry in present.items():
+            if old.get(pk) != entry:
+                self._publish('in', entry)
+
+    def snapshot(self):
+        with self._lock:
+            return sorted(self._present.values(), key=lambda entry: entry['since'])
+
+    def clock_in(self, profile, check_in):
+        entry = _entry(profile, check_in)
+        with self._lock:
+            if not self.loaded:
+                return  # the first load will read it from the database
+            self._present[profile.pk] = entry
+        self._publish('in', entry)
+
+    def clock_out(self, profile_pk):
+        with self._lock:
+            if self._present.pop(profile_pk, None) is None:
+                return
+        self._publish('out', {'id': profile_pk})
+
+    # --- pub/sub -------------------------------------------------------
+
+    def subscribe(self):
+        """Registers a subscriber on the running event loop."""
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _publish(self, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, (event, data))
+            except RuntimeError:
+                self.unsubscribe(subscriber)  # loop already closed
+
+
+class Subscriber:
+    """One connected stream: a bounded queue on the stream's event loop."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Slow consumer: the stream closes and EventSource reconnects
+            # with a fresh snapshot.
+            self.overflowed = True
+
+
+hub = PresenceHub()
+
+
+def attendance_saved(instance):
+    """Signal entry point: publish once the surrounding transaction commits."""
+    def publish():
+        if instance.check_in and not instance.check_out:
+            profile = EmployeeProfile.objects.select_related('user', 'department').get(pk=instance.employee_id)
+            hub.clock_in(profile, instance.check_in)
+        else:
+            hub.clock_out(instance.employee_id)
+
+    if hub.loaded:
+        transaction.on_commit(publish)
+
+
+def attendance_deleted(instance):
+    if hub.loaded:
+        transaction.on_commit(lambda: hub.clock_out(instance.employee_id))
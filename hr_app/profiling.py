@@ -0,0 +1,148 @@
+# hr_app/profiling.py
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'hr_app.profiling'
+PROFILE_MODES = ('cprofile', 'sample')
+
+
+def make_profile_token(mode='cprofile'):
+    """Signed token that lets a staff user profile their own requests."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(mode)
+
+
+def read_profile_token(token):
+    """Returns the profiling mode for a valid, unexpired token, else None."""
+    try:
+        mode = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    return mode if mode in PROFILE_MODES else None
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack on a timer and counts collapsed stacks
+    ("outer;inner;leaf N"), the input format of flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.stacks = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hr-stack-sampler', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# =========================================================
+# 🗂️ SPOOL DIRECTORY (size + retention limits)
+# =========================================================
+
+def spool_dir():
+    path = Path(settings.PROFILE_SPOOL_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def prune_spool():
+    """Drops files past max age, then the oldest until count/size limits hold."""
+    files = sorted(
+        (p for p in spool_dir().iterdir() if p.suffix in ('.prof', '.collapsed')),
+        key=lambda p: p.stat().st_mtime,
+    )
+    cutoff = time.time() - settings.PROFILE_SPOOL_MAX_AGE
+    keep = []
+    for path in files:
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+        else:
+            keep.append(path)
+
+    total = sum(p.stat().st_size for p in keep)
+    while keep and (len(keep) > settings.PROFILE_SPOOL_MAX_FILES or total > settings.PROFILE_SPOOL_MAX_BYTES):
+        oldest = keep.pop(0)
+        total -= oldest.stat().st_size
+        oldest.unlink(missing_ok=True)
+
+
+def _profile_name(label):
+    safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label)[:60]
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 1_000_000:06d}-{safe_label}"
+
+
+def _spool(name, profile):
+    """Writes a finished StackSampler or cProfile.Profile; returns the file name."""
+    if isinstance(profile, StackSampler):
+        name += '.collapsed'
+        (spool_dir() / name).write_text(profile.collapsed())
+    else:
+        name += '.prof'
+        profile.dump_stats(str(spool_dir() / name))
+    prune_spool()
+    return name
+
+
+def run_profiled(mode, label, func, *args):
+    """Runs func(*args) under the chosen profiler and spools the result.
+    Returns (result, file name)."""
+    name = _profile_name(label)
+    if mode == 'sample':
+        with StackSampler() as profile:
+            result = func(*args)
+    else:
+        profile = cProfile.Profile()
+        result = profile.runcall(func, *args)
+    return result, _spool(name, profile)
+
+
+async def arun_profiled(mode, label, func, *args):
+    """
+    run_profiled() for a coroutine function. Both profilers watch the event
+    loop thread, so other requests served by the loop meanwhile show up too,
+    and ORM work handed to sync_to_async threads does not.
+    """
+    name = _profile_name(label)
+    if mode == 'sample':
+        with StackSampler() as profile:
+            result = await func(*args)
+    else:
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            result = await func(*args)
+        finally:
+            profile.disable()
+    return result, await sync_to_async(_spool)(name, profile)
@@ -0,0 +1,262 @@
+# hr_app/punches.py
+"""
+Offline punch ingestion for kiosks and phones.
+
+A device uploads an ordered batch of punches; each one is HMAC-signed with
+that device's key (`manage.py make_device_key`, which also registers the
+device as a PunchDevice and fixes whom it may punch for: one employee, one
+department or the whole site). A punch toggles the
+employee's shift exactly like AttendanceToggleView, but is judged at its own
+timestamp: clock-in inside the office radius between 9:00 and 9:10, clock-out
+from 6:00 PM. Late or early punches are recorded as rejected so they can be
+followed up with the usual late-arrival / early-out requests.
+
+The whole batch is checked in memory in one pass (a handful of queries
+however large it is) and applied with bulk writes in one transaction.
+Punch keys make retries safe: a key that was already stored is skipped.
+Rejected punches are stored without their key, so a device can resend a
+corrected punch under the same key and have it judged again.
+"""
+import hashlib
+import hmac
+import math
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from . import webhooks
+from .models import Attendance, EmployeeProfile, PunchDevice, PunchEvent
+from .presence import hub as presence_hub
+
+DEVICE_KEY_SALT = 'hr_app.punches.device'
+# Same windows as AttendanceToggleView, in local time.
+CLOCK_IN_OPENS = time(9, 0)
+CLOCK_IN_CLOSES = time(9, 10)
+CLOCK_OUT_FROM = time(18, 0)
+EARTH_RADIUS_M = 6371000
+# Keeps IN (...) lists under every backend's parameter limit.
+LOOKUP_CHUNK = 900
+
+
+class PunchBatchError(ValueError):
+    """The upload as a whole is unusable (bad shape or too large)."""
+
+
+def device_key(device_id):
+    return salted_hmac(DEVICE_KEY_SALT, device_id).hexdigest()
+
+
+def punch_message(punch):
+    """Canonical string a device signs: key|employee|ts|lat|lon|device, coordinates to 6 places."""
+    return '|'.join([
+        str(punch['key']), str(punch['employee']), str(punch['ts']),
+        f"{float(punch['lat']):.6f}", f"{float(punch['lon']):.6f}", str(punch['device']),
+    ])
+
+
+def sign_punch(punch, key=None):
+    key = key or device_key(punch['device'])
+    return hmac.new(key.encode(), punch_message(punch).encode(), hashlib.sha256).hexdigest()
+
+
+def _chunks(items, size=LOOKUP_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# =========================================================
+# 🔎 VALIDATION (stateless checks)
+# =========================================================
+
+def _parse(punches, now):
+    """
+    Signature, shape and timestamp checks. Returns (valid, rejected) where
+    valid holds dicts with parsed values and rejected (index, key, reason).
+    """
+    max_age = timedelta(seconds=settings.PUNCH_MAX_AGE_SECONDS)
+    skew = timedelta(seconds=settings.PUNCH_CLOCK_SKEW_SECONDS)
+    keys_by_device = {}
+    seen = set()
+    valid, rejected = [], []
+
+    for index, punch in enumerate(punches):
+        try:
+            key = str(punch['key'])
+            device = str(punch['device'])
+            signature = str(punch['sig'])
+            lat, lon = float(punch['lat']), float(punch['lon'])
+            ts = datetime.fromisoformat(punch['ts'])
+            employee = str(punch['employee'])
+        except (KeyError, TypeError, ValueError):
+            rejected.append((index, punch.get('key') if isinstance(punch, dict) else None, 'malformed'))
+            continue
+        if not key or len(key) > 64 or len(device) > 64:
+            rejected.append((index, key, 'malformed'))
+            continue
+        # float() accepts 'nan' / 'inf' (and JSON NaN); NaN compares False
+        # against the geofence radius, so it would pass as inside.
+        if not (math.isfinite(lat) and math.isfinite(lon)) or abs(lat) > 90 or abs(lon) > 180:
+            rejected.append((index, key, 'bad_coordinates'))
+            continue
+
+        if device not in keys_by_device:
+            keys_by_device[device] = device_key(device)
+        if not hmac.compare_digest(sign_punch(punch, keys_by_device[device]), signature):
+            rejected.append((index, key, 'bad_signature'))
+            continue
+
+        if timezone.is_naive(ts):
+            rejected.append((index, key, 'naive_timestamp'))
+            continue
+        if ts > now + skew or ts < now - max_age:
+            rejected.append((index, key, 'out_of_range'))
+            continue
+
+        if key in seen:
+            continue  # repeated inside the same upload
+        seen.add(key)
+        valid.append({'index': index, 'key': key, 'device': device, 'employee': employee,
+                      'ts': ts, 'lat': lat, 'lon': lon})
+    return valid, rejected
+
+
+def _distances(punches, office):
+    """Haversine distance to the office for every punch, with the office terms computed once."""
+    office_lat, office_lon = map(math.radians, office)
+    cos_office = math.cos(office_lat)
+    out = []
+    for punch in punches:
+        lat, lon = math.radians(punch['lat']), math.radians(punch['lon'])
+        a = (math.sin((lat - office_lat) / 2) ** 2
+             + cos_office * math.cos(lat) * math.sin((lon - office_lon) / 2) ** 2)
+        out.append(2 * EARTH_RADIUS_M * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+    return out
+
+
+# =========================================================
+# 📥 INGESTION
+# =========================================================
+
+def ingest_punches(punches, office, radius_m):
+    """
+    Validates and applies a batch of punch dicts. `office` is (lat, lon).
+    Returns a summary dict; raises PunchBatchError for unusable uploads.
+    """
+    if not isinstance(punches, list):
+        raise PunchBatchError("'punches' must be a list.")
+    if len(punches) > settings.PUNCH_BATCH_MAX:
+        raise PunchBatchError(f"At most {settings.PUNCH_BATCH_MAX} punches per upload.")
+
+    now = timezone.now()
+    valid, rejected = _parse(punches, now)
+
+    # Idempotency: drop keys stored by an earlier upload.
+    stored = set()
+    for chunk in _chunks(p['key'] for p in valid):
+        stored.update(PunchEvent.objects.filter(key__in=chunk).values_list('key', flat=True))
+    duplicates = sum(1 for p in valid if p['key'] in stored)
+    valid = [p for p in valid if p['key'] not in stored]
+
+    devices = {}
+    for chunk in _chunks({p['device'] for p in valid}):
+        devices.update((d.device_id, d) for d in PunchDevice.objects.filter(device_id__in=chunk))
+
+    profiles = {}
+    for chunk in _chunks({p['employee'] for p in valid}):
+        for profile in EmployeeProfile.objects.filter(employee_id__in=chunk).select_related('user', 'department'):
+            profiles[profile.employee_id] = profile
+
+    open_shifts = {}
+    for chunk in _chunks(profile.pk for profile in profiles.values()):
+        for shift in Attendance.objects.filter(employee_id__in=chunk, check_out__isnull=True).order_by('check_in'):
+            open_shifts.setdefault(shift.employee_id, shift)  # oldest open shift, like the toggle view
+
+    # Replay each employee's punches in time order against their shift state.
+    valid.sort(key=lambda p: (p['employee'], p['ts']))
+    distances = _distances(valid, office)
+    tz = timezone.get_current_timezone()
+    created, updated, events = [], [], []
+
+    for punch, distance in zip(valid, distances):
+        profile = profiles.get(punch['employee'])
+        device = devices.get(punch['device'])
+        outcome, detail = 'rejected', ''
+        if device is None or not device.is_active:
+            detail = 'unknown_device'
+        elif profile is None:
+            detail = 'unknown_employee'
+        elif not device.allows(profile):
+            detail = 'device_not_allowed'
+        else:
+            local_time = punch['ts'].astimezone(tz).time()
+            shift = open_shifts.get(profile.pk)
+            if shift is not None:
+                if punch['ts'] <= shift.check_in:
+                    detail = 'before_check_in'
+                elif local_time < CLOCK_OUT_FROM:
+                    detail = 'early_out'
+                else:
+                    shift.check_out = punch['ts']
+                    if shift.pk:
+                        shift.updated_at = now  # bulk_update skips auto_now
+                        updated.append(shift)
+                    del open_shifts[profile.pk]
+                    outcome = 'out'
+            elif profile.status != 'Active':
+                detail = 'inactive'
+            elif distance > radius_m:
+                detail = 'outside_geofence'
+            elif local_time < CLOCK_IN_OPENS:
+                detail = 'too_early'
+            elif local_time > CLOCK_IN_CLOSES:
+                detail = 'late'
+            else:
+                shift = Attendance(employee=profile, check_in=punch['ts'])
+                created.append(shift)
+                open_shifts[profile.pk] = shift
+                outcome = 'in'
+
+        events.append(PunchEvent(
+            key=punch['key'] if outcome != 'rejected' else None, device_id=punch['device'], employee=profile,
+            timestamp=punch['ts'], latitude=punch['lat'], longitude=punch['lon'],
+            outcome=outcome, detail=detail,
+        ))
+        if outcome == 'rejected':
+            rejected.append((punch['index'], punch['key'], detail))
+
+    with transaction.atomic():
+        # Events first: a concurrent upload of the same keys fails here on the
+        # unique constraint and rolls everything back (the device retries).
+        PunchEvent.objects.bulk_create(events, batch_size=1000)
+        Attendance.objects.bulk_create(created, batch_size=1000)
+        Attendance.objects.bulk_update(updated, ['check_out', 'updated_at'], batch_size=1000)
+        # bulk writes skip the outbox signals
+        webhooks.record_many('attendance.saved', created + updated, webhooks.attendance_payload)
+        transaction.on_commit(lambda: _publish_presence(profiles, open_shifts, created, updated))
+
+    return {
+        'received': len(punches),
+        'accepted': sum(1 for e in events if e.outcome != 'rejected'),
+        'duplicates': duplicates,
+        'clock_ins': sum(1 for e in events if e.outcome == 'in'),
+        'clock_outs': sum(1 for e in events if e.outcome == 'out'),
+        'rejected': [{'index': i, 'key': k, 'reason': r} for i, k, r in sorted(rejected, key=lambda r: r[0])],
+    }
+
+
+def _publish_presence(profiles, open_shifts, created, updated):
+    """bulk_* skip the Attendance signals, so push the end state to the board directly."""
+    if not presence_hub.loaded:
+        return
+    by_pk = {profile.pk: profile for profile in profiles.values()}
+    touched = {shift.employee_id for shift in created} | {shift.employee_id for shift in updated}
+    for employee_pk in touched:
+        shift = open_shifts.get(employee_pk)
+        if shift is not None:
+            presence_hub.clock_in(by_pk[employee_pk], shift.check_in)
+        else:
+            presence_hub.clock_out(employee_pk)
@@ -0,0 +1,146 @@
+# hr_app/search.py
+"""
+Employee directory search.
+
+Every profile has an EmployeeSearchDocument row (lowercased employee id,
+username, names, department and job title) that signals keep current. The
+documents are indexed per backend:
+
+* SQLite: an external-content FTS5 table fed by triggers, queried with
+  prefix terms ("ann"* AND "kum"*).
+* Postgres: a pg_trgm GIN index, queried with LIKE '% term%' (word prefix).
+* Anything else, or if the index could not be created: the same LIKE
+  filter as a scan over the single document table (no joins).
+
+The FTS5 table, its triggers and the trigram index are created by migration
+0021 (only on their own vendor). The backend is detected from the schema
+once per process and connection alias.
+"""
+import re
+
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import EmployeeProfile, EmployeeSearchDocument
+
+FTS_TABLE = 'hr_app_employee_fts'
+MAX_TERMS = 6
+INDEX_BATCH = 2000
+
+_fts_ready = {}  # db alias -> bool
+
+
+# =========================================================
+# 🏗️ INDEX MAINTENANCE
+# =========================================================
+
+def _words(text):
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def build_document(profile):
+    """Search document for a profile loaded with user and department."""
+    user = profile.user
+    department = profile.department.name if profile.department else ''
+    words = _words(' '.join([
+        profile.employee_id, user.username, user.first_name, user.last_name, department, profile.job_title,
+    ]))
+    return EmployeeSearchDocument(
+        profile_id=profile.pk,
+        # Leading space so ' term' matches word prefixes, the first word included.
+        document=' ' + ' '.join(words),
+        name=user.get_full_name() or user.username,
+        employee_code=profile.employee_id,
+        department=department,
+        status=profile.status,
+    )
+
+
+def index_profiles(profile_filter, using='default'):
+    """(Re)builds the documents of the profiles matching a Q / filter kwargs dict."""
+    if isinstance(profile_filter, dict):
+        profile_filter = Q(**profile_filter)
+    docs = [
+        build_document(profile)
+        for profile in EmployeeProfile.objects.using(using).filter(profile_filter).select_related('user', 'department')
+    ]
+    EmployeeSearchDocument.objects.using(using).bulk_create(
+        docs, batch_size=500, update_conflicts=True, unique_fields=['profile'],
+        update_fields=['document', 'name', 'employee_code', 'department', 'status'],
+    )
+    return len(docs)
+
+
+def rebuild_search_index(batch_size=INDEX_BATCH, using='default'):
+    """Re-indexes every profile in pk order, one bounded batch at a time."""
+    profiles = EmployeeProfile.objects.using(using)
+    indexed, last_pk = 0, 0
+    while True:
+        pks = list(profiles.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return indexed
+        with transaction.atomic(using=using):
+            indexed += index_profiles(Q(pk__in=pks), using=using)
+        last_pk = pks[-1]
+
+
+def forget_backend(using='default'):
+    """Drops the cached FTS detection, e.g. after migrations changed the schema."""
+    _fts_ready.pop(using, None)
+
+
+# =========================================================
+# 🔎 QUERIES
+# =========================================================
+
+def _uses_fts(using):
+    if using not in _fts_ready:
+        connection = connections[using]
+        _fts_ready[using] = (
+            connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_ready[using]
+
+
+def _terms(query):
+    return _words(query)[:MAX_TERMS]
+
+
+def _fts_match(terms):
+    # \w+ terms contain no quotes; each one becomes a quoted prefix query.
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def matching_profile_ids(query, using='default', limit=None):
+    """
+    Something usable as `pk__in=` selecting the profiles whose document has
+    a word starting with every term of `query`. None when there are no terms.
+    """
+    terms = _terms(query)
+    if not terms:
+        return None
+    if _uses_fts(using):
+        sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        params = [_fts_match(terms)]
+        if limit:
+            sql += " LIMIT %s"
+            params.append(limit)
+        return RawSQL(sql, params)
+    docs = EmployeeSearchDocument.objects.using(using).filter(
+        *[Q(document__contains=' ' + term) for term in terms]
+    ).values('profile_id')
+    return docs[:limit] if limit else docs
+
+
+def autocomplete(query, limit=10, using='default'):
+    """Up to `limit` directory entries for a search box, from the document table only."""
+    ids = matching_profile_ids(query, using=using, limit=limit)
+    if ids is None:
+        return []
+    docs = EmployeeSearchDocument.objects.using(using).filter(profile_id__in=ids).order_by('name')
+    return [
+        {'id': doc.profile_id, 'employee_id': doc.employee_code, 'name': doc.name,
+         'department': doc.department, 'status': doc.status}
+        for doc in docs
+    ]
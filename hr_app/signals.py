@@ -0,0 +1,250 @@
+# hr_app/signals.py
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from django.contrib.auth.models import User
+
+from .auth_backends import invalidate_cached_user
+from . import audit, counters, coverage, presence, search, webhooks
+from .caching import bump_announcement_generation
+from .models import (
+    Announcement, Attendance, Department, EarlyClockOutRequest, EmployeeProfile, EmployeeSearchDocument,
+    LateArrivalRequest, LeaveRequest,
+)
+
+
+# =========================================================
+# 📢 ANNOUNCEMENT CACHE INVALIDATION
+# =========================================================
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def invalidate_announcement_cache(sender, **kwargs):
+    bump_announcement_generation()
+
+
+# =========================================================
+# 🔐 CACHED AUTH USER INVALIDATION
+# =========================================================
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+def invalidate_profile_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.user_id)
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_department_user_cache(sender, instance, **kwargs):
+    for user_id in EmployeeProfile.objects.filter(department=instance).values_list('user_id', flat=True):
+        invalidate_cached_user(user_id)
+
+
+# =========================================================
+# 🏖️ LEAVE COVERAGE (per-department invalidation)
+# =========================================================
+
+def _department_of(employee_id):
+    return EmployeeProfile.objects.filter(pk=employee_id).values_list('department_id', flat=True).first()
+
+
+@receiver(pre_save, sender=LeaveRequest)
+def remember_leave_coverage(sender, instance, raw=False, **kwargs):
+    instance._coverage_old = None
+    if instance.pk and not raw:
+        instance._coverage_old = LeaveRequest.objects.filter(pk=instance.pk).values_list(
+            'employee__department_id', 'start_date', 'end_date', 'status'
+        ).first()
+
+
+@receiver(post_save, sender=LeaveRequest)
+def invalidate_leave_coverage(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_coverage_old', None)
+    new = (_department_of(instance.employee_id), instance.start_date, instance.end_date, instance.status)
+    if old == new:
+        return
+    if old:
+        coverage.leave_changed(old[0], old[3])
+    coverage.leave_changed(new[0], new[3])
+
+
+@receiver(post_delete, sender=LeaveRequest)
+def invalidate_deleted_leave_coverage(sender, instance, **kwargs):
+    coverage.leave_changed(_department_of(instance.employee_id), instance.status)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def invalidate_coverage_on_profile_save(sender, instance, update_fields=None, **kwargs):
+    # Department moves and deactivations change headcounts / who is counted where.
+    if update_fields is None or 'department' in update_fields or instance.status == 'Deactivated':
+        coverage.invalidate_all()
+
+
+@receiver(post_delete, sender=EmployeeProfile)
+def invalidate_coverage_on_profile_delete(sender, instance, **kwargs):
+    coverage.invalidate_all()
+
+
+# =========================================================
+# 🔔 PENDING-QUEUE COUNTERS (nav badges)
+# =========================================================
+
+@receiver(pre_save, sender=EarlyClockOutRequest)
+@receiver(pre_save, sender=LateArrivalRequest)
+def remember_request_status(sender, instance, raw=False, **kwargs):
+    instance._status_old = None
+    if instance.pk and not raw:
+        instance._status_old = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=LeaveRequest)
+@receiver(post_save, sender=EarlyClockOutRequest)
+@receiver(post_save, sender=LateArrivalRequest)
+def count_pending_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if sender is LeaveRequest:
+        old = getattr(instance, '_coverage_old', None)  # already read for the coverage patch
+        old_status = old[3] if old else None
+    else:
+        old_status = getattr(instance, '_status_old', None)
+    delta = counters.status_delta(old_status, instance.status)
+    if delta:
+        counters.adjust(sender, delta)
+
+
+@receiver(post_delete, sender=LeaveRequest)
+@receiver(post_delete, sender=EarlyClockOutRequest)
+@receiver(post_delete, sender=LateArrivalRequest)
+def count_pending_on_delete(sender, instance, **kwargs):
+    if instance.status == 'Pending':
+        counters.adjust(sender, -1)
+
+
+# =========================================================
+# 📤 WEBHOOK OUTBOX (payroll / HRIS)
+# =========================================================
+
+def _deleted_payload(instance):
+    return {'id': instance.pk, 'employee': instance.employee_id}
+
+
+@receiver(post_save, sender=Attendance)
+def outbox_attendance_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        webhooks.record('attendance.saved', instance, webhooks.attendance_payload)
+
+
+@receiver(post_delete, sender=Attendance)
+def outbox_attendance_deleted(sender, instance, **kwargs):
+    webhooks.record('attendance.deleted', instance, _deleted_payload)
+
+
+@receiver(post_save, sender=LeaveRequest)
+def outbox_leave_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_coverage_old', None)  # read by the coverage pre_save
+    if instance.status == 'Approved':
+        webhooks.record('leave.approved', instance, webhooks.leave_payload)
+    elif old and old[3] == 'Approved':
+        webhooks.record('leave.revoked', instance, webhooks.leave_payload)
+
+
+@receiver(post_delete, sender=LeaveRequest)
+def outbox_leave_deleted(sender, instance, **kwargs):
+    if instance.status == 'Approved':
+        webhooks.record('leave.revoked', instance, webhooks.leave_payload)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def outbox_employee_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        webhooks.record('employee.saved', instance, webhooks.employee_payload)
+
+
+@receiver(post_delete, sender=EmployeeProfile)
+def outbox_employee_deleted(sender, instance, **kwargs):
+    webhooks.record('employee.deleted', instance, webhooks.employee_payload)
+
+
+# =========================================================
+# 🟢 LIVE PRESENCE BOARD
+# =========================================================
+
+@receiver(post_save, sender=Attendance)
+def publish_presence_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        presence.attendance_saved(instance)
+
+
+@receiver(post_delete, sender=Attendance)
+def publish_presence_on_delete(sender, instance, **kwargs):
+    presence.attendance_deleted(instance)
+
+
+# =========================================================
+# 🔎 DIRECTORY SEARCH DOCUMENTS
+# =========================================================
+
+SEARCHED_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def index_profile(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_profiles({'pk': instance.pk})
+
+
+@receiver(post_save, sender=User)
+def index_user_profile(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Skips the last_login update on every login.
+    if raw or (update_fields is not None and not SEARCHED_USER_FIELDS & set(update_fields)):
+        return
+    search.index_profiles({'user_id': instance.pk})
+
+
+@receiver(post_save, sender=Department)
+def index_department_profiles(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    if raw or created or (update_fields is not None and 'name' not in update_fields):
+        return
+    search.index_profiles({'department_id': instance.pk})
+
+
+@receiver(post_delete, sender=Department)
+def index_orphaned_profiles(sender, instance, **kwargs):
+    # Profiles were moved to no department (SET_NULL) without save signals.
+    search.index_profiles({'department__isnull': True})
+
+
+@receiver(post_migrate)
+def backfill_search_documents(sender, using='default', apps=None, **kwargs):
+    # The index itself is schema (migration 0021); this only fills in
+    # documents for profiles that predate the search tables.
+    if sender.name != 'hr_app':
+        return
+    search.forget_backend(using)
+    if apps is not None and 'employeesearchdocument' not in apps.all_models['hr_app']:
+        return  # migrated back to before the search tables
+    if EmployeeSearchDocument.objects.using(using).count() != EmployeeProfile.objects.using(using).count():
+        search.rebuild_search_index(using=using)
+
+
+# =========================================================
+# 📝 AUDIT TRAIL
+# =========================================================
+
+@receiver(request_finished)
+def flush_audit_events(sender, **kwargs):
+    if settings.AUDIT_FLUSH_EACH_REQUEST:
+        audit.flush()
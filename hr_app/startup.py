@@ -0,0 +1,120 @@
+# hr_app/startup.py
+"""
+Cold-start measurement for the serverless (Vercel) deployment.
+
+`measure_cold_start()` runs a fresh interpreter that imports the WSGI module
+and serves one request in-process, the same work a new lambda does before its
+first response. With `importtime=True` the child runs under `-X importtime`
+and the report is parsed into ImportRecord rows.
+
+Used by `manage.py bench_cold_start`.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+
+ImportRecord = namedtuple('ImportRecord', 'module self_us cumulative_us depth')
+
+# Modules the serverless profile keeps out of a cold start. The benchmark
+# reports any of them that still got imported.
+DEFERRED_MODULES = [
+    'django.contrib.admin.options',  # loaded on the first /admin/ request
+    'hr_app.admin',
+    'django.contrib.auth.admin',
+    'dj_database_url',               # only needed when DATABASE_URL is set
+    'PIL',                           # only needed when a profile picture is uploaded
+    'smtplib',                       # password reset mail goes through the SMTP backend
+    'hr_app.punches',
+    'hr_app.offboarding',
+    'hr_app.payslips',
+    'hr_app.profiling',
+    'urllib.request',                # webhook delivery happens in the worker
+]
+
+_IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+# Runs in the child: everything between interpreter start and the first
+# response body. Prints one JSON line.
+_CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {base_dir!r})
+from io import BytesIO
+from {wsgi_module} import application
+imported = time.perf_counter()
+environ = {{
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': {path!r}, 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+    'wsgi.input': BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+}}
+status = []
+body = b''.join(application(environ, lambda s, headers, exc_info=None: status.append(s)))
+done = time.perf_counter()
+print(json.dumps({{
+    'status': status[0], 'bytes': len(body),
+    'import_ms': (imported - started) * 1000, 'first_request_ms': (done - imported) * 1000,
+    'modules': sorted(sys.modules),
+}}))
+'''
+
+
+def parse_importtime(text):
+    """ImportRecord rows from `python -X importtime` stderr, in the order printed (children first)."""
+    records = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def package_totals(records, levels=2):
+    """Self time summed per package prefix (e.g. 'django.db', 'hr_app.views'), largest first."""
+    totals = defaultdict(int)
+    for record in records:
+        totals['.'.join(record.module.split('.')[:levels])] += record.self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def import_chain(records, module):
+    """Who imported `module` first: [module, parent, grandparent, ...]."""
+    for i, record in enumerate(records):
+        if record.module != module:
+            continue
+        chain, depth = [module], record.depth
+        for parent in records[i + 1:]:  # a parent is printed after its children
+            if parent.depth < depth:
+                chain.append(parent.module)
+                depth = parent.depth
+        return chain
+    return []
+
+
+def measure_cold_start(path='/login/', env=None, importtime=False):
+    """
+    One cold start in a fresh interpreter. Returns a dict with the response
+    status, import/first-request/total wall time in ms, the loaded modules and
+    (with importtime) the parsed ImportRecords.
+    """
+    child_env = {**os.environ, **(env or {})}
+    wsgi_module = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+    code = _CHILD.format(base_dir=str(settings.BASE_DIR), wsgi_module=wsgi_module, path=path)
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+
+    started = time.perf_counter()
+    proc = subprocess.run(command, env=child_env, capture_output=True, text=True, cwd=settings.BASE_DIR)
+    total_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"Cold start failed:\n{proc.stderr[-2000:]}")
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['total_ms'] = total_ms
+    result['imports'] = parse_importtime(proc.stderr) if importtime else []
+    return result
@@ -1,3 +1,477 @@
-from django.test import TestCase
+import gzip
+import hmac
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import webhooks
+from .auth_backends import user_cache_key
+from .bucketing import bucket_seconds, bucket_seconds_by_employee, leave_days_by_month, month_bounds, split_by_day
+from .middleware import ProfilingMiddleware, RequestTimingMiddleware
+from .profiling import make_profile_token
+from .punches import ingest_punches, sign_punch
+from .models import Attendance, Department, EmployeeProfile, LeaveRequest, OutboxEvent, PunchDevice, PunchEvent
+from .views import OFFICE_LAT, OFFICE_LON
+
+
+def make_employees(count, department, start=0):
+    profiles = []
+    for i in range(start, start + count):
+        user = User.objects.create_user(f'emp{i}', first_name='Emp', last_name=str(i))
+        profiles.append(EmployeeProfile.objects.create(
+            user=user, employee_id=f'EMP{i:05d}', department=department, job_title='Engineer',
+        ))
+    return profiles
+
+
+# =========================================================
+# 🗂️ ADMIN CHANGELISTS (query count must not grow with rows)
+# =========================================================
+
+class ChangelistQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        cls.department = Department.objects.create(name='Engineering')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_shifts(self, count, start):
+        now = timezone.now()
+        Attendance.objects.bulk_create([
+            Attendance(employee=profile, check_in=now - timedelta(hours=9), check_out=now)
+            for profile in make_employees(count, self.department, start)
+        ])
+
+    def add_leaves(self, count, start):
+        LeaveRequest.objects.bulk_create([
+            LeaveRequest(employee=profile, start_date=date(2030, 1, 1), end_date=date(2030, 1, 2),
+                         reason='Trip', status='Approved', approved_by=self.admin)
+            for profile in make_employees(count, self.department, start)
+        ])
+
+    def baseline(self, url):
+        self.client.get(url)  # warm the session / cached-user lookups
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_attendance_changelist(self):
+        url = reverse('admin:hr_app_attendance_changelist')
+        self.add_shifts(5, start=0)
+        queries = self.baseline(url)
+        self.add_shifts(40, start=5)
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertContains(response, 'EMP00044')
+
+    def test_leaverequest_changelist(self):
+        url = reverse('admin:hr_app_leaverequest_changelist')
+        self.add_leaves(5, start=0)
+        queries = self.baseline(url)
+        self.add_leaves(40, start=5)
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertContains(response, 'EMP00044')
+
+
+
+
+
+
+# =========================================================
+# 🏖️ LEAVE APPROVAL (overlap rule)
+# =========================================================
+
+class LeaveApprovalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        cls.employee = make_employees(1, Department.objects.create(name='Engineering'))[0]
+        LeaveRequest.objects.create(employee=cls.employee, start_date=date(2030, 1, 1), end_date=date(2030, 1, 5),
+                                    reason='Trip', status='Approved')
+        cls.rejected = LeaveRequest.objects.create(employee=cls.employee, start_date=date(2030, 1, 4),
+                                                   end_date=date(2030, 1, 8), reason='Trip', status='Rejected')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def approve(self, leave):
+        return self.client.get(reverse('update_leave_status', args=[leave.pk, 'Approved']), follow=True)
+
+    def test_approving_a_rejected_overlapping_leave_is_refused(self):
+        response = self.approve(self.rejected)
+        self.assertContains(response, "Cannot approve: overlaps the employee&#x27;s approved leave")
+        self.rejected.refresh_from_db()
+        self.assertEqual(self.rejected.status, 'Rejected')
+
+    def test_constraint_violation_is_reported_not_raised(self):
+        with mock.patch('hr_app.views.overlapping_leaves', return_value=None), \
+                mock.patch.object(LeaveRequest, 'save', side_effect=IntegrityError('leave_no_active_overlap')):
+            response = self.approve(self.rejected)
+        self.assertContains(response, 'now overlaps another')
+        self.rejected.refresh_from_db()
+        self.assertEqual(self.rejected.status, 'Rejected')
+
+# =========================================================
+# 💰 SALARY REPORT (conditional GET, closed-month fragment cache)
+# =========================================================
+
+class SalaryReportCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Engineering')
+        cls.manager, cls.other = make_employees(2, cls.department)
+        User.objects.filter(pk=cls.manager.user_id).update(is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.manager.user)
+        last_month = timezone.localdate().replace(day=1) - timedelta(days=1)
+        self.url = f"{reverse('salary_report')}?month={last_month.month}&year={last_month.year}"
+
+    def test_staff_nav_badge_is_not_served_stale(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Last-Modified', first)  # staff: the ETag alone decides
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LeaveRequest.objects.create(employee=self.other, start_date=date(2030, 1, 1), end_date=date(2030, 1, 2),
+                                        reason='Trip')
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertContains(second, '<span class="badge rounded-pill bg-danger ms-1">1</span>', html=True)
+
+        third = self.client.get(self.url, HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(third.status_code, 304)
+
+    def test_closed_month_reuses_the_report_fragment(self):
+        self.client.get(self.url)
+        with mock.patch('hr_app.views.monthly_work_time') as monthly_work_time:
+            second = self.client.get(self.url)
+        self.assertFalse(monthly_work_time.called)
+        self.assertContains(second, 'Report for: <span class="text-info">')
+
+# =========================================================
+# 🔐 CACHED AUTH USER
+# =========================================================
+
+class CachedUserBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = make_employees(1, Department.objects.create(name='Engineering'))[0]
+        cls.employee.user.set_password('old-password')
+        cls.employee.user.save()
+
+    def setUp(self):
+        cache.clear()
+        self.assertTrue(self.client.login(username='emp0', password='old-password'))
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(reverse('employee_dashboard'))
+        user, session_hash = cache.get(user_cache_key(self.employee.user_id))
+        self.assertNotIn('password', user.__dict__)
+        self.assertEqual(session_hash, User.objects.get(pk=self.employee.user_id).get_session_auth_hash())
+
+    def test_session_survives_cache_hits_and_password_change(self):
+        self.assertEqual(self.client.get(reverse('employee_dashboard')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('employee_dashboard')).status_code, 200)
+        response = self.client.post(reverse('change_password'), {
+            'old_password': 'old-password', 'new_password1': 'n3w-Passw0rd!', 'new_password2': 'n3w-Passw0rd!',
+        })
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('employee_dashboard')).status_code, 200)
+        self.assertTrue(User.objects.get(pk=self.employee.user_id).check_password('n3w-Passw0rd!'))
+
+# =========================================================
+# 📲 OFFLINE PUNCHES (device scope, coordinates)
+# =========================================================
+
+class PunchIngestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.engineering = Department.objects.create(name='Engineering')
+        cls.sales = Department.objects.create(name='Sales')
+        cls.engineer = make_employees(1, cls.engineering)[0]
+        cls.seller = make_employees(1, cls.sales, start=1)[0]
+        PunchDevice.objects.create(device_id='kiosk-eng', department=cls.engineering)
+        PunchDevice.objects.create(device_id='phone-1', employee=cls.seller)
+
+    def punch(self, key, device, profile, lat=OFFICE_LAT, lon=OFFICE_LON):
+        today = timezone.localdate()
+        ts = timezone.make_aware(datetime(today.year, today.month, today.day, 9, 5))
+        punch = {'key': key, 'device': device, 'employee': profile.employee_id,
+                 'ts': ts.isoformat(), 'lat': lat, 'lon': lon}
+        punch['sig'] = sign_punch(punch)
+        return punch
+
+    def ingest(self, *punches):
+        today = timezone.localdate()
+        nine_oh_six = timezone.make_aware(datetime(today.year, today.month, today.day, 9, 6))
+        with mock.patch('hr_app.punches.timezone.now', return_value=nine_oh_six):
+            summary = ingest_punches(list(punches), (OFFICE_LAT, OFFICE_LON), 100)
+        return summary['clock_ins'], [r['reason'] for r in summary['rejected']]
+
+    def test_device_punches_only_for_its_scope(self):
+        self.assertEqual(self.ingest(
+            self.punch('a', 'kiosk-eng', self.engineer),
+            self.punch('b', 'kiosk-eng', self.seller),
+            self.punch('c', 'kiosk-unregistered', self.seller),
+        ), (1, ['device_not_allowed', 'unknown_device']))
+        self.assertEqual(self.ingest(self.punch('d', 'phone-1', self.seller)), (1, []))
+
+    def test_revoked_device_is_rejected(self):
+        PunchDevice.objects.filter(device_id='kiosk-eng').update(is_active=False)
+        self.assertEqual(self.ingest(self.punch('a', 'kiosk-eng', self.engineer)), (0, ['unknown_device']))
+
+    def test_corrected_retry_of_a_rejected_punch_is_judged_again(self):
+        self.assertEqual(self.ingest(self.punch('a', 'kiosk-eng', self.engineer, lat=OFFICE_LAT + 1)),
+                         (0, ['outside_geofence']))
+        self.assertEqual(self.ingest(self.punch('a', 'kiosk-eng', self.engineer)), (1, []))
+        # Accepted keys still deduplicate.
+        self.assertEqual(self.ingest(self.punch('a', 'kiosk-eng', self.engineer)), (0, []))
+        self.assertEqual(list(PunchEvent.objects.order_by('id').values_list('key', 'outcome')),
+                         [(None, 'rejected'), ('a', 'in')])
+
+    def test_non_finite_coordinates_are_rejected(self):
+        self.assertEqual(self.ingest(
+            self.punch('a', 'kiosk-eng', self.engineer, lat=float('nan'), lon=float('nan')),
+            self.punch('b', 'kiosk-eng', self.engineer, lat='inf'),
+        ), (0, ['bad_coordinates', 'bad_coordinates']))
+        self.assertFalse(Attendance.objects.exists())
+
+# =========================================================
+# ⏰ CONCURRENT CLOCK-INS (the 9:00 rush)
+# =========================================================
+
+class ConcurrentClockInTests(TransactionTestCase):
+    WORKERS = 8
+    EMPLOYEES = 80
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("needs a file or server database, e.g. SQLITE_TUNING=1 manage.py test")
+
+    def clock_in(self, user_ids, results):
+        """One worker thread: posts one clock-in per user on its own connection."""
+        client = Client()
+        try:
+            for user_id in user_ids:
+                try:
+                    client.force_login(User.objects.get(pk=user_id))
+                    response = client.post(reverse('attendance_toggle'), {
+                        'latitude': OFFICE_LAT, 'longitude': OFFICE_LON,
+                    }, HTTP_HOST='localhost')
+                    results.append('ok' if response.status_code == 302 else response.status_code)
+                except OperationalError as exc:
+                    results.append(str(exc))
+        finally:
+            connections.close_all()
+
+    def test_no_lock_errors(self):
+        user_ids = [profile.user_id for profile in make_employees(self.EMPLOYEES, None)]
+        today = timezone.localdate()
+        # Inside the 9:00-9:10 window, so every post is a real write.
+        nine_oh_five = timezone.make_aware(datetime(today.year, today.month, today.day, 9, 5))
+
+        results = []
+        with mock.patch('hr_app.views.timezone.now', return_value=nine_oh_five):
+            threads = [
+                threading.Thread(target=self.clock_in, args=(user_ids[i::self.WORKERS], results))
+                for i in range(self.WORKERS)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([r for r in results if r != 'ok'], [])
+        self.assertEqual(Attendance.objects.count(), self.EMPLOYEES)
+
+
+# =========================================================
+# 🔬 DIAGNOSTIC MIDDLEWARE UNDER ASGI
+# =========================================================
+
+@override_settings(
+    MIDDLEWARE=[*settings.MIDDLEWARE, 'hr_app.middleware.RequestTimingMiddleware'],
+    REQUEST_TIMING_SAMPLE_RATE=1.0,
+)
+class AsyncMiddlewareTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('boss', password='x', is_staff=True)
+
+    def test_middleware_stays_async_in_an_async_stack(self):
+        async def get_response(request):
+            pass
+
+        for middleware in (RequestTimingMiddleware, ProfilingMiddleware):
+            self.assertTrue(iscoroutinefunction(middleware(get_response)), middleware.__name__)
+
+    async def test_timing_and_profiling_under_asgi(self):
+        client = AsyncClient()
+        await client.aforce_login(self.staff)
+        with TemporaryDirectory() as spool, override_settings(PROFILE_SPOOL_DIR=spool), \
+                mock.patch('hr_app.middleware.queued_logger') as queued_logger:
+            response = await client.get(reverse('presence_board'), headers={'X-HR-Profile': make_profile_token()})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue((Path(spool) / response['X-HR-Profile-File']).exists())
+        # Session and user lookups run in the request's worker thread and are still counted.
+        logged = json.loads(queued_logger.return_value.info.call_args.args[0])
+        self.assertGreater(logged['queries'], 0)
+        self.assertIn(f'desc="{logged["queries"]} queries"', response['Server-Timing'])
+
+
+# =========================================================
+# 📤 WEBHOOK DELIVERY (against a local stand-in endpoint)
+# =========================================================
+
+STANDIN_SECRET = 'standin-secret'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Plays the payroll endpoint: checks the signature, fails the first N batches, records the rest."""
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if not hmac.compare_digest(self.headers.get('X-HR-Signature', ''), webhooks.sign(STANDIN_SECRET, body)):
+            server.bad_signatures += 1
+            self.send_response(401)
+        elif server.fail_next > 0:
+            server.fail_next -= 1
+            server.failed += 1
+            self.send_response(503)
+        else:
+            server.event_ids += [event['id'] for event in json.loads(gzip.decompress(body))['events']]
+            server.batches += 1
+            self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class WebhookDeliveryTests(TestCase):
+    FAIL_FIRST = 2
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.server.fail_next, self.server.failed, self.server.bad_signatures = self.FAIL_FIRST, 0, 0
+        self.server.batches, self.server.event_ids = 0, []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        destinations = {'standin': {
+            'url': f'http://127.0.0.1:{self.server.server_port}/hooks',
+            'secret': STANDIN_SECRET, 'topics': ['attendance'],
+        }}
+        settings_override = override_settings(
+            WEBHOOK_DESTINATIONS=destinations, WEBHOOK_BATCH_SIZE=20,
+            WEBHOOK_BACKOFF_SECONDS=0.05, WEBHOOK_BACKOFF_MAX_SECONDS=0.2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        now = timezone.now()
+        department = Department.objects.create(name='Engineering')
+        self.shifts = Attendance.objects.bulk_create([
+            Attendance(employee=profile, check_in=now - timedelta(hours=9), check_out=now)
+            for profile in make_employees(50, department)
+        ])
+
+    def test_save_queues_one_outbox_insert(self):
+        shift = self.shifts[0]
+        with CaptureQueriesContext(connection) as queries:
+            shift.save()
+        outbox = [q['sql'] for q in queries.captured_queries if OutboxEvent._meta.db_table in q['sql']]
+        self.assertEqual(len(outbox), 1)
+        self.assertTrue(outbox[0].lstrip().upper().startswith('INSERT'))
+
+    def test_batches_arrive_once_in_order_after_retries(self):
+        with transaction.atomic():
+            webhooks.record_many('attendance.saved', self.shifts, webhooks.attendance_payload)
+        expected = list(OutboxEvent.objects.filter(destination='standin').order_by('id').values_list('id', flat=True))
+
+        deadline = time.monotonic() + 30
+        with self.assertLogs('hr_app.webhooks', 'WARNING') as logs:
+            while OutboxEvent.objects.filter(destination='standin', status='pending').exists():
+                self.assertLess(time.monotonic(), deadline, "queue did not drain")
+                webhooks.deliver_pending(['standin'])
+                time.sleep(0.05)
+        self.assertEqual(len(logs.records), self.FAIL_FIRST)
+
+        self.assertEqual(self.server.bad_signatures, 0)
+        self.assertEqual(self.server.failed, self.FAIL_FIRST)
+        self.assertEqual(self.server.event_ids, expected)
+        self.assertEqual(self.server.batches, 3)
+
+
+# =========================================================
+# ✂️ PAYROLL BUCKETING (Asia/Kolkata, UTC+05:30)
+# =========================================================
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+@override_settings(TIME_ZONE='Asia/Kolkata')
+class BucketingTests(SimpleTestCase):
+    HOUR = 60 * 60
+
+    def test_shift_crossing_local_midnight_is_split(self):
+        # 22:00-06:00 IST on the night of 31 Jan.
+        shift = (utc(2025, 1, 31, 16, 30), utc(2025, 2, 1, 0, 30))
+        self.assertEqual(list(split_by_day(*shift)), [
+            (date(2025, 1, 31), 2 * self.HOUR), (date(2025, 2, 1), 6 * self.HOUR),
+        ])
+        self.assertEqual(dict(bucket_seconds([shift])), {(2025, 1): 2 * self.HOUR, (2025, 2): 6 * self.HOUR})
+
+    def test_days_follow_the_local_boundary_not_utc(self):
+        # Entirely on 31 Jan in UTC, but 00:30-04:30 on 1 Feb in Kolkata.
+        shift = (utc(2025, 1, 31, 19, 0), utc(2025, 1, 31, 23, 0))
+        self.assertEqual(dict(bucket_seconds([shift], by='day')), {date(2025, 2, 1): 4 * self.HOUR})
+        # 18:00 UTC is 23:30 IST: half an hour before local midnight, the rest after.
+        shift = (utc(2025, 1, 31, 18, 0), utc(2025, 1, 31, 20, 0))
+        self.assertEqual(dict(bucket_seconds([shift])), {(2025, 1): 0.5 * self.HOUR, (2025, 2): 1.5 * self.HOUR})
+        self.assertEqual(month_bounds(2025, 2)[0], utc(2025, 1, 31, 18, 30))
+
+    def test_open_shifts_are_ignored_and_employees_kept_apart(self):
+        rows = [
+            (1, utc(2025, 1, 31, 16, 30), utc(2025, 2, 1, 0, 30)),
+            (1, utc(2025, 2, 3, 3, 30), None),
+            (2, utc(2025, 2, 3, 3, 30), utc(2025, 2, 3, 12, 30)),
+        ]
+        self.assertEqual({k: dict(v) for k, v in bucket_seconds_by_employee(rows).items()}, {
+            1: {(2025, 1): 2 * self.HOUR, (2025, 2): 6 * self.HOUR},
+            2: {(2025, 2): 9 * self.HOUR},
+        })
+
+    def test_leaves_spanning_months_count_days_inclusively(self):
+        self.assertEqual(dict(leave_days_by_month([
+            (date(2025, 1, 30), date(2025, 2, 2)),      # 2 + 2
+            (date(2024, 12, 31), date(2025, 1, 1)),     # across a year
+            (date(2024, 2, 28), date(2024, 3, 1)),      # leap February
+            (date(2025, 3, 10), date(2025, 3, 10)),     # a single day
+        ])), {
+            (2025, 1): 3, (2025, 2): 2, (2024, 12): 1,
+            (2024, 2): 2, (2024, 3): 1, (2025, 3): 1,
+        })
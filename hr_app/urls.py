@@ -22,12 +22,15 @@ urlpatterns = [
     # ==========================================
     path('dashboard/', views.EmployeeDashboardView.as_view(), name='employee_dashboard'),
     path('admin_dashboard/', views.AdminDashboardView.as_view(), name='admin_dashboard'),
+    path('presence/', views.PresenceBoardView.as_view(), name='presence_board'),
+    path('presence/stream/', views.PresenceStreamView.as_view(), name='presence_stream'),
 
 
     # ==========================================
     # ⏱️ ATTENDANCE & SHIFTS
     # ==========================================
     path('attendance_toggle/', views.AttendanceToggleView.as_view(), name='attendance_toggle'),
+    path('api/punches/', views.PunchIngestView.as_view(), name='punch_ingest'),
     
     # Early Out System
     path('request_early_out/', views.RequestEarlyOutView.as_view(), name='request_early_out'),
@@ -51,6 +54,7 @@ urlpatterns = [
     path('apply_leave/', views.ApplyLeaveView.as_view(), name='apply_leave'),
     path('manage_leaves/', views.ManageLeavesView.as_view(), name='manage_leaves'),
     path('update_leave_status/<int:leave_id>/<str:status>/', views.UpdateLeaveStatusView.as_view(), name='update_leave_status'),
+    path('coverage_forecast/', views.CoverageForecastView.as_view(), name='coverage_forecast'),
 
 
     # ==========================================
@@ -58,6 +62,7 @@ urlpatterns = [
     # ==========================================
     path('create_employee/', views.CreateEmployeeView.as_view(), name='create_employee'),
     path('all_employees/', views.AllEmployeesView.as_view(), name='all_employees'),
+    path('employee_search/', views.EmployeeSearchView.as_view(), name='employee_search'),
     path('employee/<int:profile_id>/', views.AdminEmployeeDetailView.as_view(), name='admin_employee_detail'),
     path('edit_employee/<int:profile_id>/', views.EditEmployeeView.as_view(), name='edit_employee'),
     path('delete_employee/<int:profile_id>/', views.DeleteEmployeeView.as_view(), name='delete_employee'),
@@ -75,5 +80,6 @@ urlpatterns = [
     # 💰 REPORTS & API
     # ==========================================
     path('salary_report/', views.MonthlySalaryReportView.as_view(), name='salary_report'),
+    path('payslip/<int:year>/<int:month>/', views.PayslipDownloadView.as_view(), name='payslip_download'),
     path('api/check_user/', views.check_user_existence, name='check_user_existence'),
 ]
\ No newline at end of file
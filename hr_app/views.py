@@ -1,19 +1,32 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
 from django.views import View
 from django.utils import timezone
-from decimal import Decimal
 from django.contrib import messages
 from django.contrib.auth.views import PasswordChangeView, PasswordResetView
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db import IntegrityError, transaction
 from django.db.models import Q, Sum, Count
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+from django.template.loader import render_to_string
 from datetime import timedelta, date
+import asyncio
 import calendar
+import json
+import logging
 import math
+import os
 
 # Import Models
 from .models import ( 
@@ -23,7 +36,8 @@ from .models import (
     LeaveRequest, 
     Announcement, 
     EarlyClockOutRequest,
-    LateArrivalRequest  # <--- Make sure this is imported!
+    LateArrivalRequest,  # <--- Make sure this is imported!
+    Payslip,
 )
 
 # Import Forms
@@ -39,6 +53,26 @@ from .forms import (
     CustomPasswordResetForm,
     LateArrivalForm  # <--- Make sure this is imported!
 )
+from .db_routers import replica_reads
+from .caching import (
+    announcement_generation,
+    ANNOUNCEMENT_CACHE_TIMEOUT,
+    salary_report_key,
+    salary_report_page_etag,
+    salary_report_validators,
+    SALARY_REPORT_CACHE_TIMEOUT,
+)
+from .archiving import monthly_work_time
+from .payroll import salary_breakdown
+from .bucketing import leave_days_by_month, leaves_touching_month
+from .coverage import get_coverage, peak_out, HORIZON_DAYS
+from .leaves import overlapping_leaves
+from .counters import pending_counts
+from .presence import hub as presence_hub, sse_message
+from .search import autocomplete, matching_profile_ids
+from . import audit
+
+logger = logging.getLogger(__name__)
 
 
 # =========================================================
@@ -106,22 +140,27 @@ class EmployeeDashboardView(View):
             check_in__date=now.date()
         ).first()
         
+        # Lazy queryset: only evaluated when the cached notice-board fragment
+        # for the current announcement generation is missing.
         announcements = Announcement.objects.all().order_by('-date_posted')[:5]
 
         return render(request, 'hr_app/employee_dashboard.html', {
             'profile': profile,
             'current_shift': current_shift,
             'today_record': today_record,
-            'announcements': announcements
+            'announcements': announcements,
+            'announcement_generation': announcement_generation(),
+            'announcement_cache_timeout': ANNOUNCEMENT_CACHE_TIMEOUT,
         })
 
 # 4. Admin Dashboard (Analytics)
 @method_decorator(staff_member_required, name='dispatch')
+@method_decorator(replica_reads, name='get')
 class AdminDashboardView(View):
     def get(self, request):
         total_employees = EmployeeProfile.objects.count()
         present_today = Attendance.objects.filter(check_in__date=timezone.now().date()).count()
-        pending_leaves = LeaveRequest.objects.filter(status='Pending').count()
+        pending_leaves = pending_counts()['leave']
         recent_logins = Attendance.objects.order_by('-check_in')[:5]
 
         context = {
@@ -140,6 +179,9 @@ class AdminDashboardView(View):
 # 5. Attendance Toggle (Strict 9:00-9:10 & 6:00 PM Rules)
 @method_decorator(login_required, name='dispatch')
 class AttendanceToggleView(View):
+    # Read-then-write in one transaction. With SQLITE_TUNING this is a
+    # BEGIN IMMEDIATE, so concurrent clock-ins queue on the busy timeout.
+    @method_decorator(transaction.atomic)
     def post(self, request):
         try:
             profile = request.user.employeeprofile
@@ -203,8 +245,8 @@ class AttendanceToggleView(View):
             start_window = now_local.replace(hour=9, minute=0, second=0, microsecond=0)
             end_window = now_local.replace(hour=9, minute=10, second=0, microsecond=0)
             
-            # Debugging: Print to console to see exactly what the server sees
-            print(f"DEBUG TIME: Current Local: {now_local} | Window: {start_window} to {end_window}")
+            # Debugging: log exactly what the server sees (HR_LOG_LEVEL=DEBUG)
+            logger.debug("Clock-in time check: local=%s window=%s to %s", now_local, start_window, end_window)
 
             if now_local < start_window:
                  messages.error(request, f"You cannot clock in before 9:00 AM. (Server time: {now_local.strftime('%I:%M %p')})")
@@ -228,6 +270,8 @@ class RequestLateArrivalView(View):
         form = LateArrivalForm()
         return render(request, 'hr_app/request_late_arrival.html', {'form': form})
 
+    # The request and its pending-counter increment commit together.
+    @method_decorator(transaction.atomic)
     def post(self, request):
         form = LateArrivalForm(request.POST)
         if form.is_valid():
@@ -248,30 +292,36 @@ class ManageLateArrivalsView(View):
 # 8. Update Late Arrival Status (Admin Action)
 @method_decorator(staff_member_required, name='dispatch')
 class UpdateLateArrivalStatusView(View):
+    # Locked, so two admins acting at once cannot both move the pending counter.
+    @method_decorator(transaction.atomic)
     def get(self, request, *args, **kwargs):
         req_id = kwargs.get('req_id')
         status = kwargs.get('status')
         
         try:
-            late_req = LateArrivalRequest.objects.get(id=req_id)
+            late_req = LateArrivalRequest.objects.select_for_update().get(id=req_id)
         except LateArrivalRequest.DoesNotExist:
             messages.error(request, "Request not found.")
             return redirect('manage_late_arrivals')
 
+        before = audit.snapshot(late_req)
         if status == 'Approved':
             late_req.status = 'Approved'
             late_req.save()
+            audit.record_change(request.user, late_req, before, action='approve')
             
             # Create the Attendance Record using the requested time
-            Attendance.objects.create(
+            shift = Attendance.objects.create(
                 employee=late_req.employee,
                 check_in=late_req.requested_at
             )
+            audit.record_change(request.user, shift)
             messages.success(request, f"Approved. {late_req.employee.user.username} is now Clocked In.")
 
         elif status == 'Rejected':
             late_req.status = 'Rejected'
             late_req.save()
+            audit.record_change(request.user, late_req, before, action='reject')
             messages.info(request, "Request rejected. Employee NOT clocked in.")
             
         return redirect('manage_late_arrivals')
@@ -288,6 +338,7 @@ class RequestEarlyOutView(View):
         form = EarlyClockOutForm()
         return render(request, 'hr_app/request_early_out.html', {'form': form})
 
+    @method_decorator(transaction.atomic)
     def post(self, request):
         try:
             profile = request.user.employeeprofile
@@ -319,24 +370,29 @@ class ManageEarlyOutsView(View):
 # 11. Approve/Reject Early Out (Admin Action)
 @method_decorator(staff_member_required, name='dispatch')
 class UpdateEarlyOutStatusView(View):
+    @method_decorator(transaction.atomic)
     def get(self, request, *args, **kwargs):
         req_id = kwargs.get('req_id')
         status = kwargs.get('status')
         
         try:
-            req = EarlyClockOutRequest.objects.get(id=req_id)
+            req = EarlyClockOutRequest.objects.select_for_update().get(id=req_id)
         except EarlyClockOutRequest.DoesNotExist:
             messages.error(request, "Early Out Request not found.")
             return redirect('manage_early_outs')
 
+        before = audit.snapshot(req)
         if status == 'Approved':
             req.status = 'Approved'
             req.save()
+            audit.record_change(request.user, req, before, action='approve')
             
             attendance = req.attendance
             if not attendance.check_out:
+                attendance_before = audit.snapshot(attendance)
                 attendance.check_out = timezone.now()
                 attendance.save()
+                audit.record_change(request.user, attendance, attendance_before)
                 messages.success(request, f"Approved & Clocked Out {req.employee.user.username}.")
             else:
                 messages.warning(request, "Request approved, but employee was already clocked out.")
@@ -344,6 +400,7 @@ class UpdateEarlyOutStatusView(View):
         elif status == 'Rejected':
             req.status = 'Rejected'
             req.save()
+            audit.record_change(request.user, req, before, action='reject')
             messages.info(request, "Request rejected.")
             
         return redirect('manage_early_outs')
@@ -402,20 +459,17 @@ class ApplyLeaveView(View):
     def get(self, request):
         form = LeaveRequestForm()
         profile = request.user.employeeprofile
-        today = timezone.now()
+        today = timezone.localdate()
 
         # 1. Calculate Leaves Taken THIS MONTH
+        # (only the days that fall inside this month count)
         current_month_leaves = LeaveRequest.objects.filter(
+            leaves_touching_month(today.year, today.month),
             employee=profile,
-            status='Approved',
-            start_date__year=today.year,
-            start_date__month=today.month
-        )
+            status='Approved'
+        ).values_list('start_date', 'end_date')
 
-        leaves_taken_count = 0
-        for leave in current_month_leaves:
-            delta = leave.end_date - leave.start_date
-            leaves_taken_count += (delta.days + 1)
+        leaves_taken_count = leave_days_by_month(current_month_leaves).get((today.year, today.month), 0)
         
         # 2. Determine Available vs Taken
         # Quota is 2
@@ -431,13 +485,18 @@ class ApplyLeaveView(View):
         })
 
     def post(self, request):
-        form = LeaveRequestForm(request.POST)
+        # Employee set up front so model validation can check for overlapping leaves
+        form = LeaveRequestForm(request.POST, instance=LeaveRequest(employee=request.user.employeeprofile))
         if form.is_valid():
-            leave = form.save(commit=False)
-            leave.employee = request.user.employeeprofile
-            leave.save()
-            messages.success(request, "Leave request submitted successfully.")
-            return redirect('apply_leave')
+            try:
+                with transaction.atomic():
+                    form.save()
+            except IntegrityError:
+                # Lost a race against a concurrent request (Postgres exclusion constraint)
+                form.add_error(None, "This leave overlaps another of your leave requests.")
+            else:
+                messages.success(request, "Leave request submitted successfully.")
+                return redirect('apply_leave')
             
         # If error, we still need context
         profile = request.user.employeeprofile
@@ -448,30 +507,83 @@ class ApplyLeaveView(View):
 @method_decorator(staff_member_required, name='dispatch')
 class ManageLeavesView(View):
     def get(self, request):
-        leaves = LeaveRequest.objects.all().order_by('-created_at')
+        leaves = list(
+            LeaveRequest.objects.select_related('employee__user', 'employee__department').order_by('-created_at')
+        )
+
+        # "N of M out" hint for each pending request, from the cached coverage arrays
+        pending = [leave for leave in leaves if leave.status == 'Pending' and leave.employee.department_id]
+        department_coverage = get_coverage({leave.employee.department_id for leave in pending})
+        for leave in pending:
+            entry = department_coverage[leave.employee.department_id]
+            out, day = peak_out(entry, leave.start_date, leave.end_date)
+            if day is not None:
+                leave.coverage_out = out + 1  # including this request, if approved
+                leave.coverage_headcount = entry['headcount']
+                leave.coverage_day = day
+
         return render(request, 'hr_app/manage_leaves.html', {'leaves': leaves})
 
 # 15. Update Leave Status (Admin Action)
 @method_decorator(staff_member_required, name='dispatch')
 class UpdateLeaveStatusView(View):
+    @method_decorator(transaction.atomic)
     def get(self, request, *args, **kwargs):
         leave_id = kwargs.get('leave_id')
         status = kwargs.get('status')
         
         try:
-            leave = LeaveRequest.objects.get(id=leave_id)
+            leave = LeaveRequest.objects.select_for_update().get(id=leave_id)
         except LeaveRequest.DoesNotExist:
             messages.error(request, "Leave request not found.")
             return redirect('manage_leaves')
             
         if status in ['Approved', 'Rejected']:
+            # A rejected leave is not checked against the employee's other
+            # leaves, so approving it later has to re-check the overlap rule.
+            if status == 'Approved':
+                clash = overlapping_leaves(leave.employee_id, leave.start_date, leave.end_date, exclude_pk=leave.pk)
+                if clash:
+                    messages.error(
+                        request,
+                        f"Cannot approve: overlaps the employee's {clash.status.lower()} leave "
+                        f"from {clash.start_date:%b %d} to {clash.end_date:%b %d}."
+                    )
+                    return redirect('manage_leaves')
+
+            before = audit.snapshot(leave)
             leave.status = status
-            leave.save()
+            leave.approved_by = request.user if status == 'Approved' else None
+            try:
+                with transaction.atomic():
+                    leave.save()
+            except IntegrityError:
+                # Lost a race against a concurrent request (Postgres exclusion constraint)
+                messages.error(request, "Cannot approve: this leave now overlaps another of the employee's leaves.")
+                return redirect('manage_leaves')
+            audit.record_change(request.user, leave, before, action='approve' if status == 'Approved' else 'reject')
             if status == 'Approved':
+                employee_before = audit.snapshot(leave.employee)
                 leave.employee.status = 'On Leave'
-                leave.employee.save()
+                leave.employee.save(update_fields=['status'])
+                audit.record_change(request.user, leave.employee, employee_before)
                 
             messages.success(request, f"Leave request {status}.")
+
+            # Staffing check for the leave's dates, once the approval has
+            # committed and invalidated the department's cached coverage.
+            department_id = leave.employee.department_id
+            if status == 'Approved' and department_id:
+                def staffing_check():
+                    entry = get_coverage([department_id])[department_id]
+                    out, day = peak_out(entry, leave.start_date, leave.end_date)
+                    if day is not None and out > 1:
+                        messages.warning(
+                            request,
+                            f"Heads-up: {out} of {entry['headcount']} people in {leave.employee.department} "
+                            f"will be out on {day:%b %d}."
+                        )
+                transaction.on_commit(staffing_check)
             
         return redirect('manage_leaves')
 
@@ -516,17 +628,34 @@ class CreateEmployeeView(View):
 
 # 17. All Employees (Directory)
 @method_decorator(staff_member_required, name='dispatch')
+@method_decorator(replica_reads, name='get')
 class AllEmployeesView(View):
     def get(self, request):
-        employees = EmployeeProfile.objects.all()
-        today = timezone.now().date()
+        all_profiles = EmployeeProfile.objects.all()
+        employees = all_profiles.select_related('user', 'department').order_by('id')
+
+        # Directory search (?q=) goes through the search index, not icontains joins
+        query = request.GET.get('q', '').strip()
+        matching_ids = matching_profile_ids(query)
+        if matching_ids is not None:
+            employees = employees.filter(pk__in=matching_ids)
+        employees = list(employees)
+
+        # Today's shift for every listed employee in one query
+        today = timezone.localdate()
+        today_attendance = {}
+        for shift in Attendance.objects.filter(
+            employee__in=[emp.pk for emp in employees], check_in__date=today
+        ).order_by('-check_in'):
+            today_attendance[shift.employee_id] = shift  # earliest shift of the day wins
         for emp in employees:
-            emp.today_attendance = Attendance.objects.filter(employee=emp, check_in__date=today).first()
-            
+            emp.today_attendance = today_attendance.get(emp.pk)
+
         context = {
             'employees': employees,
-            'total_employees': employees.count(),
-            'total_active': employees.filter(status='Active').count()
+            'query': query,
+            'total_employees': all_profiles.count(),
+            'total_active': all_profiles.filter(status='Active').count()
         }
         return render(request, 'hr_app/all_employees.html', context)
 
@@ -541,7 +670,10 @@ class AdminEmployeeDetailView(View):
             messages.error(request, "Employee profile not found.")
             return redirect('all_employees')
             
-        return render(request, 'hr_app/admin_employee_detail.html', {'profile': profile})
+        return render(request, 'hr_app/admin_employee_detail.html', {
+            'profile': profile,
+            'history': audit.history(EmployeeProfile, profile.pk, limit=20),
+        })
 
 # 19. Edit Employee (Admin Update)
 @method_decorator(staff_member_required, name='dispatch')
@@ -565,10 +697,12 @@ class EditEmployeeView(View):
             messages.error(request, "Employee not found.")
             return redirect('all_employees')
             
+        before = audit.snapshot(profile)  # the form writes into the instance while validating
         form = EmployeeProfileForm(request.POST, request.FILES, instance=profile)
         
         if form.is_valid():
             form.save()
+            audit.record_change(request.user, profile, before)
             messages.success(request, "Employee details updated.")
             return redirect('all_employees')
         return render(request, 'hr_app/edit_employee.html', {'form': form, 'profile': profile})
@@ -578,12 +712,17 @@ class EditEmployeeView(View):
 class DeleteEmployeeView(View):
     def post(self, request, *args, **kwargs):
         profile_id = kwargs.get('profile_id')
-        try:
-            profile = EmployeeProfile.objects.get(id=profile_id)
-            user = profile.user
-            user.delete() 
-            messages.success(request, "Employee account deleted successfully.")
-        except EmployeeProfile.DoesNotExist:
+        # Deactivate now; attendance and leave history is purged in small
+        # batches by `manage.py run_offboarding` instead of one huge cascade.
+        # Imported here: rarely used, and kept out of the serverless cold start.
+        from .offboarding import offboard
+
+        jobs = offboard(EmployeeProfile.objects.filter(id=profile_id), mode='purge', requested_by=request.user)
+        if jobs:
+            messages.success(request, f"{jobs[0].employee_label} has been deactivated. Their records will be deleted shortly.")
+        elif EmployeeProfile.objects.filter(id=profile_id).exists():
+            messages.info(request, "This employee is already being offboarded.")
+        else:
             messages.error(request, "Employee not found or already deleted.")
             
         return redirect('all_employees')
@@ -618,14 +757,18 @@ class AddDepartmentView(View):
         })
 
 # 22. Create Announcement
+# Only the most recent notices are listed; older ones stay in /admin/.
+ANNOUNCEMENT_HISTORY_LIMIT = 50
+
 @method_decorator(staff_member_required, name='dispatch')
 class CreateAnnouncementView(View):
     def get(self, request):
         form = AnnouncementForm()
-        announcements = Announcement.objects.all().order_by('-date_posted')
+        announcements = Announcement.objects.all().order_by('-date_posted')[:ANNOUNCEMENT_HISTORY_LIMIT]
         return render(request, 'hr_app/create_announcement.html', {
             'form': form,
-            'announcements': announcements  
+            'announcements': announcements,
+            'announcement_count': Announcement.objects.count()
         })
 
     def post(self, request):
@@ -636,10 +779,11 @@ class CreateAnnouncementView(View):
             notice.save()
             messages.success(request, "Announcement posted successfully!")
             return redirect('create_announcement') 
-        announcements = Announcement.objects.all().order_by('-date_posted')
+        announcements = Announcement.objects.all().order_by('-date_posted')[:ANNOUNCEMENT_HISTORY_LIMIT]
         return render(request, 'hr_app/create_announcement.html', {
             'form': form,
-            'announcements': announcements
+            'announcements': announcements,
+            'announcement_count': Announcement.objects.count()
         })
 
 # 23. Delete Announcement (Admin Only)
@@ -663,6 +807,7 @@ class DeleteAnnouncementView(View):
 
 # 24. Monthly Salary Report
 @method_decorator(login_required, name='dispatch')
+@method_decorator(replica_reads, name='get')
 class MonthlySalaryReportView(View):
     def get(self, request):
         profile = request.user.employeeprofile
@@ -678,66 +823,87 @@ class MonthlySalaryReportView(View):
             target_month = today.month
             target_year = today.year
 
-        # 1. CALCULATE WORKED HOURS (From Attendance)
-        attendances = Attendance.objects.filter(
-            employee=profile,
-            check_in__year=target_year,
-            check_in__month=target_month,
-            check_out__isnull=False
-        ).order_by('check_in')
-        
-        total_seconds = 0
-        for att in attendances:
-            duration = att.check_out - att.check_in
-            total_seconds += duration.total_seconds()
-        
-        work_hours_float = total_seconds / 3600
+        # 0. CONDITIONAL GET / CACHED FRAGMENT
+        # Cheap change-stamps decide whether anything below needs to run.
+        # Skipped while flash messages are pending: they are part of the page.
+        use_cache = len(messages.get_messages(request)) == 0
+        if use_cache:
+            report_etag, last_modified = salary_report_validators(profile, target_year, target_month)
+            etag = salary_report_page_etag(report_etag, request)
+            # Staff badges change without touching the report's stamps, so
+            # their pages revalidate on the ETag alone.
+            last_modified_ts = (
+                int(last_modified.timestamp())
+                if last_modified and not (request.user.is_staff or request.user.is_superuser) else None
+            )
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+            if not_modified is not None:
+                return self._with_validators(not_modified, etag, last_modified_ts)
+
+            # Past months are closed for payroll: reuse the rendered report
+            # (not the page around it, whose nav is per request).
+            local_today = timezone.localdate()
+            is_closed_month = (target_year, target_month) < (local_today.year, local_today.month)
+            cache_key = salary_report_key(profile.pk, target_year, target_month)
+            if is_closed_month:
+                cached = cache.get(cache_key)
+                if cached and cached[0] == report_etag:
+                    return self._render_page(request, cached[1], etag, last_modified_ts)
+
+        # 1. CALCULATE WORKED HOURS (live and archived attendance)
+        # Shifts are split at local midnight, so overnight shifts across a
+        # month edge are paid to each month for its own hours. Includes
+        # shifts already moved to the archive.
+        total_seconds = monthly_work_time(profile, target_year, target_month).total_seconds()
         
-        # 2. CALCULATE PAID LEAVE HOURS
-        # Logic: Find approved leaves that fall in this month
+        # 2. CALCULATE PAID LEAVE DAYS
+        # Logic: Find approved leaves overlapping this month and count
+        # only the days (inclusive) that fall inside it
         approved_leaves = LeaveRequest.objects.filter(
+            leaves_touching_month(target_year, target_month),
             employee=profile,
-            status='Approved',
-            start_date__year=target_year,
-            start_date__month=target_month
-        )
-        
-        leave_days_count = 0
-        for leave in approved_leaves:
-            # Calculate duration of leave in days (inclusive)
-            # Simplification: We assume start & end are in the same month for now
-            delta = leave.end_date - leave.start_date
-            days = delta.days + 1 
-            leave_days_count += days
-
-        # RULE: Max 2 Paid Leaves. Each counts as 9 Hours income.
-        paid_leave_days = min(leave_days_count, 2)
-        unpaid_leave_days = max(0, leave_days_count - 2)
-        
-        paid_leave_hours = paid_leave_days * 9  # 9 hours per day
+            status='Approved'
+        ).values_list('start_date', 'end_date')
         
+        leave_days_count = leave_days_by_month(approved_leaves).get((target_year, target_month), 0)
+
         # 3. FINAL TOTALS
-        total_payable_hours = work_hours_float + paid_leave_hours
-        
-        # Convert to Decimal for currency math
-        total_hours_decimal = Decimal(str(round(total_payable_hours, 2)))       
-        hourly_rate = profile.salary_per_hour if profile.salary_per_hour else Decimal('0.00')
-        
-        gross_salary = total_hours_decimal * hourly_rate    
+        # RULE: Max 2 Paid Leaves, 9 hours income each (shared with payslips)
+        pay = salary_breakdown(total_seconds, leave_days_count, profile.salary_per_hour)
         month_name = calendar.month_name[target_month]
+        has_payslip = Payslip.objects.filter(employee=profile, year=target_year, month=target_month).exists()
         
-        return render(request, 'hr_app/salary_report.html', {
+        report_body = render_to_string('hr_app/salary_report_body.html', {
             'profile': profile,
-            'attendances': attendances,
-            'work_hours': round(work_hours_float, 2), # Actual worked
-            'paid_leave_hours': paid_leave_hours,     # Bonus hours
-            'paid_leave_days': paid_leave_days,
-            'unpaid_leave_days': unpaid_leave_days,
-            'estimated_salary': round(gross_salary, 2),
+            'work_hours': pay['work_hours'],               # Actual worked
+            'paid_leave_hours': pay['paid_leave_hours'],   # Bonus hours
+            'paid_leave_days': pay['paid_leave_days'],
+            'unpaid_leave_days': pay['unpaid_leave_days'],
+            'estimated_salary': pay['gross_salary'],
             'selected_month': target_month,
             'selected_year': target_year,
-            'month_name': month_name
-        })
+            'month_name': month_name,
+            'has_payslip': has_payslip,
+        }, request=request)
+
+        if not use_cache:
+            return render(request, 'hr_app/salary_report.html', {'report_body': mark_safe(report_body)})
+        if is_closed_month:
+            cache.set(cache_key, (report_etag, report_body), SALARY_REPORT_CACHE_TIMEOUT)
+        return self._render_page(request, report_body, etag, last_modified_ts)
+
+    def _render_page(self, request, report_body, etag, last_modified_ts):
+        response = render(request, 'hr_app/salary_report.html', {'report_body': mark_safe(report_body)})
+        return self._with_validators(response, etag, last_modified_ts)
+
+    @staticmethod
+    def _with_validators(response, etag, last_modified_ts):
+        response['ETag'] = etag
+        if last_modified_ts is not None:
+            response['Last-Modified'] = http_date(last_modified_ts)
+        # Per-user page: browsers may keep it but must revalidate each time.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 # 25. AJAX API: Check User Existence
 def check_user_existence(request):
@@ -779,4 +945,128 @@ def calculate_distance(lat1, lon1, lat2, lon2):
         math.sin(delta_lambda / 2.0) ** 2
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
-    return R * c
\ No newline at end of file
+    return R * c
+
+
+# 26. Department Leave Coverage Forecast (next 90 days)
+@method_decorator(staff_member_required, name='dispatch')
+class CoverageForecastView(View):
+    def get(self, request):
+        departments = list(Department.objects.order_by('name'))
+        department_coverage = get_coverage([dept.id for dept in departments])
+
+        rows = []
+        for dept in departments:
+            entry = department_coverage[dept.id]
+            weeks = []
+            for week_start in range(0, HORIZON_DAYS, 7):
+                days = range(week_start, min(week_start + 7, HORIZON_DAYS))
+                weeks.append({
+                    'start': entry['start'] + timedelta(days=week_start),
+                    'approved': max(entry['Approved'][i] for i in days),
+                    'with_pending': max(entry['Approved'][i] + entry['Pending'][i] for i in days),
+                })
+            peak = max(weeks, key=lambda week: week['with_pending'])
+            rows.append({'department': dept, 'headcount': entry['headcount'], 'weeks': weeks, 'peak': peak})
+
+        return render(request, 'hr_app/coverage_forecast.html', {
+            'rows': rows,
+            'week_starts': [week['start'] for week in rows[0]['weeks']] if rows else [],
+            'horizon_days': HORIZON_DAYS,
+        })
+
+
+# 27. Live Presence Board (Admin)
+@method_decorator(staff_member_required, name='dispatch')
+class PresenceBoardView(View):
+    def get(self, request):
+        # The page is static; rows arrive over PresenceStreamView.
+        return render(request, 'hr_app/presence_board.html')
+
+
+# 28. Presence Event Stream (SSE, served from the in-memory presence map)
+@method_decorator(staff_member_required, name='get')
+class PresenceStreamView(View):
+    async def get(self, request):
+        await sync_to_async(presence_hub.ensure_fresh)()
+
+        if not isinstance(request, ASGIRequest):
+            # WSGI cannot hold the connection open: send one snapshot and let
+            # EventSource poll again after `retry` ms.
+            body = "retry: 10000\n" + sse_message('snapshot', presence_hub.snapshot())
+            return HttpResponse(body, content_type='text/event-stream')
+
+        response = StreamingHttpResponse(self.events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # no proxy buffering (nginx)
+        return response
+
+    async def events(self):
+        # Subscribe before the snapshot so nothing is missed in between.
+        subscriber = presence_hub.subscribe()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.PRESENCE_STREAM_MAX_SECONDS
+        try:
+            yield sse_message('snapshot', presence_hub.snapshot())
+            while not subscriber.overflowed and loop.time() < deadline:
+                try:
+                    event, data = await asyncio.wait_for(
+                        subscriber.queue.get(), settings.PRESENCE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    await sync_to_async(presence_hub.ensure_fresh)()
+                    yield ": ping\n\n"
+                    continue
+                yield sse_message(event, data)
+        finally:
+            presence_hub.unsubscribe(subscriber)
+
+
+# 29. Offline Punch Upload (kiosks / phones; punches are signed per device, no session)
+@method_decorator(csrf_exempt, name='dispatch')
+class PunchIngestView(View):
+    def post(self, request):
+        # Read the stream ourselves: large batches exceed DATA_UPLOAD_MAX_MEMORY_SIZE.
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if length > settings.PUNCH_UPLOAD_MAX_BYTES:
+            return JsonResponse({'error': 'Upload too large.'}, status=413)
+        try:
+            payload = json.loads(request.read(settings.PUNCH_UPLOAD_MAX_BYTES + 1))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON.'}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'error': "Expected an object with a 'punches' list."}, status=400)
+
+        from .punches import ingest_punches, PunchBatchError  # device uploads only; not on the cold-start path
+
+        try:
+            summary = ingest_punches(payload.get('punches'), (OFFICE_LAT, OFFICE_LON), PERMITTED_RADIUS_METERS)
+        except PunchBatchError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        except IntegrityError:
+            # Same keys uploaded concurrently; nothing was applied, retrying is safe.
+            return JsonResponse({'error': 'Conflicting upload in progress, retry.'}, status=409)
+        return JsonResponse(summary)
+
+
+# 30. AJAX API: Employee Search Autocomplete (Admin)
+@method_decorator(staff_member_required, name='dispatch')
+class EmployeeSearchView(View):
+    def get(self, request):
+        results = autocomplete(request.GET.get('q', ''), limit=10)
+        return JsonResponse({'results': results})
+
+
+# 31. Payslip Download (generated by `manage.py generate_payslips`)
+@method_decorator(login_required, name='dispatch')
+class PayslipDownloadView(View):
+    def get(self, request, year, month):
+        # Own payslips only: the lookup is scoped to the logged-in employee.
+        payslip = get_object_or_404(Payslip, employee__user=request.user, year=year, month=month)
+        path = os.path.join(settings.MEDIA_ROOT, payslip.file)
+        if not os.path.exists(path):
+            raise Http404("Payslip file is missing.")
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True,
+            filename=f"payslip-{payslip.year}-{payslip.month:02d}.html", content_type='text/html',
+        )
@@ -0,0 +1,246 @@
+# hr_app/webhooks.py
+"""
+Outbound webhooks to the payroll provider (and any other destination in
+WEBHOOK_DESTINATIONS).
+
+Transactional outbox: signals on Attendance, LeaveRequest and
+EmployeeProfile write one OutboxEvent per subscribed destination in the same
+transaction as the change (a single INSERT), so the request never talks to
+the remote side and a rolled-back change is never sent. Payloads are built
+from the instance's own columns only; employee codes are joined in at
+delivery time, one query per batch.
+
+`manage.py deliver_webhooks` (one worker at a time, like offboarding) sends
+each destination's pending events oldest first, up to WEBHOOK_BATCH_SIZE per
+POST:
+
+    POST <url>
+    Content-Type: application/json
+    Content-Encoding: gzip
+    X-HR-Batch: payroll:1041-1240
+    X-HR-Signature: sha256=<hex HMAC of the gzipped body with the secret>
+
+    {"destination": "payroll", "events": [{"id": 1041, "topic": "attendance.saved",
+     "created_at": "...", "data": {...}}, ...]}
+
+Any 2xx marks the batch delivered. Anything else retries the whole batch
+with exponential backoff, and nothing behind it is sent in the meantime, so
+a destination receives its events in order. A batch can arrive twice (the
+worker died between the POST and marking it), so receivers should dedupe on
+the event id. Events still failing after WEBHOOK_MAX_ATTEMPTS are set aside
+as 'dead' (re-queue them from the admin) and the queue moves on.
+"""
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmployeeProfile, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'hr-emp-webhooks/1'
+# Delivered events kept for troubleshooting before `purge_delivered` removes them.
+DELIVERED_KEEP_DAYS = 7
+
+
+class WebhookDeliveryError(Exception):
+    pass
+
+
+# =========================================================
+# 📤 RECORDING (request path: one INSERT)
+# =========================================================
+
+def attendance_payload(shift):
+    return {'id': shift.pk, 'employee': shift.employee_id, 'check_in': shift.check_in, 'check_out': shift.check_out}
+
+
+def leave_payload(leave):
+    return {
+        'id': leave.pk, 'employee': leave.employee_id, 'start_date': leave.start_date,
+        'end_date': leave.end_date, 'status': leave.status, 'approved_by': leave.approved_by_id,
+    }
+
+
+def employee_payload(profile):
+    return {
+        'id': profile.pk, 'employee_id': profile.employee_id, 'department': profile.department_id,
+        'job_title': profile.job_title, 'status': profile.status, 'salary_per_hour': profile.salary_per_hour,
+    }
+
+
+def _subscribers(topic):
+    group = topic.split('.', 1)[0]
+    return [
+        name for name, conf in settings.WEBHOOK_DESTINATIONS.items()
+        if conf.get('url') and group in conf.get('topics', ())
+    ]
+
+
+def _json_safe(payload):
+    return json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+
+
+def record_many(topic, instances, payload_fn):
+    """Queues `topic` for each instance to every subscribed destination, in one bulk INSERT."""
+    destinations = _subscribers(topic)
+    if not destinations:
+        return
+    events = [
+        OutboxEvent(destination=name, topic=topic, entity_id=str(instance.pk), payload=payload)
+        for instance in instances
+        for payload in [_json_safe(payload_fn(instance))]
+        for name in destinations
+    ]
+    OutboxEvent.objects.bulk_create(events, batch_size=1000)
+
+
+def record(topic, instance, payload_fn):
+    record_many(topic, [instance], payload_fn)
+
+
+# =========================================================
+# 🚚 DELIVERY (worker)
+# =========================================================
+
+def _with_employee_codes(events):
+    """Adds 'employee_code' next to the profile id in attendance / leave payloads."""
+    ids = {event.payload['employee'] for event in events if 'employee' in event.payload}
+    codes = dict(EmployeeProfile.objects.filter(pk__in=ids).values_list('pk', 'employee_id'))
+    out = []
+    for event in events:
+        data = event.payload
+        if 'employee' in data:
+            data = {**data, 'employee_code': codes.get(data['employee'])}
+        out.append({'id': event.pk, 'topic': event.topic, 'created_at': event.created_at, 'data': data})
+    return out
+
+
+def encode_batch(name, events):
+    """(gzipped JSON body, uncompressed size)."""
+    document = {'destination': name, 'events': _with_employee_codes(events)}
+    raw = json.dumps(document, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    return gzip.compress(raw, compresslevel=6), len(raw)
+
+
+def sign(secret, body):
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def post_batch(conf, body, batch_id):
+    import urllib.error
+    import urllib.request  # worker only: keeps http.client out of a web cold start
+
+    request = urllib.request.Request(conf['url'], data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        'Content-Encoding': 'gzip',
+        'User-Agent': USER_AGENT,
+        'X-HR-Batch': batch_id,
+        'X-HR-Signature': sign(conf.get('secret', ''), body),
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=settings.WEBHOOK_TIMEOUT_SECONDS) as response:
+            response.read()
+    except urllib.error.HTTPError as exc:
+        raise WebhookDeliveryError(f"HTTP {exc.code}") from exc
+    except (urllib.error.URLError, OSError) as exc:
+        raise WebhookDeliveryError(str(getattr(exc, 'reason', exc))) from exc
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts` + 1: doubling, capped, with +-20% jitter."""
+    delay = min(settings.WEBHOOK_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.WEBHOOK_BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def deliver_next_batch(name, now=None):
+    """
+    Sends the oldest pending events of one destination as one batch.
+    Returns (events delivered, error or None). (0, None) means the queue is
+    empty or its oldest event is still waiting out a backoff.
+    """
+    conf = settings.WEBHOOK_DESTINATIONS[name]
+    now = now or timezone.now()
+    batch = list(
+        OutboxEvent.objects.filter(destination=name, status='pending').order_by('id')[:settings.WEBHOOK_BATCH_SIZE]
+    )
+    if not batch or (batch[0].next_attempt_at and batch[0].next_attempt_at > now):
+        return 0, None
+
+    ids = [event.pk for event in batch]
+    body, raw_size = encode_batch(name, batch)
+    batch_id = f'{name}:{ids[0]}-{ids[-1]}'
+    try:
+        post_batch(conf, body, batch_id)
+    except WebhookDeliveryError as exc:
+        _failed(batch, str(exc), now)
+        logger.warning("Webhook batch %s (%d events) failed: %s", batch_id, len(batch), exc)
+        return 0, str(exc)
+
+    OutboxEvent.objects.filter(pk__in=ids).update(status='delivered', delivered_at=timezone.now(), last_error='')
+    logger.info("Webhook batch %s delivered: %d events, %d -> %d bytes", batch_id, len(batch), raw_size, len(body))
+    return len(batch), None
+
+
+def _failed(batch, error, now):
+    with transaction.atomic():
+        for event in batch:
+            event.attempts += 1
+            event.last_error = error[:255]
+            if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                event.status = 'dead'
+                event.next_attempt_at = None
+            else:
+                event.next_attempt_at = now + backoff(event.attempts)
+        # Later events share the head's retry time, so the batch stays together.
+        retry_at = batch[0].next_attempt_at
+        for event in batch:
+            if event.status == 'pending' and retry_at is not None:
+                event.next_attempt_at = retry_at
+        OutboxEvent.objects.bulk_update(batch, ['attempts', 'last_error', 'status', 'next_attempt_at'], batch_size=1000)
+
+
+def deliver_pending(destinations=None, max_batches=None):
+    """
+    Drains every destination until its queue is empty, waiting out a
+    backoff or `max_batches` is reached. Returns {name: (delivered, last error)}.
+    """
+    result = {}
+    for name in destinations or settings.WEBHOOK_DESTINATIONS:
+        if not settings.WEBHOOK_DESTINATIONS[name].get('url'):
+            continue
+        delivered, error, batches = 0, None, 0
+        while max_batches is None or batches < max_batches:
+            count, error = deliver_next_batch(name)
+            batches += 1
+            delivered += count
+            if not count:
+                break
+        result[name] = (delivered, error)
+    return result
+
+
+def requeue(queryset):
+    """Sends the given (e.g. dead) events again, at their place in the queue."""
+    return queryset.update(status='pending', attempts=0, next_attempt_at=None, last_error='')
+
+
+def purge_delivered(keep_days=DELIVERED_KEEP_DAYS, batch_size=5000):
+    """Deletes delivered events older than `keep_days`, in batches. Returns the number deleted."""
+    cutoff = timezone.now() - timedelta(days=keep_days)
+    deleted = 0
+    while True:
+        ids = list(OutboxEvent.objects.filter(status='delivered', delivered_at__lt=cutoff)
+                   .values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OutboxEvent.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,13 @@
+"""
+Django admin URLconf for the serverless profile, imported on first use.
+
+There hremployee_project/urls.py points 'admin/' at this module by name, so
+it is only loaded when a request under /admin/ (or a reverse('admin:...'))
+needs it. The admin app is installed without autodiscovery in that profile,
+and the ModelAdmin registrations happen here instead of at every cold start.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,39 @@
+"""
+Lazy admin include for the serverless profile only (see SERVERLESS in
+settings.py). It relies on URLResolver internals, so the regular profile
+keeps the plain `path('admin/', admin.site.urls)`.
+"""
+from django.urls import URLResolver
+
+
+class LazyURLResolver(URLResolver):
+    """
+    A namespaced include whose URLconf is imported the first time a path under
+    it is resolved or one of its names is reversed. A plain include() is
+    imported with the root URLconf, and the first reverse() anywhere would
+    populate it as well.
+    """
+
+    def _populate(self):
+        # Called by the root resolver while building its own tables: only
+        # namespaced includes are lazy, and those need nothing from us yet.
+        if 'url_patterns' in self.__dict__:
+            super()._populate()
+
+    def _load(self):
+        self.url_patterns  # cached_property: imports the URLconf once
+
+    @property
+    def reverse_dict(self):
+        self._load()
+        return super().reverse_dict
+
+    @property
+    def namespace_dict(self):
+        self._load()
+        return super().namespace_dict
+
+    @property
+    def app_dict(self):
+        self._load()
+        return super().app_dict
@@ -1,16 +1,24 @@
-from django.contrib import admin
 from django.urls import path, include
 from django.views.generic.base import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
 
+if settings.SERVERLESS:
+    # The admin URLconf (and admin.py autodiscovery) loads on first use.
+    from django.urls.resolvers import RoutePattern
+    from .lazy_urls import LazyURLResolver
+    admin_urls = LazyURLResolver(RoutePattern('admin/'), 'hremployee_project.admin_urls', app_name='admin', namespace='admin')
+else:
+    from django.contrib import admin
+    admin_urls = path('admin/', admin.site.urls)
+
 urlpatterns = [
     # 1. Root URL Redirect
     # If someone goes to http://127.0.0.1:8000/, send them to the dashboard
     path('', RedirectView.as_view(pattern_name='employee_dashboard', permanent=False), name='home'),
 
     # 2. Django Admin Interface
-    path('admin/', admin.site.urls),
+    admin_urls,
 
     # 3. Built-in Authentication URLs
     # (Useful for background password logic)